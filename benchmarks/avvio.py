@@ -0,0 +1,113 @@
+"""
+Tempo di avvio delle pagine Streamlit, misurato in processi nuovi (a freddo).
+
+Uso (dalla radice del repository):
+
+    python -m benchmarks.avvio                     # tutte le pagine
+    python -m benchmarks.avvio --massimo-ms 3000   # esce con 1 se una pagina supera il limite
+
+Per ogni pagina (app.py e pages/*.py):
+- import: importa i nomi che la pagina chiede a `library`,
+- prima esecuzione: esegue la pagina con streamlit.testing (AppTest), cioè
+  il primo disegno che vede un utente con la sezione predefinita aperta;
+  senza streamlit installato resta solo la misura degli import.
+Si misura anche `import library` da solo, che deve restare quasi gratuito.
+I risultati vanno in JSON come quelli di benchmarks.esegui.
+"""
+import argparse
+import ast
+import json
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.esegui import CARTELLA_RISULTATI, _versione
+
+PAGINE = [Path("app.py")] + sorted(p for p in Path("pages").glob("*.py") if not p.name.startswith("_"))
+
+_PROGRAMMA_IMPORT = """
+import time
+inizio = time.perf_counter()
+{importazione}
+print(time.perf_counter() - inizio)
+"""
+
+_PROGRAMMA_PAGINA = """
+import time
+from streamlit.testing.v1 import AppTest
+inizio = time.perf_counter()
+app = AppTest.from_file({pagina!r}, default_timeout=120).run()
+durata = time.perf_counter() - inizio
+if app.exception:
+    raise SystemExit("eccezione nella pagina: " + str(app.exception[0].value))
+print(durata)
+"""
+
+
+def _nomi_library(pagina):
+    # I nomi della riga `from library import ...` della pagina
+    albero = ast.parse(pagina.read_text(encoding="utf-8"))
+    return [alias.name for nodo in ast.walk(albero)
+            if isinstance(nodo, ast.ImportFrom) and nodo.module == "library" for alias in nodo.names]
+
+def _cronometra(programma, ripetizioni):
+    # Miglior tempo su processi nuovi: ogni esecuzione parte senza moduli in memoria
+    tempi = []
+    for _ in range(ripetizioni):
+        esito = subprocess.run([sys.executable, "-c", programma], capture_output=True, text=True)
+        if esito.returncode != 0:
+            raise RuntimeError(esito.stderr.strip().splitlines()[-1] if esito.stderr.strip() else "errore")
+        tempi.append(float(esito.stdout.strip().splitlines()[-1]))
+    return min(tempi)
+
+def _streamlit_disponibile():
+    return subprocess.run([sys.executable, "-c", "import streamlit.testing.v1"], capture_output=True).returncode == 0
+
+def misura_avvio(ripetizioni=3):
+    secondi = {"import_library": _cronometra(_PROGRAMMA_IMPORT.format(importazione="import library"), ripetizioni)}
+    con_streamlit = _streamlit_disponibile()
+    for pagina in PAGINE:
+        nomi = _nomi_library(pagina)
+        if nomi:
+            importazione = f"from library import {', '.join(nomi)}"
+            secondi[f"{pagina.stem}_import"] = _cronometra(_PROGRAMMA_IMPORT.format(importazione=importazione),
+                                                         ripetizioni)
+        if con_streamlit:
+            secondi[f"{pagina.stem}_prima_esecuzione"] = _cronometra(
+                _PROGRAMMA_PAGINA.format(pagina=str(pagina)), ripetizioni)
+    return secondi, con_streamlit
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ripetizioni", type=int, default=3)
+    parser.add_argument("--massimo-ms", type=float, default=None, help="limite per ogni misura (regressione = errore)")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    secondi, con_streamlit = misura_avvio(args.ripetizioni)
+    for nome, durata in secondi.items():
+        print(f"  {nome:<30} {durata * 1000:10.2f} ms")
+    if not con_streamlit:
+        print("  (streamlit non installato: misurati solo gli import)")
+
+    adesso = datetime.now()
+    output = args.output or CARTELLA_RISULTATI / f"avvio_{adesso:%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "versione": _versione(),
+        "data": adesso.isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "streamlit": con_streamlit,
+        "secondi": {k: round(v, 6) for k, v in secondi.items()},
+    }, indent=2))
+    print(f"Risultati salvati in {output}")
+
+    oltre = {k: v for k, v in secondi.items() if args.massimo_ms is not None and v * 1000 > args.massimo_ms}
+    for nome, durata in oltre.items():
+        print(f"OLTRE IL LIMITE: {nome} {durata * 1000:.2f} ms > {args.massimo_ms} ms")
+    return 1 if oltre else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+Benchmark dei percorsi caldi della libreria su leghe sintetiche.
+
+Uso (dalla radice del repository, nessun accesso alla rete):
+
+    python -m benchmarks.esegui                       # taglie predefinite
+    python -m benchmarks.esegui --taglie 10x1 200x3   # giocatori x round
+    python -m benchmarks.esegui --output risultati.json
+
+I risultati vengono scritti in JSON (uno per esecuzione, di default in
+benchmarks/risultati/, ignorata da git) così le regressioni
+si vedono confrontando i file di due versioni.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.genera_lega import genera_lega
+from library import dati
+from library.archivio import carica_partite, sincronizza_archivio
+from library.caricamento import carica_turni
+from library.classifica import MotoreClassifica
+from library.database import ArchivioSQL
+from library.elo import calcola_elo
+from library.indice import IndiceGiocatori
+from library.partite import ArchivioPartite
+from library.punteggio import calcola_punteggi
+from library.serie import riduci, serie_temporali
+from library.simulazione import simula_fase_finale
+from library.spareggi import MatriciScontri
+from operations.scheduler import round_robin_schedule
+
+TAGLIE = ["10x1", "50x2", "100x3"]
+CARTELLA_RISULTATI = Path("benchmarks/risultati")
+
+
+def cronometra(funzione, ripetizioni=3):
+    """
+    Miglior tempo (secondi) su `ripetizioni` esecuzioni e ultimo risultato.
+    """
+    migliore = float("inf")
+    risultato = None
+    for _ in range(ripetizioni):
+        inizio = time.perf_counter()
+        risultato = funzione()
+        migliore = min(migliore, time.perf_counter() - inizio)
+    return migliore, risultato
+
+def _carica_tutto(base_dir):
+    # Il vecchio percorso delle pagine: un file alla volta, concat una volta sola
+    frame = [dati.load_turno_csv(r, t, base_dir)
+             for r in dati.get_rounds(base_dir) for t in dati.get_turni(base_dir / r)]
+    return pd.concat(frame, ignore_index=True)
+
+def _filtro_maschere(df, giocatori):
+    # Filtro per giocatore con maschere booleane, come faceva 2Giocatore.py
+    for g in giocatori:
+        df[(df["Player 1"] == g) | (df["Player 2"] == g)]
+
+def _lookup_indice(indice, giocatori):
+    for g in giocatori:
+        indice.giocate(g)
+        indice.future(g)
+
+def esegui_taglia(n_giocatori, n_round, ripetizioni):
+    misure = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(tmp) / "rounds"
+        percorso = Path(tmp) / "partite.parquet"
+        misure["generazione"], n_partite = cronometra(
+            lambda: genera_lega(base_dir, n_giocatori, n_round), ripetizioni=1)
+        n_file = sum(len(dati.get_turni(base_dir / r)) for r in dati.get_rounds(base_dir))
+
+        misure["caricamento_csv"], df = cronometra(lambda: _carica_tutto(base_dir), ripetizioni)
+        misure["caricamento_parallelo"], _ = cronometra(lambda: carica_turni(base_dir), ripetizioni)
+        misure["archivio_sync_freddo"], _ = cronometra(
+            lambda: (percorso.unlink(missing_ok=True), sincronizza_archivio(base_dir, percorso)), ripetizioni)
+        misure["archivio_sync_caldo"], _ = cronometra(lambda: sincronizza_archivio(base_dir, percorso), ripetizioni)
+        misure["archivio_lettura_round"], _ = cronometra(
+            lambda: carica_partite(round_name="round_1", base_dir=base_dir, percorso=percorso), ripetizioni)
+
+        # Memoria per partita: DataFrame dei CSV, DataFrame dell'archivio, forma compatta
+        df_archivio = carica_partite(base_dir=base_dir, percorso=percorso)
+        misure["partite_compatte_da_df"], compatte = cronometra(
+            lambda: ArchivioPartite.da_dataframe(df_archivio), ripetizioni)
+        misure["partite_compatte_a_df"], _ = cronometra(compatte.a_dataframe, ripetizioni)
+
+        misure["punteggio"], _ = cronometra(lambda: calcola_punteggi(df), ripetizioni)
+        misure["elo_replay"], _ = cronometra(lambda: calcola_elo(df), ripetizioni)
+        misure["serie_temporali"], serie = cronometra(lambda: serie_temporali(df_archivio), ripetizioni)
+        misure["serie_lttb_100"], _ = cronometra(lambda: riduci(serie, "Elo", 100), ripetizioni)
+
+        def classifica_fredda():
+            motore = MotoreClassifica(base_dir)
+            motore.aggiorna()
+            return motore
+        misure["classifica_fredda"], motore = cronometra(classifica_fredda, ripetizioni)
+        ultimo_round = dati.get_rounds(base_dir)[-1]
+        ultimo_turno = dati.get_turni(base_dir / ultimo_round)[-1]
+        misure["classifica_lookup"], _ = cronometra(lambda: motore.classifica(ultimo_round, ultimo_turno), ripetizioni)
+
+        def classifica_incrementale():
+            # Modifica dell'ultimo turno: si ricalcola solo quello
+            os.utime(base_dir / ultimo_round / f"{ultimo_turno}.csv")
+            motore.aggiorna()
+        misure["classifica_incrementale"], _ = cronometra(classifica_incrementale, ripetizioni)
+
+        future = df[df["Vincitore"].isna() | (df["Vincitore"] == "")]
+        classifica_attuale = motore.classifica(ultimo_round, ultimo_turno)
+        misure["simulazione_100k"], _ = cronometra(
+            lambda: simula_fase_finale(classifica_attuale, future, [0.5] * len(future), 100_000, seed=0), ripetizioni)
+        # Come la pagina: simulazioni predefinite, parità sciolte con gli scontri giocati
+        matrici = MatriciScontri.da_partite(df)
+        misure["simulazione_pagina"], _ = cronometra(
+            lambda: simula_fase_finale(classifica_attuale, future, [0.5] * len(future), seed=0, matrici=matrici),
+            ripetizioni)
+
+        giocatori = sorted(set(df["Player 1"]).union(df["Player 2"]))
+        misure["giocatore_maschere"], _ = cronometra(lambda: _filtro_maschere(df, giocatori), ripetizioni)
+        misure["giocatore_indice_costruzione"], indice = cronometra(lambda: IndiceGiocatori(df), ripetizioni)
+        misure["giocatore_indice_lookup"], _ = cronometra(lambda: _lookup_indice(indice, giocatori), ripetizioni)
+
+        # Archivio SQLite in un file a parte (non risultati.sqlite: i loader restano sui CSV)
+        database = Path(tmp) / "benchmark.sqlite"
+
+        def sqlite_importa():
+            for f in Path(tmp).glob("benchmark.sqlite*"):
+                f.unlink()
+            archivio_sql = ArchivioSQL(database, base_dir)
+            archivio_sql.importa_csv()
+            return archivio_sql
+        misure["sqlite_importa"], archivio_sql = cronometra(sqlite_importa, ripetizioni)
+        misure["sqlite_classifica"], _ = cronometra(
+            lambda: archivio_sql.classifica(ultimo_round, ultimo_turno), ripetizioni)
+        misure["sqlite_giocatore_lookup"], _ = cronometra(
+            lambda: [archivio_sql.partite(giocatore=g) for g in giocatori], ripetizioni)
+        misure["sqlite_riepilogo"], _ = cronometra(archivio_sql.riepilogo_giocatori, ripetizioni)
+
+    misure["calendario"], _ = cronometra(
+        lambda: round_robin_schedule([f"G{i}" for i in range(n_giocatori)], n_round), ripetizioni)
+
+    return {
+        "byte_per_partita": {
+            "dataframe_csv": round(df.memory_usage(deep=True).sum() / len(df), 1),
+            "dataframe_archivio": round(df_archivio.memory_usage(deep=True).sum() / len(df), 1),
+            "compatte": round(compatte.nbytes / len(df), 1),
+        },
+        "giocatori": n_giocatori,
+        "round": n_round,
+        "partite": n_partite,
+        "file_turno": n_file,
+        "secondi": {k: round(v, 6) for k, v in misure.items()},
+    }
+
+def _versione():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--taglie", nargs="+", default=TAGLIE, help="taglie come GIOCATORIxROUND")
+    parser.add_argument("--ripetizioni", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    risultati = []
+    for taglia in args.taglie:
+        n_giocatori, n_round = (int(x) for x in taglia.lower().split("x"))
+        risultato = esegui_taglia(n_giocatori, n_round, args.ripetizioni)
+        risultati.append(risultato)
+        print(f"{taglia}: {risultato['partite']} partite, {risultato['file_turno']} file")
+        print("  byte per partita: " + ", ".join(f"{k} {v}" for k, v in risultato["byte_per_partita"].items()))
+        for misura, secondi in risultato["secondi"].items():
+            print(f"  {misura:<30} {secondi * 1000:10.2f} ms")
+
+    adesso = datetime.now()
+    output = args.output or CARTELLA_RISULTATI / f"bench_{adesso:%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "versione": _versione(),
+        "data": adesso.isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "pandas": pd.__version__,
+        "piattaforma": platform.platform(),
+        "risultati": risultati,
+    }, indent=2))
+    print(f"Risultati salvati in {output}")
+
+
+if __name__ == "__main__":
+    main()
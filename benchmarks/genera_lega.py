@@ -0,0 +1,67 @@
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from operations.scheduler import turni_round_robin
+
+COLONNE_TURNO = ["Turno", "Data", "Orario", "Luogo", "Player 1", "Player 2",
+                 "Set 1", "Set 2", "Set 3", "Vincitore", "Superficie"]
+LUOGHI = ["Stadio Centrale", "Montella", "Circolo Tennis", "Palazzetto", "Campo Comunale"]
+SUPERFICI = ["Terra Rossa", "Sintetico", "Cemento", "Erba"]
+
+
+def _set(rng, vince_primo):
+    # Punteggio realistico di un set: 6-x, 7-5 o 7-6 con tiebreak
+    tipo = rng.random()
+    if tipo < 0.7:
+        a, b = 6, rng.randint(0, 4)
+    elif tipo < 0.85:
+        a, b = 7, 5
+    else:
+        a, b = 7, 6
+    testo = f"{a}-{b}" if vince_primo else f"{b}-{a}"
+    if b == 6:
+        testo += f"({rng.randint(0, 10)})"
+    return testo
+
+def _partita(rng, p1, p2, frazione_incomplete):
+    vince_primo = rng.random() < 0.5
+    if rng.random() < 0.6:
+        sets = [_set(rng, vince_primo), _set(rng, vince_primo), ""]
+    else:
+        sets = [_set(rng, vince_primo), _set(rng, not vince_primo), _set(rng, vince_primo)]
+    if rng.random() < frazione_incomplete:
+        # Partita interrotta: vincitore indicato ma set mancanti
+        sets = [sets[0], "", ""]
+    return sets + [p1 if vince_primo else p2]
+
+def genera_lega(cartella, n_giocatori, n_round=1, frazione_giocate=0.8, frazione_incomplete=0.05, seed=0):
+    """
+    Scrive una lega sintetica nel layout di operations/output/rounds
+    (round_X/turno_Y.csv) e restituisce il numero di partite generate.
+    Le prime partite in ordine cronologico sono giocate (con tiebreak e
+    qualche partita incompleta), le altre restano da giocare.
+    """
+    rng = random.Random(seed)
+    cartella = Path(cartella)
+    giocatori = [f"Giocatore {i:05d}" for i in range(n_giocatori)]
+    totale = n_round * n_giocatori * (n_giocatori - 1) // 2
+    da_giocare = int(totale * frazione_giocate)
+    inizio = date(2025, 6, 1)
+
+    n = 0
+    for round_num, turno, p1, p2 in turni_round_robin(giocatori, n_round):
+        righe = []
+        giorno = inizio + timedelta(days=7 * (turno - 1) + 70 * (round_num - 1))
+        for a, b in zip(p1, p2):
+            giocata = n < da_giocare
+            esito = _partita(rng, a, b, frazione_incomplete) if giocata else ["", "", "", ""]
+            righe.append([turno, giorno.strftime("%d/%m/%Y"), "15:00", rng.choice(LUOGHI), a, b]
+                         + esito + [rng.choice(SUPERFICI)])
+            n += 1
+        cartella_round = cartella / f"round_{round_num}"
+        cartella_round.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(righe, columns=COLONNE_TURNO).to_csv(cartella_round / f"turno_{turno}.csv", index=False)
+    return n
@@ -0,0 +1,306 @@
+"""
+API HTTP/JSON in sola lettura su classifiche, partite ed Elo.
+
+Uso (dalla radice del repository):
+
+    python -m library.api                  # http://127.0.0.1:8000
+    python -m library.api --host 0.0.0.0 --port 8080
+
+Endpoint (GET o HEAD):
+
+    /api/rounds                                  round e turni disponibili
+    /api/classifica?round=round_1&turno=turno_3  classifica cumulativa (default: ultimo turno)
+    /api/partite?round=&turno=&giocatore=&stato=giocate|future
+    /api/elo                                     Elo attuale di ogni giocatore
+    /metrics                                     misure della libreria (Prometheus)
+
+Ogni risposta è calcolata una volta per versione dei dati e tenuta in
+memoria già serializzata, compressa e con i suoi ETag (uno per la forma
+in chiaro e uno, con suffisso -gz, per quella compressa): una richiesta
+ripetuta costa un lookup nella cache (o un 304 se il client manda
+If-None-Match). La cache è una CacheLRU di CAPACITA_RISPOSTE voci con
+chiave il percorso e i soli parametri letti dall'endpoint. I dati si
+ricalcolano solo quando l'osservatore dei file turno segnala una modifica.
+"""
+import argparse
+import asyncio
+import functools
+import gzip
+import hashlib
+import json
+import logging
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from library import cache
+from library import dati
+from library.elo import MotoreElo
+from library.strumenti import misura, prometheus
+from library.watcher import avvia_osservatore
+
+MASSIMO_INTESTAZIONI = 16 * 1024  # byte; richieste più lunghe vengono rifiutate
+CAPACITA_RISPOSTE = 128
+
+log = logging.getLogger(__name__)
+
+# Parametri letti da ogni endpoint: solo questi entrano nella chiave della cache,
+# così parametri estranei o ripetuti non creano voci nuove
+PARAMETRI = {
+    "/api/rounds": (),
+    "/api/classifica": ("round", "turno"),
+    "/api/partite": ("round", "turno", "giocatore", "stato"),
+    "/api/elo": (),
+}
+
+
+class ErroreApi(Exception):
+    def __init__(self, stato, messaggio):
+        super().__init__(messaggio)
+        self.stato = stato
+
+
+class Risposta:
+    """
+    Corpo JSON pronto da spedire: in chiaro e compresso, ciascuno con il
+    suo ETag (sono rappresentazioni diverse dello stesso dato).
+    """
+
+    __slots__ = ("stato", "corpo", "compresso", "etag", "etag_compresso", "tipo")
+
+    def __init__(self, stato, corpo, tipo="application/json; charset=utf-8"):
+        self.stato = stato
+        self.corpo = corpo
+        self.compresso = gzip.compress(corpo, compresslevel=6, mtime=0)
+        impronta = hashlib.sha1(corpo).hexdigest()[:20]
+        self.etag = '"%s"' % impronta
+        self.etag_compresso = '"%s-gz"' % impronta
+        self.tipo = tipo
+
+
+def _json(oggetto):
+    return json.dumps(oggetto, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _record(df):
+    # DataFrame -> lista di dict JSON (date ISO, NaN -> null, tipi numpy -> Python)
+    df = df.copy()
+    if "Data" in df.columns:
+        df["Data"] = df["Data"].dt.strftime("%Y-%m-%d")
+    return json.loads(df.to_json(orient="records", force_ascii=False))
+
+def _accetta_gzip(valore):
+    """
+    Se l'intestazione Accept-Encoding accetta gzip: vale la voce gzip (o
+    x-gzip), altrimenti "*", con il suo q (1 se manca; q=0 la rifiuta).
+    """
+    pesi = {}
+    for voce in valore.split(","):
+        codifica, *opzioni = voce.split(";")
+        q = 1.0
+        for opzione in opzioni:
+            nome, _, numero = opzione.partition("=")
+            if nome.strip().lower() == "q":
+                try:
+                    q = float(numero)
+                except ValueError:
+                    q = 0.0
+        pesi[codifica.strip().lower()] = q
+    q = pesi.get("gzip", pesi.get("x-gzip", pesi.get("*", 0.0)))
+    return q > 0
+
+def _parametro(parametri, nome):
+    valori = parametri.get(nome)
+    return valori[-1] if valori else None
+
+
+class ServizioApi:
+    """
+    Modello condiviso dietro l'API: risposte già pronte, indicizzate per
+    (percorso, parametri dell'endpoint), valide finché la versione
+    dell'osservatore non cambia (la versione è l'impronta delle voci).
+    """
+
+    def __init__(self, osservatore=None):
+        self.osservatore = osservatore or avvia_osservatore()
+        self._risposte = cache.CacheLRU(CAPACITA_RISPOSTE)
+        self._rotte = {
+            "/api/rounds": self._rounds,
+            "/api/classifica": self._classifica,
+            "/api/partite": self._partite,
+            "/api/elo": self._elo,
+        }
+
+    # -- endpoint: restituiscono oggetti JSON-serializzabili --
+
+    def _rounds(self, parametri):
+        return {"rounds": [{"round": r, "turni": cache.get_turni(dati.BASE_DIR / r)} for r in cache.get_rounds()]}
+
+    def _round(self, parametri):
+        rounds = cache.get_rounds()
+        round_name = _parametro(parametri, "round") or (rounds[-1] if rounds else None)
+        if round_name not in rounds:
+            raise ErroreApi(HTTPStatus.NOT_FOUND, f"round sconosciuto: {round_name}")
+        return round_name
+
+    def _classifica(self, parametri):
+        round_name = self._round(parametri)
+        turni = cache.get_turni(dati.BASE_DIR / round_name)
+        turno_name = _parametro(parametri, "turno") or (turni[-1] if turni else None)
+        if turno_name not in turni:
+            raise ErroreApi(HTTPStatus.NOT_FOUND, f"turno sconosciuto: {turno_name}")
+        classifica = cache.calcola_classifica_punti(round_name, turno_name)
+        return {"round": round_name, "turno": turno_name, "classifica": _record(classifica)}
+
+    def _partite(self, parametri):
+        round_name = self._round(parametri) if "round" in parametri else None
+        turno_name = _parametro(parametri, "turno")
+        giocatore = _parametro(parametri, "giocatore")
+        stato = _parametro(parametri, "stato")
+        if stato not in (None, "giocate", "future"):
+            raise ErroreApi(HTTPStatus.BAD_REQUEST, "stato deve essere 'giocate' o 'future'")
+        if turno_name is not None and round_name is None:
+            raise ErroreApi(HTTPStatus.BAD_REQUEST, "il turno richiede anche il round")
+        df = cache.carica_partite(round_name=round_name, turno_name=turno_name, giocatore=giocatore)
+        if stato is not None:
+            vincitore = df["Vincitore"].astype(object)
+            giocata = (vincitore.notna() & (vincitore != "")).to_numpy()
+            df = df[giocata if stato == "giocate" else ~giocata]
+        return {"round": round_name, "turno": turno_name, "giocatore": giocatore, "partite": _record(df)}
+
+    def _elo(self, parametri):
+        motore = MotoreElo()
+        motore.replay(cache.carica_partite())
+        elo = motore.classifica()
+        elo["Elo"] = elo["Elo"].round(1)
+        return {"elo": _record(elo)}
+
+    # -- risposte --
+
+    @misura(nome="api.calcola")
+    def calcola(self, percorso, parametri):
+        if percorso == "/metrics":
+            return Risposta(HTTPStatus.OK, prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        funzione = self._rotte.get(percorso)
+        try:
+            if funzione is None:
+                raise ErroreApi(HTTPStatus.NOT_FOUND, f"percorso sconosciuto: {percorso}")
+            return Risposta(HTTPStatus.OK, _json(funzione(parametri)))
+        except ErroreApi as e:
+            return Risposta(e.stato, _json({"errore": str(e)}))
+        except Exception:
+            # Un errore inatteso è un 500 in JSON come gli altri, non una connessione chiusa senza risposta
+            log.exception("errore nel calcolo di %s", percorso)
+            return Risposta(HTTPStatus.INTERNAL_SERVER_ERROR, _json({"errore": "errore interno"}))
+
+    async def risposta(self, percorso, parametri):
+        """
+        Risposta pronta per (percorso, parametri); il calcolo, solo alla
+        prima richiesta dopo una modifica dei dati, gira in un thread per
+        non bloccare le altre connessioni.
+        """
+        if percorso == "/metrics":
+            return self.calcola(percorso, parametri)  # misure sempre fresche
+
+        chiave = (percorso, tuple(_parametro(parametri, nome) for nome in PARAMETRI.get(percorso, ())))
+        versione = self.osservatore.versione
+        risposta = self._risposte.cerca(chiave, versione)
+        if risposta is None:
+            # Una risposta calcolata mentre i dati cambiano resta legata alla versione vecchia
+            risposta = await asyncio.get_running_loop().run_in_executor(
+                None, self._risposte.ottieni, chiave, versione, functools.partial(self.calcola, percorso, parametri))
+            if risposta.stato == HTTPStatus.INTERNAL_SERVER_ERROR:
+                self._risposte._scarta(chiave)  # un errore non resta in cache: la prossima richiesta riprova
+        return risposta
+
+    # -- HTTP/1.1 minimale con keep-alive --
+
+    @staticmethod
+    def _intestazione(stato, campi):
+        righe = [f"HTTP/1.1 {stato.value} {stato.phrase}"] + [f"{k}: {v}" for k, v in campi]
+        return ("\r\n".join(righe) + "\r\n\r\n").encode("latin-1")
+
+    async def gestisci(self, reader, writer):
+        try:
+            while True:
+                try:
+                    testa = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.LimitOverrunError:
+                    writer.write(self._intestazione(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                                    [("Content-Length", "0"), ("Connection", "close")]))
+                    break
+                righe = testa.decode("latin-1").split("\r\n")
+                try:
+                    metodo, bersaglio, protocollo = righe[0].split(" ")
+                except ValueError:
+                    writer.write(self._intestazione(HTTPStatus.BAD_REQUEST,
+                                                    [("Content-Length", "0"), ("Connection", "close")]))
+                    break
+                intestazioni = {}
+                for riga in righe[1:]:
+                    nome, _, valore = riga.partition(":")
+                    if nome:
+                        intestazioni[nome.strip().lower()] = valore.strip()
+
+                lunghezza = intestazioni.get("content-length", "0")
+                if not lunghezza.isdigit() or not lunghezza.isascii():
+                    # Senza una lunghezza valida non si sa dove finisce il corpo: la connessione si chiude
+                    writer.write(self._intestazione(HTTPStatus.BAD_REQUEST,
+                                                    [("Content-Length", "0"), ("Connection", "close")]))
+                    break
+                if int(lunghezza):
+                    await reader.readexactly(int(lunghezza))  # corpo ignorato
+
+                connessione = intestazioni.get("connection", "").lower()
+                chiudi = connessione == "close" or (protocollo == "HTTP/1.0" and connessione != "keep-alive")
+                campi = [("Connection", "close" if chiudi else "keep-alive")]
+
+                if metodo not in ("GET", "HEAD"):
+                    writer.write(self._intestazione(HTTPStatus.METHOD_NOT_ALLOWED,
+                                                    campi + [("Allow", "GET, HEAD"), ("Content-Length", "0")]))
+                else:
+                    parti = urlsplit(bersaglio)
+                    risposta = await self.risposta(unquote(parti.path), parse_qs(parti.query))
+                    # La forma (in chiaro o gzip) si sceglie prima: ETag e 304 sono quelli della forma spedita
+                    compressa = _accetta_gzip(intestazioni.get("accept-encoding", ""))
+                    etag = risposta.etag_compresso if compressa else risposta.etag
+                    campi += [("Content-Type", risposta.tipo), ("ETag", etag),
+                              ("Cache-Control", "no-cache"), ("Vary", "Accept-Encoding")]
+                    richiesti = {e.strip().removeprefix("W/") for e in intestazioni.get("if-none-match", "").split(",")}
+                    if risposta.stato == HTTPStatus.OK and (etag in richiesti or "*" in richiesti):
+                        writer.write(self._intestazione(HTTPStatus.NOT_MODIFIED, campi))
+                    else:
+                        corpo = risposta.corpo
+                        if compressa:
+                            corpo = risposta.compresso
+                            campi.append(("Content-Encoding", "gzip"))
+                        campi.append(("Content-Length", str(len(corpo))))
+                        writer.write(self._intestazione(HTTPStatus(risposta.stato), campi))
+                        if metodo == "GET":
+                            writer.write(corpo)
+                await writer.drain()
+                if chiudi:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def servi(self, host="127.0.0.1", porta=8000):
+        server = await asyncio.start_server(self.gestisci, host, porta, limit=MASSIMO_INTESTAZIONI)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+    print(f"API su http://{args.host}:{args.port}/api/rounds")
+    try:
+        asyncio.run(ServizioApi().servi(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
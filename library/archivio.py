@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from library import dati
+from library.caricamento import mappa, scopri_turni
+from library.elo import COLONNE_ELO, calcola_elo
+from library.punteggio import NUM_SET, parse_set
+from library.strumenti import misura
+
+ARCHIVIO = Path("operations/output/partite.parquet")
+
+# Chiave dei metadati Parquet con le impronte dei CSV da cui è stato costruito
+_CHIAVE_IMPRONTE = b"tennis_comm.impronte"
+
+SCHEMA = pa.schema(
+    [
+        ("Round", pa.int16()),
+        ("Turno", pa.int16()),
+        ("Data", pa.date32()),
+        ("Orario", pa.string()),
+        ("Luogo", pa.dictionary(pa.int32(), pa.string())),
+        ("Player 1", pa.dictionary(pa.int32(), pa.string())),
+        ("Player 2", pa.dictionary(pa.int32(), pa.string())),
+        ("Set 1", pa.string()),
+        ("Set 2", pa.string()),
+        ("Set 3", pa.string()),
+        ("Vincitore", pa.dictionary(pa.int32(), pa.string())),
+        ("Superficie", pa.dictionary(pa.int32(), pa.string())),
+        ("Elo iniziale 1", pa.float64()),
+        ("Elo iniziale 2", pa.float64()),
+        ("Elo 1 Finale", pa.float64()),
+        ("Elo 2 Finale", pa.float64()),
+    ]
+    + [(f"Giochi {g} Set {i + 1}", pa.int8()) for i in range(NUM_SET) for g in (1, 2)]
+)
+
+_lock = threading.Lock()
+
+
+def _impronte_csv(base_dir):
+    # Una sola scansione della cartella, impronte comprese
+    return {f"{v.round}/{v.turno}": list(v.impronta) for v in scopri_turni(base_dir)}
+
+def _impronte_archivio(percorso):
+    if not percorso.exists():
+        return None
+    metadati = pq.read_schema(percorso).metadata or {}
+    if _CHIAVE_IMPRONTE not in metadati:
+        return None
+    return json.loads(metadati[_CHIAVE_IMPRONTE])
+
+def _tabella_turno(round_name, turno_name, base_dir):
+    # Un file turno nei tipi dell'archivio, colonna per colonna in Arrow (niente inserimenti in un DataFrame)
+    df = dati.load_turno_csv(round_name, turno_name, base_dir)
+    n = len(df)
+    date = pd.to_datetime(df["Data"], format="%d/%m/%Y", errors="coerce").to_numpy().astype("datetime64[D]")
+    colonne = {
+        "Round": pa.array(np.full(n, dati.numero(round_name), dtype=np.int16)),
+        "Turno": pa.array(np.full(n, dati.numero(turno_name), dtype=np.int16)),
+        "Data": pa.array(date, type=pa.date32(), from_pandas=True),
+    }
+    for col in ["Orario", "Luogo", "Player 1", "Player 2", "Set 1", "Set 2", "Set 3", "Vincitore", "Superficie"]:
+        valori = df[col].astype(object).to_numpy()
+        valori = pa.array(np.where(valori == "", None, valori), type=pa.string(), from_pandas=True)
+        colonne[col] = valori.dictionary_encode() if pa.types.is_dictionary(SCHEMA.field(col).type) else valori
+    for col in COLONNE_ELO:
+        colonne[col] = pa.array(pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan),
+                                from_pandas=True)
+    for i in range(NUM_SET):
+        g1, g2 = parse_set(df[f"Set {i + 1}"], decisivo=i == NUM_SET - 1)
+        colonne[f"Giochi 1 Set {i + 1}"] = pa.array(np.asarray(g1).astype(np.int8))
+        colonne[f"Giochi 2 Set {i + 1}"] = pa.array(np.asarray(g2).astype(np.int8))
+    return pa.table(colonne, schema=SCHEMA)
+
+@misura
+def sincronizza_archivio(base_dir=None, percorso=None):
+    """
+    Allinea l'archivio Parquet ai CSV dei turni. Se nessun CSV è cambiato
+    non fa nulla; altrimenti rilegge solo i turni nuovi o modificati e
+    riusa il resto dell'archivio esistente. Le colonne Elo vengono
+    ricalcolate sull'intera storia. Un row group per turno, così
+    i filtri su Round/Turno saltano interi blocchi in lettura.
+    Restituisce True se l'archivio è stato riscritto.
+    """
+    base_dir = dati.BASE_DIR if base_dir is None else base_dir
+    percorso = ARCHIVIO if percorso is None else percorso
+
+    with _lock:
+        impronte = _impronte_csv(base_dir)
+        vecchie = _impronte_archivio(percorso)
+        if vecchie == impronte:
+            return False
+
+        # Row group dell'archivio esistente riutilizzabili, per (round, turno)
+        riusati = {}
+        if vecchie is not None:
+            with pq.ParquetFile(percorso) as esistente:
+                for i in range(esistente.num_row_groups):
+                    statistiche = esistente.metadata.row_group(i)
+                    r = statistiche.column(0).statistics.min
+                    t = statistiche.column(1).statistics.min
+                    chiave = f"round_{r}/turno_{t}"
+                    if vecchie.get(chiave) is not None and vecchie.get(chiave) == impronte.get(chiave):
+                        riusati[chiave] = esistente.read_row_group(i).cast(SCHEMA)
+
+        # I turni da rileggere in parallelo, gli altri dall'archivio; l'ordine resta quello delle impronte
+        da_leggere = [chiave for chiave in impronte if chiave not in riusati]
+        lette = dict(zip(da_leggere, mappa(lambda chiave: _tabella_turno(*chiave.split("/"), base_dir), da_leggere)))
+        tabelle = [riusati[chiave] if chiave in riusati else lette[chiave] for chiave in impronte]
+        tabella = pa.concat_tables(tabelle).combine_chunks() if tabelle else SCHEMA.empty_table()
+
+        # L'Elo dipende da tutta la storia precedente: replay completo (vettoriale per turno)
+        colonne_elo = ["Round", "Turno", "Player 1", "Player 2", "Vincitore", "Set 1", "Set 2", "Set 3"]
+        elo = calcola_elo(tabella.select(colonne_elo).to_pandas())
+        for col in COLONNE_ELO:
+            tabella = tabella.set_column(SCHEMA.get_field_index(col), SCHEMA.field(col), pa.array(elo[col].to_numpy(), pa.float64()))
+
+        schema = SCHEMA.with_metadata({_CHIAVE_IMPRONTE: json.dumps(impronte)})
+
+        # Scrittura atomica: chi legge vede il vecchio file o quello nuovo, mai a metà
+        percorso.parent.mkdir(parents=True, exist_ok=True)
+        temporaneo = percorso.with_suffix(".parquet.tmp")
+        with pq.ParquetWriter(temporaneo, schema) as writer:
+            inizio = 0
+            for t in tabelle:
+                if t.num_rows:
+                    writer.write_table(tabella.slice(inizio, t.num_rows).replace_schema_metadata(schema.metadata))
+                inizio += t.num_rows
+        os.replace(temporaneo, percorso)
+        return True
+
+@misura
+def carica_partite(round_name=None, turno_name=None, giocatore=None, colonne=None, base_dir=None, percorso=None):
+    """
+    Partite dall'archivio colonnare, leggendo solo le colonne richieste e
+    solo i row group che possono soddisfare i filtri (round, turno, giocatore).
+    I giocatori, il luogo e la superficie arrivano come categorie, la data
+    come datetime.
+    """
+    percorso = ARCHIVIO if percorso is None else percorso
+    sincronizza_archivio(base_dir, percorso)
+
+    filtri = []
+    if round_name is not None:
+        filtri.append(("Round", "==", dati.numero(round_name)))
+    if turno_name is not None:
+        filtri.append(("Turno", "==", dati.numero(turno_name)))
+    if giocatore is not None:
+        # Forma normale disgiuntiva: (Player 1 == g) OR (Player 2 == g)
+        filtri = [filtri + [("Player 1", "==", giocatore)], filtri + [("Player 2", "==", giocatore)]]
+
+    tabella = pq.read_table(percorso, columns=colonne, filters=filtri or None)
+    df = tabella.to_pandas()
+    if "Data" in df.columns:
+        df["Data"] = pd.to_datetime(df["Data"])
+    return df
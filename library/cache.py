@@ -0,0 +1,393 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from library import dati
+from library import archivio
+from library import leghe
+from library import simulazione
+from library import tabellone
+from library.elo import MotoreElo
+from library.indice import IndiceGiocatori
+from library.statistiche import PARTITE_FORMA, StatisticheGiocatori
+from library.serie import serie_temporali as _serie_temporali
+from library.spareggi import MatriciScontri
+from library.partite import ArchivioPartite
+from library.strumenti import misura
+
+# Voci al massimo per lega, e memoria al massimo per tutte le leghe del processo insieme
+CAPACITA_LEGA = 256
+MEMORIA_MASSIMA = int(os.environ.get("TENNIS_MEMORIA_MB", "1024")) * 2**20
+
+
+def impronta(percorso):
+    """
+    (mtime_ns, dimensione) del file o della cartella, None se non esiste.
+    Per una cartella cambia quando si aggiungono o tolgono file.
+    """
+    try:
+        st = percorso.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def stima_byte(valore, profondita=2):
+    """
+    Memoria occupata (circa) da un valore in cache: esatta per DataFrame,
+    array e ArchivioPartite, per tuple, dict e oggetti somma i campi fino
+    a `profondita` livelli.
+    """
+    if isinstance(valore, (pd.DataFrame, pd.Series)):
+        return int(np.sum(valore.memory_usage(deep=True)))
+    if isinstance(valore, (np.ndarray, ArchivioPartite)):
+        return int(valore.nbytes)
+    if profondita > 0:
+        if isinstance(valore, (tuple, list)):
+            return sys.getsizeof(valore) + sum(stima_byte(v, profondita - 1) for v in valore)
+        if isinstance(valore, dict):
+            return sys.getsizeof(valore) + sum(stima_byte(v, profondita - 1) for v in valore.values())
+        if hasattr(valore, "__dict__"):
+            return sys.getsizeof(valore) + stima_byte(vars(valore), profondita)
+    return sys.getsizeof(valore)
+
+
+class BudgetMemoria:
+    """
+    Limite di memoria comune a più CacheLRU (una per lega). Ogni voce è
+    registrata con la sua dimensione in un unico ordine LRU: quando il
+    totale supera il limite si scartano le voci usate meno di recente,
+    di qualunque lega siano. Così una lega molto visitata usa la memoria
+    lasciata libera da quelle ferme, senza superare il totale.
+    """
+
+    def __init__(self, massimo_byte=MEMORIA_MASSIMA):
+        self.massimo_byte = massimo_byte
+        self._voci = OrderedDict()  # (cache, chiave) -> byte
+        self._lock = threading.Lock()
+        self.occupati = 0
+        self.scartate = 0
+
+    def usa(self, cache, chiave):
+        with self._lock:
+            if (cache, chiave) in self._voci:
+                self._voci.move_to_end((cache, chiave))
+
+    def registra(self, cache, chiave, byte):
+        # Ordine dei lock: budget poi cache (le cache non chiamano il budget tenendo il proprio)
+        with self._lock:
+            self.occupati += byte - self._voci.pop((cache, chiave), 0)
+            self._voci[(cache, chiave)] = byte
+            # La voce appena inserita resta anche se da sola supera il limite
+            while self.occupati > self.massimo_byte and len(self._voci) > 1:
+                (vecchia, chiave_vecchia), liberati = self._voci.popitem(last=False)
+                self.occupati -= liberati
+                self.scartate += 1
+                vecchia._scarta(chiave_vecchia)
+
+    def rimuovi(self, cache, chiavi):
+        with self._lock:
+            for chiave in chiavi:
+                self.occupati -= self._voci.pop((cache, chiave), 0)
+
+
+class CacheLRU:
+    """
+    Cache LRU thread-safe condivisa da tutte le sessioni Streamlit del processo
+    (le sessioni sono thread dello stesso interprete e il modulo è importato
+    una volta sola). Ogni voce ricorda l'impronta dei file da cui è stata
+    calcolata: se l'impronta cambia la voce viene ricalcolata, altrimenti è
+    un colpo di cache. Con un `budget` le voci contano anche per il limite
+    di memoria comune e possono essere scartate per fare posto ad altre cache.
+    """
+
+    def __init__(self, capacita=512, budget=None):
+        self.capacita = capacita
+        self.budget = budget
+        self._voci = OrderedDict()  # chiave -> (impronta, valore)
+        self._lock = threading.Lock()
+        self.colpi = 0
+        self.mancati = 0
+
+    def ottieni(self, chiave, impronta_attuale, calcola):
+        with self._lock:
+            voce = self._voci.get(chiave)
+            if voce is not None and voce[0] == impronta_attuale:
+                self._voci.move_to_end(chiave)
+                self.colpi += 1
+                valore = voce[1]
+            else:
+                voce = None
+                self.mancati += 1
+        if voce is not None:
+            if self.budget is not None:
+                self.budget.usa(self, chiave)
+            return valore
+
+        # Il calcolo avviene fuori dal lock: letture di file diversi in parallelo
+        valore = calcola()
+
+        uscite = []
+        with self._lock:
+            self._voci[chiave] = (impronta_attuale, valore)
+            self._voci.move_to_end(chiave)
+            while len(self._voci) > self.capacita:
+                uscite.append(self._voci.popitem(last=False)[0])
+        if self.budget is not None:
+            self.budget.rimuovi(self, uscite)
+            self.budget.registra(self, chiave, stima_byte(valore))
+        return valore
+
+    def cerca(self, chiave, impronta_attuale):
+        """
+        Il valore in cache se c'è con questa impronta, altrimenti None
+        (senza calcolare nulla: per chi deve calcolare altrove).
+        """
+        with self._lock:
+            voce = self._voci.get(chiave)
+            if voce is None or voce[0] != impronta_attuale:
+                return None
+            self._voci.move_to_end(chiave)
+            self.colpi += 1
+        if self.budget is not None:
+            self.budget.usa(self, chiave)
+        return voce[1]
+
+    def _scarta(self, chiave):
+        with self._lock:
+            self._voci.pop(chiave, None)
+
+    def svuota(self):
+        with self._lock:
+            chiavi = list(self._voci)
+            self._voci.clear()
+        if self.budget is not None:
+            self.budget.rimuovi(self, chiavi)
+
+    def __len__(self):
+        return len(self._voci)
+
+
+_budget = BudgetMemoria()
+_cache_leghe = {}  # base_dir -> CacheLRU
+_lock_leghe = threading.Lock()
+
+def cache_lega(base_dir=None):
+    """
+    La cache in memoria della lega con questa cartella dei round: una per
+    lega, limitata a CAPACITA_LEGA voci e al budget di memoria comune.
+    """
+    base_dir = dati.BASE_DIR if base_dir is None else base_dir
+    with _lock_leghe:
+        cache = _cache_leghe.get(base_dir)
+        if cache is None:
+            cache = _cache_leghe[base_dir] = CacheLRU(CAPACITA_LEGA, _budget)
+        return cache
+
+def stato_cache():
+    """
+    Voci, colpi e mancati di ogni cache di lega, più la memoria usata e il
+    limite comune (in byte).
+    """
+    with _lock_leghe:
+        cache = dict(_cache_leghe)
+    return {
+        "leghe": {str(d): {"voci": len(c), "colpi": c.colpi, "mancati": c.mancati} for d, c in cache.items()},
+        "occupati": _budget.occupati,
+        "massimo": _budget.massimo_byte,
+        "scartate": _budget.scartate,
+    }
+
+
+def get_rounds(base_dir=None):
+    base_dir = dati.BASE_DIR if base_dir is None else base_dir
+    rounds = cache_lega(base_dir).ottieni(("get_rounds", base_dir), impronta(base_dir),
+                                          lambda: dati.get_rounds(base_dir))
+    return list(rounds)
+
+def get_turni(round_dir):
+    turni = cache_lega(round_dir.parent).ottieni(("get_turni", round_dir), impronta(round_dir),
+                                                 lambda: dati.get_turni(round_dir))
+    return list(turni)
+
+def load_turno_csv(round_name, turno_name, base_dir=None):
+    base_dir = dati.BASE_DIR if base_dir is None else base_dir
+    filepath = base_dir / round_name / f"{turno_name}.csv"
+    df = cache_lega(base_dir).ottieni(("load_turno_csv", filepath), impronta(filepath),
+                                      lambda: dati.load_turno_csv(round_name, turno_name, base_dir))
+    # Copia: le pagine aggiungono colonne ai DataFrame che ricevono
+    return None if df is None else df.copy()
+
+def _impronte_turni(base_dir, fino_a=None):
+    # Impronte dei file turno; con fino_a solo i round fino a quello indicato
+    limite = None if fino_a is None else dati.numero(fino_a)
+    return tuple(
+        (r, t, impronta(base_dir / r / f"{t}.csv"))
+        for r in get_rounds(base_dir)
+        if limite is None or dati.numero(r) <= limite
+        for t in get_turni(base_dir / r)
+    )
+
+def _impronta_partizione(round_name, base_dir, percorso):
+    """
+    Impronta delle voci di un round: i file turno di quel round e dei
+    precedenti (l'Elo dipende dalla storia), non quelli dei round successivi.
+    Così la cache è partizionata per round: un round si carica alla prima
+    visita e un risultato nuovo nel round in corso non invalida i vecchi.
+    Senza round valgono tutti i file turno. Solo letture: l'archivio si
+    allinea ai CSV quando una voce si ricalcola (archivio.carica_partite).
+    """
+    return _impronte_turni(base_dir, fino_a=round_name)
+
+@misura(nome="cache.calcola_classifica_punti")
+def calcola_classifica_punti(round_name, turno_name, base_dir=None):
+    base_dir = dati.BASE_DIR if base_dir is None else base_dir
+    impronte = _impronte_turni(base_dir)
+    df = cache_lega(base_dir).ottieni(("calcola_classifica_punti", round_name, turno_name), impronte,
+                                      lambda: leghe.lega_di(base_dir).classifica(round_name, turno_name))
+    return df.copy()
+
+def _partite_compatte(round_name, base_dir, percorso):
+    # Partite complete del round (tutte se None) come ArchivioPartite in cache, condivise: sola lettura
+    return cache_lega(base_dir).ottieni(
+        ("carica_partite", round_name, None, None, (), base_dir, percorso),
+        _impronta_partizione(round_name, base_dir, percorso),
+        lambda: ArchivioPartite.da_dataframe(archivio.carica_partite(round_name, base_dir=base_dir, percorso=percorso)))
+
+@misura(nome="cache.carica_partite")
+def carica_partite(round_name=None, turno_name=None, giocatore=None, colonne=None, base_dir=None, percorso=None):
+    base_dir = dati.BASE_DIR if base_dir is None else base_dir
+    percorso = leghe.lega_di(base_dir).archivio if percorso is None else percorso
+    if turno_name is None and giocatore is None and not colonne:
+        # In cache le partite complete restano in forma compatta, il DataFrame si crea all'uscita
+        return _partite_compatte(round_name, base_dir, percorso).a_dataframe()
+    chiave = ("carica_partite", round_name, turno_name, giocatore, tuple(colonne or ()), base_dir, percorso)
+    df = cache_lega(base_dir).ottieni(
+        chiave, _impronta_partizione(round_name, base_dir, percorso),
+        lambda: archivio.carica_partite(round_name, turno_name, giocatore, colonne, base_dir, percorso))
+    return df.copy()
+
+@misura(nome="cache.indice_giocatori")
+def indice_giocatori(round_name=None, base_dir=None, percorso=None):
+    """
+    Indice giocatore -> partite del round, con gli aggregati cumulativi di
+    tutti i round fino a quello (la posizione è quella della classifica).
+    Costruito sulle partite compatte in cache, solo quando cambiano i dati
+    di quei round. Condiviso (non copiato): è in sola lettura.
+    """
+    base_dir = dati.BASE_DIR if base_dir is None else base_dir
+    percorso = leghe.lega_di(base_dir).archivio if percorso is None else percorso
+
+    def calcola():
+        # Una sola lettura dell'archivio: il round e la storia sono selezioni delle stesse partite
+        tutte = _partite_compatte(None, base_dir, percorso)
+        if round_name is None:
+            return IndiceGiocatori(tutte)
+        n = dati.numero(round_name)
+        return IndiceGiocatori(tutte.seleziona(tutte.round == n), tutte.seleziona(tutte.round <= n))
+
+    return cache_lega(base_dir).ottieni(("indice_giocatori", round_name, base_dir, percorso),
+                                        _impronta_partizione(round_name, base_dir, percorso), calcola)
+
+@misura(nome="cache.statistiche_giocatori")
+def statistiche_giocatori(round_name=None, forma=PARTITE_FORMA, base_dir=None, percorso=None):
+    """
+    Statistiche di tutti i giocatori (serie, forma, rapporti, split per
+    superficie e luogo), calcolate in un passaggio sulle partite compatte
+    dell'indice e ricalcolate solo quando cambiano i dati. Condivise: sola lettura.
+    """
+    base_dir = dati.BASE_DIR if base_dir is None else base_dir
+    percorso = leghe.lega_di(base_dir).archivio if percorso is None else percorso
+    return cache_lega(base_dir).ottieni(
+        ("statistiche_giocatori", round_name, forma, base_dir, percorso),
+        _impronta_partizione(round_name, base_dir, percorso),
+        lambda: StatisticheGiocatori(indice_giocatori(round_name, base_dir, percorso).partite, forma))
+
+@misura(nome="cache.andamento_giocatori")
+def andamento_giocatori(round_name=None, base_dir=None, percorso=None):
+    """
+    Punti cumulati ed Elo di tutti i giocatori turno per turno, fino al
+    round indicato compreso (tutti se None). Ricalcolato solo quando
+    cambiano i dati di quei round; restituisce una copia.
+    """
+    base_dir = dati.BASE_DIR if base_dir is None else base_dir
+    percorso = leghe.lega_di(base_dir).archivio if percorso is None else percorso
+
+    def calcola():
+        tutte = carica_partite(base_dir=base_dir, percorso=percorso)
+        if round_name is not None:
+            tutte = tutte[tutte["Round"] <= dati.numero(round_name)]
+        return _serie_temporali(tutte)
+
+    return cache_lega(base_dir).ottieni(("andamento_giocatori", round_name, base_dir, percorso),
+                                        _impronta_partizione(round_name, base_dir, percorso), calcola).copy()
+
+@misura(nome="cache.proiezione_fase_finale")
+def proiezione_fase_finale(round_name, qualificati=simulazione.QUALIFICATI, n_simulazioni=simulazione.N_SIMULAZIONI,
+                           metodo="elo", base_dir=None, percorso=None):
+    """
+    Simulazione Monte Carlo delle partite rimaste nel round per un
+    tabellone dei primi `qualificati`: (probabilità per giocatore, primi
+    incontri più probabili). Ricalcolata solo quando cambiano i dati del
+    round o dei precedenti; il seme è fisso così la pagina non "balla" tra
+    un rerun e l'altro.
+    """
+    base_dir = dati.BASE_DIR if base_dir is None else base_dir
+    percorso = leghe.lega_di(base_dir).archivio if percorso is None else percorso
+
+    def calcola():
+        tutte = carica_partite(base_dir=base_dir, percorso=percorso)
+        tutte = tutte[tutte["Round"] <= dati.numero(round_name)]  # la storia fino al round
+        partite = tutte[tutte["Round"] == dati.numero(round_name)]
+        future = partite[partite["Vincitore"].isna() | (partite["Vincitore"] == "")]
+        turni = get_turni(base_dir / round_name)
+        attuale = leghe.lega_di(base_dir).classifica(round_name, turni[-1])
+        if metodo == "elo":
+            motore = MotoreElo()
+            motore.replay(tutte)
+            p = simulazione.probabilita_elo([motore.elo(g) for g in future["Player 1"]],
+                                            [motore.elo(g) for g in future["Player 2"]])
+        else:
+            aggregati = indice_giocatori(round_name, base_dir, percorso).aggregati
+            vinti = dict(zip(aggregati["Giocatore"], aggregati["Set Vinti"]))
+            persi = dict(zip(aggregati["Giocatore"], aggregati["Set Persi"]))
+            p = simulazione.probabilita_storico(vinti, persi, future["Player 1"], future["Player 2"])
+        # Parità sciolte come in classifica: scontri giocati fino al round compreso
+        matrici = MatriciScontri.da_partite(tutte)
+        return simulazione.simula_fase_finale(attuale, future, p, n_simulazioni, qualificati, seed=0, matrici=matrici)
+
+    chiave = ("proiezione_fase_finale", round_name, qualificati, n_simulazioni, metodo, base_dir, percorso)
+    probabilita, incontri = cache_lega(base_dir).ottieni(chiave, _impronta_partizione(round_name, base_dir, percorso),
+                                                        calcola)
+    return probabilita.copy(), incontri.copy()
+
+@misura(nome="cache.tabellone_fase_finale")
+def tabellone_fase_finale(round_name, turno_name, qualificati=4, seed=0, base_dir=None, cartella=None):
+    """
+    Tabellone a eliminazione diretta dei primi `qualificati` della
+    classifica al turno indicato. Generato una volta sola per gli stessi
+    dati: in memoria nella cache, su disco in `cartella` con la firma dei
+    file turno da cui viene, così i rerun e i riavvii non lo ricalcolano.
+    """
+    base_dir = dati.BASE_DIR if base_dir is None else base_dir
+    cartella = leghe.lega_di(base_dir).tabelloni if cartella is None else cartella
+    impronte = _impronte_turni(base_dir, fino_a=round_name)
+
+    def calcola():
+        firma = {"impronte": hashlib.sha1(json.dumps(impronte).encode()).hexdigest(),
+                 "qualificati": qualificati, "seed": seed}
+        percorso = cartella / f"{round_name}_{turno_name}_{qualificati}.parquet"
+        salvato = tabellone.carica_tabellone(percorso, firma)
+        if salvato is None:
+            attuale = leghe.lega_di(base_dir).classifica(round_name, turno_name)
+            salvato = tabellone.genera_tabellone({round_name: attuale}, per_girone=qualificati, seed=seed)
+            tabellone.salva_tabellone(salvato, percorso, firma)
+        return salvato
+
+    chiave = ("tabellone_fase_finale", round_name, turno_name, qualificati, seed, base_dir, cartella)
+    return cache_lega(base_dir).ottieni(chiave, impronte, calcola).copy()
@@ -0,0 +1,105 @@
+"""
+Caricamento in blocco dei file turno.
+
+Un solo giro sulla cartella dei round trova tutti i file (con le loro
+impronte), poi i file vengono letti in parallelo su un pool limitato di
+thread (o di processi) e concatenati una volta sola alla fine. L'ordine
+del risultato è sempre quello di (round, turno), qualunque sia l'ordine
+in cui i lavoratori finiscono.
+"""
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from library import dati
+from library.strumenti import misura
+
+# Un lavoratore per core: la lettura (pyarrow) rilascia il GIL, la validazione e la
+# conversione no, quindi più thread dei core aggiungono solo contesa (con un core: niente pool)
+LAVORATORI = min(32, os.cpu_count() or 1)
+# Un file turno si legge in ~3 ms, avviare e chiudere il pool ne costa ~0,15-0,4:
+# bastano pochi file per lavoratore perché il pool convenga già con i 23 turni del repo
+MINIMO_PER_LAVORATORE = 4
+
+FileTurno = namedtuple("FileTurno", ["round", "turno", "percorso", "impronta"])
+
+
+def scopri_turni(base_dir=None):
+    """
+    Tutti i file turno sotto base_dir in ordine (round, turno), con
+    l'impronta (mtime_ns, dimensione) letta durante la stessa scansione.
+    """
+    base_dir = dati.BASE_DIR if base_dir is None else base_dir
+    if not base_dir.exists():
+        return []
+    voci = []
+    with os.scandir(base_dir) as rounds:
+        for r in rounds:
+            if not (r.is_dir() and r.name.startswith("round")):
+                continue
+            with os.scandir(r.path) as turni:
+                for f in turni:
+                    if f.name.startswith("turno_") and f.name.endswith(".csv") and f.is_file():
+                        st = f.stat()
+                        voci.append(FileTurno(r.name, f.name[:-4], base_dir / r.name / f.name,
+                                              (st.st_mtime_ns, st.st_size)))
+    voci.sort(key=lambda v: (dati.numero(v.round), dati.numero(v.turno)))
+    return voci
+
+def mappa(funzione, elementi, lavoratori=None, processi=False):
+    """
+    [funzione(e) for e in elementi] su un pool di al più `lavoratori`
+    thread (o processi, per lavoro CPU in puro Python), nello stesso ordine
+    di `elementi`. Ogni lavoratore riceve un blocco contiguo di almeno
+    MINIMO_PER_LAVORATORE elementi; se non ce ne sono abbastanza per due
+    lavoratori il ciclo resta in questo thread, senza pool.
+    """
+    elementi = list(elementi)
+    lavoratori = min(lavoratori or LAVORATORI, len(elementi) // MINIMO_PER_LAVORATORE)
+    if lavoratori <= 1:
+        return [funzione(e) for e in elementi]
+    blocco = -(-len(elementi) // lavoratori)
+    if processi:
+        with ProcessPoolExecutor(max_workers=lavoratori) as esecutore:
+            return list(esecutore.map(funzione, elementi, chunksize=blocco))
+    blocchi = [elementi[i:i + blocco] for i in range(0, len(elementi), blocco)]
+    with ThreadPoolExecutor(max_workers=lavoratori) as esecutore:
+        return [r for risultati in esecutore.map(lambda b: [funzione(e) for e in b], blocchi) for r in risultati]
+
+def _leggi(voce):
+    # Nel lavoratore: il DataFrame del turno e gli errori di validazione del file
+    from library import validazione
+
+    base_dir = voce.percorso.parent.parent
+    df = dati.load_turno_csv(voce.round, voce.turno, base_dir)
+    return df, validazione.segnalazioni(voce.percorso)
+
+@misura
+def carica_turni(base_dir=None, voci=None, lavoratori=None, processi=False):
+    """
+    Tutti i file turno (o solo `voci`, da scopri_turni) in un unico
+    DataFrame, con le colonne Round e Turno prese dal nome dei file
+    all'inizio. Le segnalazioni di validazione dei lavoratori (anche dei
+    processi) finiscono nel registro di questo processo. Un file sparito
+    tra la scansione e la lettura viene saltato.
+    """
+    from library import validazione
+
+    voci = scopri_turni(base_dir) if voci is None else voci
+    letti = mappa(_leggi, voci, lavoratori, processi)
+    for voce, (_, errori) in zip(voci, letti):
+        validazione.registra(voce.percorso, errori)
+    letti = [(voce, df) for voce, (df, _) in zip(voci, letti) if df is not None]
+    if not letti:
+        return pd.DataFrame(columns=["Round", "Turno"])
+    # Una concat sola, poi Round e Turno dai nomi dei file ripetuti per le righe di ciascuno
+    righe = [len(df) for _, df in letti]
+    tutte = pd.concat([df for _, df in letti], ignore_index=True).drop(columns=["Turno"], errors="ignore")
+    chiavi = pd.DataFrame({
+        "Round": np.repeat([dati.numero(v.round) for v, _ in letti], righe),
+        "Turno": np.repeat([dati.numero(v.turno) for v, _ in letti], righe),
+    })
+    return pd.concat([chiavi, tutte], axis=1)
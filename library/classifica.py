@@ -0,0 +1,160 @@
+import threading
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+from library import dati
+from library.caricamento import mappa, scopri_turni
+from library.spareggi import MatriciScontri, scontri
+from library.strumenti import misura
+
+COLONNE_CLASSIFICA = ["Giocatore", "Punti", "Partite Giocate", "Saldo Set", "Saldo Giochi"]
+
+
+def _scontri_per_file(frame):
+    """
+    spareggi.scontri di ogni file turno letto, calcolati in un solo
+    passaggio sulla concatenazione: a freddo i file sono centinaia e il
+    costo fisso per chiamata supererebbe quello delle partite.
+    """
+    righe = np.cumsum([0] + [0 if df is None else len(df) for df in frame])
+    presenti = [df for df in frame if df is not None and not df.empty]
+    tutte = scontri(pd.concat(presenti, ignore_index=True) if presenti else None)
+    # L'indice di scontri è la riga nella concatenazione: i confini dei file lo dividono
+    confini = np.searchsorted(tutte.index.to_numpy(), righe)
+    return [tutte.iloc[a:b].reset_index(drop=True) for a, b in zip(confini[:-1], confini[1:])]
+
+
+class MotoreClassifica:
+    """
+    Classifiche cumulative precalcolate dopo ogni turno di ogni round.
+
+    Ogni file turno ha un'impronta (mtime, dimensione): a ogni aggiornamento
+    si rilegge solo il file cambiato e si invalidano le classifiche cumulative
+    da quel turno in poi. Ogni classifica si costruisce alla prima richiesta
+    e poi è una semplice lettura da dizionario.
+
+    Gli aggregati sono partizionati per round: le matrici degli scontri
+    (vedi spareggi.py) di un round completo si calcolano una volta e restano
+    valide finché non cambia un suo file; la classifica cumulativa a un
+    turno del round R è la somma delle matrici dei round precedenti più
+    quelle dei turni di R fino a quello chiesto.
+    """
+
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir
+        self._lock = threading.Lock()
+        self._chiavi = []       # [(n_round, n_turno)] in ordine cronologico
+        self._nomi = {}         # (n_round, n_turno) -> (round_name, turno_name)
+        self._impronte = {}     # (n_round, n_turno) -> (mtime_ns, size)
+        self._parziali = {}     # (n_round, n_turno) -> partite complete del turno (spareggi.scontri)
+        self._snapshot = {}     # (n_round, n_turno) -> DataFrame classifica cumulativa
+        self._round = {}        # n_round -> MatriciScontri del round completo
+        self._giocatori = []    # codici dei giocatori condivisi da tutte le matrici
+        self._codici = {}
+
+    def _cartella(self):
+        return self.base_dir if self.base_dir is not None else dati.BASE_DIR
+
+    def _scansiona(self):
+        nomi = {}
+        impronte = {}
+        for voce in scopri_turni(self._cartella()):
+            chiave = (dati.numero(voce.round), dati.numero(voce.turno))
+            nomi[chiave] = (voce.round, voce.turno)
+            impronte[chiave] = voce.impronta
+        return list(nomi), nomi, impronte
+
+    @misura
+    def aggiorna(self):
+        """
+        Rilegge i soli file nuovi o modificati e invalida le classifiche
+        cumulative a partire dal primo turno cambiato.
+        """
+        with self._lock:
+            chiavi, nomi, impronte = self._scansiona()
+
+            primo = None
+            for i, chiave in enumerate(chiavi):
+                if i >= len(self._chiavi) or self._chiavi[i] != chiave or self._impronte.get(chiave) != impronte[chiave]:
+                    primo = i
+                    break
+            if primo is None:
+                if len(chiavi) == len(self._chiavi):
+                    return
+                primo = len(chiavi)  # sono spariti solo turni in coda
+
+            cambiati = [chiave for chiave in chiavi[primo:]
+                        if self._impronte.get(chiave) != impronte[chiave] or chiave not in self._parziali]
+            letti = mappa(lambda chiave: dati.load_turno_csv(*nomi[chiave], self.base_dir), cambiati)
+            for chiave, parziale in zip(cambiati, _scontri_per_file(letti)):
+                self._parziali[chiave] = parziale
+                self._round.pop(chiave[0], None)
+
+            for chiave in set(self._chiavi) - set(chiavi):
+                self._parziali.pop(chiave, None)
+                self._round.pop(chiave[0], None)
+            for chiave in chiavi[primo:] + [c for c in self._snapshot if c not in impronte]:
+                self._snapshot.pop(chiave, None)
+
+            self._chiavi = chiavi
+            self._nomi = nomi
+            self._impronte = impronte
+
+    def _matrici(self, chiavi):
+        # Matrici degli scontri dei turni indicati, nei codici condivisi
+        parziali = [self._parziali[c] for c in chiavi if not self._parziali[c].empty]
+        if not parziali:
+            return MatriciScontri.somma([], self._giocatori)
+        s = pd.concat(parziali, ignore_index=True)
+        for g in pd.unique(pd.concat([s["Player 1"], s["Player 2"]])):
+            if g not in self._codici:
+                self._codici[g] = len(self._giocatori)
+                self._giocatori.append(g)
+        return MatriciScontri.da_codici(
+            list(self._giocatori), s["Player 1"].map(self._codici), s["Player 2"].map(self._codici),
+            s["Punti 1"], s["Punti 2"], s["Set Vinti 1"], s["Set Vinti 2"], s["Giochi 1"], s["Giochi 2"])
+
+    def _matrici_round(self, n_round):
+        matrici = self._round.get(n_round)
+        if matrici is None:
+            matrici = self._round[n_round] = self._matrici([c for c in self._chiavi if c[0] == n_round])
+        return matrici
+
+    @misura(nome="MotoreClassifica.costruisci")
+    def _costruisci(self, i):
+        # Classifica cumulativa fino al turno i-esimo (compreso), con spareggi
+        n_round, _ = self._chiavi[i]
+        precedenti = sorted({c[0] for c in self._chiavi[:i] if c[0] < n_round})
+        parti = [self._matrici_round(r) for r in precedenti]
+        if i + 1 == len(self._chiavi) or self._chiavi[i + 1][0] != n_round:
+            parti.append(self._matrici_round(n_round))  # ultimo turno: il round completo
+        else:
+            parti.append(self._matrici([c for c in self._chiavi[:i + 1] if c[0] == n_round]))
+        return MatriciScontri.somma(parti, list(self._giocatori)).tabella()
+
+    def classifica(self, round_name, turno_name):
+        """
+        Classifica cumulativa di tutti i turni fino a (round_name, turno_name)
+        compreso. Non rilegge file: chiamare aggiorna() per recepire modifiche.
+        """
+        chiave = (dati.numero(round_name), dati.numero(turno_name))
+        with self._lock:
+            # Turno non presente su disco: vale l'ultimo turno precedente
+            i = bisect_right(self._chiavi, chiave) - 1
+            if i < 0:
+                return pd.DataFrame(columns=COLONNE_CLASSIFICA)
+            chiave = self._chiavi[i]
+            snapshot = self._snapshot.get(chiave)
+            if snapshot is None:
+                snapshot = self._snapshot[chiave] = self._costruisci(i)
+            return snapshot
+
+
+_motore = MotoreClassifica()
+
+@misura
+def calcola_classifica_punti(round_name, turno_name):
+    _motore.aggiorna()
+    return _motore.classifica(round_name, turno_name)
@@ -0,0 +1,459 @@
+"""
+Archivio SQLite dei risultati, alternativo ai soli file turno.
+
+Una lega passa al database quando nella sua cartella c'è risultati.sqlite
+(accanto a rounds/): da lì in poi get_rounds, get_turni e load_turno_csv
+leggono dal database, con lookup su indice invece di scansioni dei CSV.
+I file turno restano l'esportazione del database, aggiornata a ogni
+scrittura, così archivio Parquet, classifiche e osservatore continuano a
+funzionare. I CSV restano la fonte: dati.database riporta nel database i
+file nuovi o modificati a mano (importa_csv) prima di ogni lettura, così
+le impronte dei file turno valgono anche per i dati letti dal database.
+
+Uso (dalla radice del repository):
+
+    python -m library.database importa                 # CSV -> operations/output/risultati.sqlite
+    python -m library.database esporta                 # database -> file turno
+    python -m library.database classifica round_1 turno_3
+    python -m library.database giocatore Francesco
+
+Schema normalizzato: giocatori, partite (una riga per partita, giocatori e
+vincitore per id) e set (uno per riga, con il testo originale e i giochi).
+Le scritture sono transazioni: chi legge vede il turno prima o dopo
+l'aggiornamento, mai a metà.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from library import dati
+from library.caricamento import scopri_turni
+from library.punteggio import NUM_SET, SET, parse_set
+from library.spareggi import MatriciScontri
+from library.strumenti import misura
+from library.validazione import COLONNE_ELO, FORMATO_DATA
+
+COLONNE_PARTITA = ["Data", "Orario", "Luogo", "Player 1", "Player 2"] + [f"Set {i + 1}" for i in range(NUM_SET)] + [
+    "Vincitore", "Superficie"] + COLONNE_ELO
+
+SCHEMA = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS giocatori (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS turni (
+    round INTEGER NOT NULL,
+    turno INTEGER NOT NULL,
+    colonne TEXT NOT NULL,          -- intestazione del file turno, per esportarlo uguale
+    impronta TEXT,                  -- "mtime_ns,dimensione" del CSV importato o esportato
+    PRIMARY KEY (round, turno)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS partite (
+    id INTEGER PRIMARY KEY,
+    round INTEGER NOT NULL,
+    turno INTEGER NOT NULL,
+    riga INTEGER NOT NULL,          -- posizione nel file turno
+    data TEXT,                      -- ISO (aaaa-mm-gg); il testo originale se non è una data
+    orario TEXT,
+    luogo TEXT,
+    superficie TEXT,
+    giocatore1 INTEGER NOT NULL REFERENCES giocatori (id),
+    giocatore2 INTEGER NOT NULL REFERENCES giocatori (id),
+    vincitore INTEGER REFERENCES giocatori (id),
+    elo_iniziale1 REAL,
+    elo_iniziale2 REAL,
+    elo_finale1 REAL,
+    elo_finale2 REAL,
+    UNIQUE (round, turno, riga),
+    FOREIGN KEY (round, turno) REFERENCES turni (round, turno) ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS set_partita (
+    partita INTEGER NOT NULL REFERENCES partite (id) ON DELETE CASCADE,
+    numero INTEGER NOT NULL,
+    testo TEXT NOT NULL,
+    giochi1 INTEGER,                -- NULL se il punteggio non è leggibile
+    giochi2 INTEGER,
+    PRIMARY KEY (partita, numero)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS partite_round_turno ON partite (round, turno);
+CREATE INDEX IF NOT EXISTS partite_giocatore1 ON partite (giocatore1);
+CREATE INDEX IF NOT EXISTS partite_giocatore2 ON partite (giocatore2);
+CREATE INDEX IF NOT EXISTS partite_data ON partite (data);
+"""
+
+# Partite complete fino a (:round, :turno) compreso, ridotte a coppie (giocatore, avversario)
+# con punti fatti, saldo set e saldo giochi: 2-0 vale 3 punti, 2-1 ne vale 2, 1-2 uno
+_SCONTRI = """
+WITH giocate AS (
+    SELECT p.id, p.giocatore1 AS g1, p.giocatore2 AS g2,
+           SUM(s.giochi1 > s.giochi2) AS v1, SUM(s.giochi2 > s.giochi1) AS v2,
+           SUM(s.giochi1) AS gi1, SUM(s.giochi2) AS gi2
+    FROM partite AS p JOIN set_partita AS s ON s.partita = p.id AND s.giochi1 IS NOT NULL
+    WHERE p.vincitore IS NOT NULL AND (p.round < :round OR (p.round = :round AND p.turno <= :turno))
+    GROUP BY p.id
+),
+complete AS (
+    SELECT g1, g2, v1, v2, gi1, gi2,
+           CASE WHEN v1 = 2 THEN 3 - v2 ELSE v1 END AS pt1,
+           CASE WHEN v2 = 2 THEN 3 - v1 ELSE v2 END AS pt2
+    FROM giocate
+    WHERE (v1 = 2 AND v2 < 2) OR (v2 = 2 AND v1 < 2)
+),
+lati AS (
+    SELECT g1 AS g, g2 AS avversario, pt1 AS punti, v1 - v2 AS saldo_set, gi1 - gi2 AS saldo_giochi FROM complete
+    UNION ALL
+    SELECT g2, g1, pt2, v2 - v1, gi2 - gi1 FROM complete
+)
+SELECT g.nome, a.nome, SUM(punti), SUM(saldo_set), SUM(saldo_giochi), COUNT(*)
+FROM lati JOIN giocatori AS g ON g.id = lati.g JOIN giocatori AS a ON a.id = lati.avversario
+GROUP BY lati.g, lati.avversario
+"""
+
+# Set giocati (partite con vincitore) dal punto di vista di ciascun giocatore
+_RIEPILOGO = """
+WITH lati AS (
+    SELECT p.id, p.giocatore1 AS g, p.vincitore, s.giochi1 AS fatti, s.giochi2 AS subiti
+    FROM partite AS p JOIN set_partita AS s ON s.partita = p.id AND s.giochi1 IS NOT NULL
+    WHERE p.vincitore IS NOT NULL {filtro}
+    UNION ALL
+    SELECT p.id, p.giocatore2, p.vincitore, s.giochi2, s.giochi1
+    FROM partite AS p JOIN set_partita AS s ON s.partita = p.id AND s.giochi1 IS NOT NULL
+    WHERE p.vincitore IS NOT NULL {filtro}
+)
+SELECT g.nome AS "Giocatore", COUNT(DISTINCT lati.id) AS "Partite",
+       COUNT(DISTINCT CASE WHEN lati.vincitore = lati.g THEN lati.id END) AS "Vinte",
+       SUM(fatti > subiti) AS "Set Vinti", SUM(subiti > fatti) AS "Set Persi",
+       SUM(fatti) AS "Giochi Vinti", SUM(subiti) AS "Giochi Persi"
+FROM lati JOIN giocatori AS g ON g.id = lati.g
+{filtro_giocatore}
+GROUP BY lati.g
+ORDER BY "Vinte" DESC, "Partite", g.nome
+"""
+
+_PARTITE = """
+SELECT p.round, p.turno, p.riga, p.data, p.orario, p.luogo, g1.nome, g2.nome,
+       {set_testo}, v.nome, p.superficie, p.elo_iniziale1, p.elo_iniziale2, p.elo_finale1, p.elo_finale2
+FROM partite AS p
+JOIN giocatori AS g1 ON g1.id = p.giocatore1
+JOIN giocatori AS g2 ON g2.id = p.giocatore2
+LEFT JOIN giocatori AS v ON v.id = p.vincitore
+{set_join}
+"""
+_PARTITE = _PARTITE.format(
+    set_testo=", ".join(f"s{i}.testo" for i in range(1, NUM_SET + 1)),
+    set_join="\n".join(f"LEFT JOIN set_partita AS s{i} ON s{i}.partita = p.id AND s{i}.numero = {i}"
+                       for i in range(1, NUM_SET + 1)),
+) + "{filtro}\nORDER BY p.round, p.turno, p.riga"
+
+
+def _data_iso(testo):
+    # "28/06/2025" -> "2025-06-28"; il testo com'è se non è una data valida
+    data = pd.to_datetime(pd.Series(testo, dtype=object), format=FORMATO_DATA, errors="coerce")
+    return [d.strftime("%Y-%m-%d") if not pd.isna(d) else t for d, t in zip(data, testo)]
+
+def _data_file(iso):
+    data = pd.to_datetime(pd.Series(iso, dtype=object), format="%Y-%m-%d", errors="coerce")
+    return [d.strftime(FORMATO_DATA) if not pd.isna(d) else t for d, t in zip(data, iso)]
+
+def _gira_set(testo):
+    # "7-6(5)" -> "6(5)-7": ogni tiebreak resta con i giochi del suo lato; un testo illeggibile resta com'è
+    trovato = SET.match(testo)
+    if trovato is None:
+        return testo
+    g1, t1, g2, t2 = trovato.groups()
+    return f"{g2}{f'({t2})' if t2 else ''}-{g1}{f'({t1})' if t1 else ''}"
+
+def _testo(valore):
+    # Celle vuote dei CSV (NaN/None/"") -> None
+    return None if valore is None or (isinstance(valore, float) and np.isnan(valore)) or valore == "" else valore
+
+
+class ArchivioSQL:
+    """
+    Il database dei risultati di una lega. Una connessione per operazione
+    (le sessioni Streamlit sono thread diversi); WAL: le letture non
+    aspettano le scritture.
+    """
+
+    def __init__(self, percorso, base_dir=None):
+        self.percorso = Path(percorso)
+        self.base_dir = self.percorso.parent / "rounds" if base_dir is None else base_dir
+        self._lock = threading.Lock()  # una scrittura alla volta tra i thread del processo
+        with closing(self._connetti()) as con:
+            con.executescript(SCHEMA)
+
+    def _connetti(self):
+        con = sqlite3.connect(self.percorso, timeout=30)
+        con.execute("PRAGMA foreign_keys = ON")
+        con.execute("PRAGMA synchronous = NORMAL")
+        return con
+
+    def _id_giocatori(self, con, nomi):
+        nomi = sorted({n for n in nomi if n is not None})
+        con.executemany("INSERT OR IGNORE INTO giocatori (nome) VALUES (?)", [(n,) for n in nomi])
+        return dict(con.execute("SELECT nome, id FROM giocatori"))
+
+    def _scrivi_turno(self, con, n_round, n_turno, df, colonne, impronta=None):
+        # Sostituisce tutte le partite del turno (i set vanno via in cascata)
+        con.execute("DELETE FROM partite WHERE round = ? AND turno = ?", (n_round, n_turno))
+        con.execute("INSERT OR REPLACE INTO turni (round, turno, colonne, impronta) VALUES (?, ?, ?, ?)",
+                    (n_round, n_turno, ",".join(colonne), impronta))
+        if df.empty:
+            return
+        testo = {c: [_testo(v) for v in df[c].tolist()] if c in df.columns else [None] * len(df)
+                 for c in COLONNE_PARTITA}
+        ids = self._id_giocatori(con, testo["Player 1"] + testo["Player 2"] + testo["Vincitore"])
+        elo = {c: pd.to_numeric(pd.Series(testo[c], dtype=object), errors="coerce").tolist() for c in COLONNE_ELO}
+        righe = [
+            (n_round, n_turno, i, d, o, l, s, ids.get(g1), ids.get(g2), ids.get(v), e1, e2, f1, f2)
+            for i, (d, o, l, s, g1, g2, v, e1, e2, f1, f2) in enumerate(zip(
+                _data_iso(testo["Data"]), testo["Orario"], testo["Luogo"], testo["Superficie"], testo["Player 1"],
+                testo["Player 2"], testo["Vincitore"], *(elo[c] for c in COLONNE_ELO)))
+        ]
+        righe = [tuple(None if isinstance(x, float) and np.isnan(x) else x for x in r) for r in righe]
+        con.executemany(
+            "INSERT INTO partite (round, turno, riga, data, orario, luogo, superficie, giocatore1, giocatore2, "
+            "vincitore, elo_iniziale1, elo_iniziale2, elo_finale1, elo_finale2) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", righe)
+        id_partita = dict(con.execute("SELECT riga, id FROM partite WHERE round = ? AND turno = ?",
+                                      (n_round, n_turno)))
+        insiemi = []
+        for n in range(1, NUM_SET + 1):
+            g1, g2 = parse_set(testo[f"Set {n}"], decisivo=n == NUM_SET)
+            insiemi.extend(
+                (id_partita[i], n, t, int(a) if a >= 0 else None, int(b) if b >= 0 else None)
+                for i, (t, a, b) in enumerate(zip(testo[f"Set {n}"], g1, g2)) if t is not None)
+        con.executemany("INSERT INTO set_partita (partita, numero, testo, giochi1, giochi2) VALUES (?, ?, ?, ?, ?)",
+                        insiemi)
+
+    @misura(nome="ArchivioSQL.importa_csv")
+    def importa_csv(self, base_dir=None, tutti=False):
+        """
+        Porta nel database i file turno nuovi o modificati (per impronta;
+        con tutti=True anche quelli invariati) e toglie i turni i cui file
+        non esistono più. Una sola transazione. Restituisce i turni importati.
+        """
+        from library import validazione
+
+        base_dir = self.base_dir if base_dir is None else base_dir
+        with self._lock:
+            voci = scopri_turni(base_dir)
+            with closing(self._connetti()) as con, con:
+                salvate = {(r, t): i for r, t, i in con.execute("SELECT round, turno, impronta FROM turni")}
+                importati = []
+                for voce in voci:
+                    chiave = (dati.numero(voce.round), dati.numero(voce.turno))
+                    impronta = "%d,%d" % voce.impronta
+                    if not tutti and salvate.get(chiave) == impronta:
+                        continue
+                    df, _ = validazione.leggi_turno(voce.percorso, turno=chiave[1])
+                    self._scrivi_turno(con, *chiave, df, list(df.columns), impronta)
+                    importati.append((voce.round, voce.turno))
+                presenti = {(dati.numero(v.round), dati.numero(v.turno)) for v in voci}
+                con.executemany("DELETE FROM turni WHERE round = ? AND turno = ?",
+                                [k for k in salvate if k not in presenti])
+            return importati
+
+    def _esporta_turno(self, con, n_round, n_turno, base_dir):
+        df = self._turno(con, n_round, n_turno)
+        percorso = base_dir / f"round_{n_round}" / f"turno_{n_turno}.csv"
+        percorso.parent.mkdir(parents=True, exist_ok=True)
+        # Scrittura atomica come per l'archivio: chi legge il CSV non lo vede mai a metà
+        temporaneo = percorso.with_suffix(".csv.tmp")
+        df.to_csv(temporaneo, index=False)
+        os.replace(temporaneo, percorso)
+        st = percorso.stat()
+        con.execute("UPDATE turni SET impronta = ? WHERE round = ? AND turno = ?",
+                    ("%d,%d" % (st.st_mtime_ns, st.st_size), n_round, n_turno))
+        return percorso
+
+    @misura(nome="ArchivioSQL.esporta_csv")
+    def esporta_csv(self, base_dir=None, round_name=None):
+        """
+        Scrive i file turno (tutti o quelli di un round) nel formato
+        turno_*.csv, con le colonne del file da cui erano stati importati.
+        """
+        base_dir = self.base_dir if base_dir is None else base_dir
+        with closing(self._connetti()) as con, con:
+            chiavi = con.execute("SELECT round, turno FROM turni" + (" WHERE round = ?" if round_name else "")
+                                 + " ORDER BY round, turno",
+                                 (dati.numero(round_name),) if round_name else ()).fetchall()
+            return [self._esporta_turno(con, r, t, base_dir) for r, t in chiavi]
+
+    def registra_risultato(self, round_name, turno_name, giocatore1, giocatore2, set, vincitore):
+        """
+        Scrive il risultato di una partita del turno (set come ["6-4", "7-6"])
+        e riesporta il file turno, tutto nella stessa transazione.
+        """
+        n_round, n_turno = dati.numero(round_name), dati.numero(turno_name)
+        with self._lock, closing(self._connetti()) as con, con:
+            ids = self._id_giocatori(con, [giocatore1, giocatore2, vincitore])
+            trovata = con.execute("SELECT id, giocatore1 != ? FROM partite WHERE round = ? AND turno = ? AND "
+                                  "((giocatore1 = ? AND giocatore2 = ?) OR (giocatore1 = ? AND giocatore2 = ?))",
+                                  (ids[giocatore1], n_round, n_turno, ids[giocatore1], ids[giocatore2],
+                                   ids[giocatore2], ids[giocatore1])).fetchone()
+            if trovata is None:
+                raise KeyError(f"nessuna partita {giocatore1} - {giocatore2} in {round_name}/{turno_name}")
+            id_partita, invertita = trovata
+            if invertita:
+                # Nel file i giocatori sono nell'ordine opposto: si girano anche i punteggi
+                set = [_gira_set(s) for s in set]
+            g1, g2 = parse_set(list(set), decisivo=np.arange(len(set)) == NUM_SET - 1)
+            con.execute("UPDATE partite SET vincitore = ? WHERE id = ?", (ids[vincitore], id_partita))
+            con.execute("DELETE FROM set_partita WHERE partita = ?", (id_partita,))
+            con.executemany("INSERT INTO set_partita (partita, numero, testo, giochi1, giochi2) VALUES (?, ?, ?, ?, ?)",
+                            [(id_partita, n + 1, t, int(a) if a >= 0 else None, int(b) if b >= 0 else None)
+                             for n, (t, a, b) in enumerate(zip(set, g1, g2))])
+            self._esporta_turno(con, n_round, n_turno, self.base_dir)
+
+    # -- letture --
+
+    def rounds(self):
+        with closing(self._connetti()) as con:
+            return [f"round_{r}" for (r,) in con.execute("SELECT DISTINCT round FROM turni ORDER BY round")]
+
+    def turni(self, round_name):
+        with closing(self._connetti()) as con:
+            return [f"turno_{t}" for (t,) in con.execute("SELECT turno FROM turni WHERE round = ? ORDER BY turno",
+                                                         (dati.numero(round_name),))]
+
+    def _turno(self, con, n_round, n_turno):
+        intestazione = con.execute("SELECT colonne FROM turni WHERE round = ? AND turno = ?",
+                                   (n_round, n_turno)).fetchone()
+        if intestazione is None:
+            return None
+        righe = con.execute(_PARTITE.format(filtro="WHERE p.round = ? AND p.turno = ?"), (n_round, n_turno)).fetchall()
+        valori = list(zip(*righe)) if righe else [()] * (len(COLONNE_PARTITA) + 3)
+        colonne = dict(zip(COLONNE_PARTITA, valori[3:]))
+        colonne["Data"] = _data_file(list(colonne["Data"]))
+        colonne["Turno"] = [str(n_turno)] * len(righe)
+        # Le sole colonne del file originale, in testo come le legge validazione.leggi_turno
+        return pd.DataFrame({c: pd.array(list(colonne[c]), dtype=float if c in COLONNE_ELO else "str")
+                             for c in intestazione[0].split(",")})
+
+    @misura(nome="ArchivioSQL.turno")
+    def turno(self, round_name, turno_name):
+        """
+        Il turno come lo leggerebbe validazione.leggi_turno dal suo CSV
+        (colonne di testo), None se non esiste.
+        """
+        with closing(self._connetti()) as con:
+            return self._turno(con, dati.numero(round_name), dati.numero(turno_name))
+
+    @misura(nome="ArchivioSQL.partite")
+    def partite(self, round_name=None, turno_name=None, giocatore=None, dal=None, al=None):
+        """
+        Partite filtrate per round, turno, giocatore e intervallo di date
+        (datetime o "aaaa-mm-gg"), ognuno su un indice. Colonne come
+        archivio.carica_partite, senza quelle calcolate.
+        """
+        filtri, parametri = [], []
+        if round_name is not None:
+            filtri.append("p.round = ?")
+            parametri.append(dati.numero(round_name))
+        if turno_name is not None:
+            filtri.append("p.turno = ?")
+            parametri.append(dati.numero(turno_name))
+        if giocatore is not None:
+            filtri.append("(p.giocatore1 = (SELECT id FROM giocatori WHERE nome = ?) "
+                          "OR p.giocatore2 = (SELECT id FROM giocatori WHERE nome = ?))")
+            parametri.extend([giocatore, giocatore])
+        if dal is not None:
+            filtri.append("p.data >= ?")
+            parametri.append(pd.Timestamp(dal).strftime("%Y-%m-%d"))
+        if al is not None:
+            filtri.append("p.data <= ?")
+            parametri.append(pd.Timestamp(al).strftime("%Y-%m-%d"))
+        with closing(self._connetti()) as con:
+            righe = con.execute(_PARTITE.format(filtro="WHERE " + " AND ".join(filtri) if filtri else ""),
+                                parametri).fetchall()
+        df = pd.DataFrame(righe, columns=["Round", "Turno", "Riga"] + COLONNE_PARTITA).drop(columns="Riga")
+        df["Data"] = pd.to_datetime(df["Data"], format="%Y-%m-%d", errors="coerce")
+        return df
+
+    @misura(nome="ArchivioSQL.classifica")
+    def classifica(self, round_name, turno_name):
+        """
+        Classifica cumulativa fino a (round_name, turno_name) compreso: i
+        totali per coppia di giocatori sono un'aggregazione SQL, l'ordine
+        con gli scontri diretti è quello di spareggi.MatriciScontri, quindi
+        il risultato è identico a classifica.calcola_classifica_punti.
+        """
+        with closing(self._connetti()) as con:
+            coppie = con.execute(_SCONTRI, {"round": dati.numero(round_name), "turno": dati.numero(turno_name)}
+                                 ).fetchall()
+        giocatori = sorted({c[0] for c in coppie})
+        codici = {g: i for i, g in enumerate(giocatori)}
+        n = len(giocatori)
+        matrici = [np.zeros((n, n), dtype=np.int32) for _ in range(4)]
+        if coppie:
+            g, a, punti, saldo_set, saldo_giochi, partite = zip(*coppie)
+            indice = ([codici[x] for x in g], [codici[x] for x in a])
+            for matrice, valori in zip(matrici, (punti, saldo_set, saldo_giochi, partite)):
+                matrice[indice] = valori
+        return MatriciScontri(giocatori, *matrici).tabella()
+
+    @misura(nome="ArchivioSQL.riepilogo_giocatori")
+    def riepilogo_giocatori(self, round_name=None, giocatore=None):
+        """
+        Partite, vittorie, set e giochi vinti e persi di ogni giocatore (o
+        di uno solo) sulle partite giocate, aggregati in SQL.
+        """
+        filtro = "AND p.round = :round" if round_name is not None else ""
+        filtro_giocatore = "WHERE g.nome = :giocatore" if giocatore is not None else ""
+        parametri = {"round": dati.numero(round_name) if round_name is not None else None, "giocatore": giocatore}
+        with closing(self._connetti()) as con:
+            cursore = con.execute(_RIEPILOGO.format(filtro=filtro, filtro_giocatore=filtro_giocatore), parametri)
+            return pd.DataFrame(cursore.fetchall(), columns=[c[0] for c in cursore.description])
+
+
+_archivi = {}
+_lock = threading.Lock()
+
+def apri(percorso, base_dir=None):
+    """
+    L'ArchivioSQL di un file (uno per processo), creando lo schema se serve.
+    """
+    chiave = (Path(percorso), base_dir)
+    with _lock:
+        if chiave not in _archivi:
+            _archivi[chiave] = ArchivioSQL(percorso, base_dir)
+        return _archivi[chiave]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("comando", choices=["importa", "esporta", "classifica", "giocatore"])
+    parser.add_argument("argomenti", nargs="*")
+    parser.add_argument("--base-dir", type=Path, default=dati.BASE_DIR)
+    parser.add_argument("--database", type=Path, default=None, help="predefinito: accanto a --base-dir")
+    args = parser.parse_args(argv)
+
+    archivio = apri(args.database or args.base_dir.parent / dati.DATABASE, args.base_dir)
+    if args.comando == "importa":
+        importati = archivio.importa_csv(tutti=True)
+        print(f"{len(importati)} turni importati in {archivio.percorso}")
+    elif args.comando == "esporta":
+        scritti = archivio.esporta_csv(round_name=args.argomenti[0] if args.argomenti else None)
+        print(f"{len(scritti)} file turno scritti in {archivio.base_dir}")
+    elif args.comando == "classifica":
+        if len(args.argomenti) != 2:
+            parser.error("classifica vuole ROUND TURNO")
+        print(archivio.classifica(*args.argomenti).to_string(index=False))
+    else:
+        if len(args.argomenti) != 1:
+            parser.error("giocatore vuole NOME")
+        print(archivio.riepilogo_giocatori(giocatore=args.argomenti[0]).to_string(index=False))
+        print(archivio.partite(giocatore=args.argomenti[0]).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from library.punteggio import SET
+from library.strumenti import misura
+
+BASE_DIR = Path("operations/output/rounds")
+# Database dei risultati accanto alla cartella dei round: se c'è, i loader leggono da lì (vedi library.database)
+DATABASE = "risultati.sqlite"
+
+
+def numero(nome):
+    # "round_12" -> 12, "turno_3" -> 3: ordina numericamente (round_10 dopo round_9)
+    return int(nome.split("_")[1])
+
+def database(base_dir=None):
+    """
+    L'archivio SQLite della lega di base_dir, None se la lega usa solo i CSV.
+    Prima di restituirlo vi riporta i file turno nuovi o modificati: i CSV
+    restano la fonte, il database non è mai più vecchio dei file.
+    """
+    base_dir = BASE_DIR if base_dir is None else base_dir
+    percorso = base_dir.parent / DATABASE
+    if not percorso.exists():
+        return None
+    from library.database import apri
+
+    db = apri(percorso, base_dir)
+    db.importa_csv(base_dir)
+    return db
+
+@misura
+def get_rounds(base_dir=None):
+    base_dir = BASE_DIR if base_dir is None else base_dir
+    db = database(base_dir)
+    if db is not None:
+        return db.rounds()
+    rounds = sorted([d.name for d in base_dir.iterdir() if d.is_dir() and d.name.startswith("round")], key=numero)
+    return rounds
+
+@misura
+def get_turni(round_dir):
+    db = database(round_dir.parent)
+    if db is not None:
+        return db.turni(round_dir.name)
+    turni = sorted([f.stem for f in round_dir.glob("turno_*.csv")], key=numero)
+    return turni
+
+@misura
+def load_turno_csv(round_name, turno_name, base_dir=None):
+    base_dir = BASE_DIR if base_dir is None else base_dir
+    db = database(base_dir)
+    if db is not None:
+        df = db.turno(round_name, turno_name)
+        return None if df is None else tipizza_turno(df)
+    filepath = base_dir / round_name / f"{turno_name}.csv"
+    if not filepath.exists():
+        return None
+    from library import validazione
+
+    # Lettura tipizzata e validata: gli errori restano in validazione.segnalazioni()
+    tabella, _ = validazione.leggi_tabella(filepath, turno=numero(turno_name))
+    return tipizza_turno(tabella)
+
+def tipizza_turno(tabella):
+    """
+    Colonne di un file turno letto come testo (tabella Arrow dal CSV o
+    DataFrame dal database): Turno ed Elo numerici, Elo iniziale 1500 se
+    manca. Una colonna obbligatoria assente (già segnalata da validazione)
+    arriva vuota, così un file sbagliato non ferma archivio e classifiche.
+    """
+    from library.validazione import COLONNE_ELO, COLONNE_OBBLIGATORIE, numerica
+
+    # Tipi sistemati in Arrow e una sola conversione in DataFrame alla fine
+    if isinstance(tabella, pd.DataFrame):
+        tabella = pa.Table.from_pandas(tabella, preserve_index=False)
+    n = tabella.num_rows
+    colonne = dict(zip(tabella.column_names, tabella.columns))
+    for col in COLONNE_OBBLIGATORIE:
+        colonne.setdefault(col, pa.nulls(n, pa.string()))
+    if "Turno" in colonne:
+        colonne["Turno"] = numerica(colonne["Turno"])
+    for col in COLONNE_ELO:
+        if col in colonne:
+            colonne[col] = numerica(colonne[col])
+        elif "iniziale" in col:
+            colonne[col] = pa.array(np.full(n, 1500.0))
+        else:
+            colonne[col] = pa.nulls(n)
+    return pa.table(colonne).to_pandas()
+
+def estrai_giocatori(df):
+    return sorted(set(df["Player 1"]).union(df["Player 2"]))
+
+def estrai_punteggio(set_str):
+    # Giochi di un set secondo la grammatica punteggio.SET, (None, None) se non leggibile
+    parti = SET.match(set_str) if isinstance(set_str, str) else None
+    if parti is None:
+        return (None, None)
+    return int(parti.group(1)), int(parti.group(3))
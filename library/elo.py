@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+from library.punteggio import NUM_SET, calcola_punteggi
+from library.strumenti import misura
+
+ELO_INIZIALE = 1500.0
+COLONNE_ELO = ["Elo iniziale 1", "Elo iniziale 2", "Elo 1 Finale", "Elo 2 Finale"]
+
+
+def moltiplicatore_margine(diff_set, diff_giochi, diff_elo_vincitore, margine):
+    """
+    Peso del margine di vittoria (vettoriale).
+    margine=None: nessun peso; "set": 2-0 vale più di 2-1;
+    "giochi": logaritmo della differenza giochi (almeno 1, anche per le
+    vittorie al terzo con pochi giochi di scarto), con la correzione di
+    FiveThirtyEight per non gonfiare i rating dei favoriti.
+    """
+    if margine is None:
+        return np.ones_like(diff_elo_vincitore, dtype=float)
+    if margine == "set":
+        return np.log1p(np.abs(diff_set)) / np.log(2)
+    if margine == "giochi":
+        return np.log1p(np.maximum(np.abs(diff_giochi), 1)) * 2.2 / (diff_elo_vincitore * 0.001 + 2.2)
+    raise ValueError(f"Margine sconosciuto: {margine!r} (usa None, 'set' o 'giochi')")
+
+def _variazione(r1, r2, esito1, diff_set, diff_giochi, k, margine, scala):
+    # Variazione del rating del giocatore 1 (quella del 2 è opposta)
+    atteso1 = 1.0 / (1.0 + 10.0 ** ((r2 - r1) / scala))
+    diff_elo_vincitore = np.where(esito1 == 1.0, r1 - r2, r2 - r1)
+    return k * moltiplicatore_margine(diff_set, diff_giochi, diff_elo_vincitore, margine) * (esito1 - atteso1)
+
+
+class MotoreElo:
+    """
+    Rating Elo di tutti i giocatori.
+
+    replay() ricalcola l'intera storia in un passaggio vettoriale per turno:
+    nello stesso turno ogni giocatore gioca al più una partita, quindi tutte
+    le partite del turno si aggiornano insieme. registra() applica un nuovo
+    risultato in O(1), toccando solo i due rating coinvolti; va usato per
+    risultati in ordine cronologico (la correzione di una partita vecchia
+    richiede un replay).
+    """
+
+    def __init__(self, k=32.0, margine="giochi", iniziale=ELO_INIZIALE, scala=400.0):
+        self.k = k
+        self.margine = margine
+        self.iniziale = iniziale
+        self.scala = scala
+        self.indici = {}                    # giocatore -> posizione in self.rating
+        self.rating = np.empty(0, dtype=float)
+
+    def _indice(self, giocatori):
+        nuovi = [g for g in dict.fromkeys(giocatori) if g not in self.indici]
+        for g in nuovi:
+            self.indici[g] = len(self.indici)
+        if nuovi:
+            self.rating = np.concatenate([self.rating, np.full(len(nuovi), self.iniziale)])
+        return np.fromiter((self.indici[g] for g in giocatori), dtype=np.int64, count=len(giocatori))
+
+    def elo(self, giocatore):
+        i = self.indici.get(giocatore)
+        return self.iniziale if i is None else float(self.rating[i])
+
+    def classifica(self):
+        return pd.DataFrame({"Giocatore": list(self.indici), "Elo": self.rating}) \
+            .sort_values("Elo", ascending=False).reset_index(drop=True)
+
+    def registra(self, p1, p2, set_vinti_1, set_vinti_2, diff_giochi=0):
+        """
+        Nuovo risultato: aggiorna solo i rating di p1 e p2.
+        Restituisce (elo iniziale 1, elo iniziale 2, elo finale 1, elo finale 2).
+        """
+        i1, i2 = self._indice([p1, p2])
+        r1, r2 = self.rating[i1], self.rating[i2]
+        esito1 = np.array(1.0 if set_vinti_1 > set_vinti_2 else 0.0)
+        delta = float(_variazione(r1, r2, esito1, np.array(set_vinti_1 - set_vinti_2), np.array(diff_giochi),
+                                  self.k, self.margine, self.scala))
+        self.rating[i1] += delta
+        self.rating[i2] -= delta
+        return r1, r2, r1 + delta, r2 - delta
+
+    def replay(self, df):
+        """
+        Ricalcola da zero su tutte le partite di df (ordinate per Round, Turno)
+        e restituisce le quattro colonne Elo allineate all'indice di df.
+        Le partite non giocate o incomplete ricevono il rating iniziale
+        corrente e nessun rating finale.
+        """
+        self.indici = {}
+        self.rating = np.empty(0, dtype=float)
+        n = len(df)
+        out = pd.DataFrame(np.nan, index=df.index, columns=COLONNE_ELO)
+        if n == 0:
+            return out
+
+        chiavi = [c for c in ("Round", "Turno") if c in df.columns]
+        ordine = np.lexsort([df[c].to_numpy() for c in reversed(chiavi)]) if chiavi else np.arange(n)
+
+        i1 = self._indice(df["Player 1"].to_numpy()[ordine].tolist())
+        i2 = self._indice(df["Player 2"].to_numpy()[ordine].tolist())
+
+        punteggi = calcola_punteggi(df.iloc[ordine])
+        vincitore = df["Vincitore"].iloc[ordine].astype(object)
+        giocata = (vincitore.notna() & (vincitore != "")).to_numpy() & punteggi["Completa"].to_numpy()
+        vinti1 = punteggi["Set Vinti 1"].to_numpy().astype(float)
+        vinti2 = punteggi["Set Vinti 2"].to_numpy().astype(float)
+        giochi1 = np.stack([punteggi[f"Giochi 1 Set {i + 1}"].to_numpy() for i in range(NUM_SET)], axis=1)
+        giochi2 = np.stack([punteggi[f"Giochi 2 Set {i + 1}"].to_numpy() for i in range(NUM_SET)], axis=1)
+        validi = (giochi1 >= 0) & (giochi2 >= 0)
+        diff_giochi = np.where(validi, giochi1.astype(float) - giochi2, 0.0).sum(axis=1)
+        esito1 = (vinti1 > vinti2).astype(float)
+
+        iniziale1 = np.empty(n)
+        iniziale2 = np.empty(n)
+        finale1 = np.full(n, np.nan)
+        finale2 = np.full(n, np.nan)
+
+        # Confini dei turni nell'ordine cronologico
+        if chiavi:
+            gruppi = np.stack([df[c].to_numpy()[ordine] for c in chiavi], axis=1)
+            inizi = np.flatnonzero(np.r_[True, (gruppi[1:] != gruppi[:-1]).any(axis=1)])
+        else:
+            inizi = np.array([0])
+        fini = np.r_[inizi[1:], n]
+
+        for a, b in zip(inizi, fini):
+            j1, j2 = i1[a:b], i2[a:b]
+            r1, r2 = self.rating[j1], self.rating[j2]
+            iniziale1[a:b], iniziale2[a:b] = r1, r2
+            g = giocata[a:b]
+            if not g.any():
+                continue
+            delta = np.where(g, _variazione(r1, r2, esito1[a:b], vinti1[a:b] - vinti2[a:b], diff_giochi[a:b],
+                                            self.k, self.margine, self.scala), 0.0)
+            # np.add.at gestisce anche un giocatore con due partite nello stesso turno
+            np.add.at(self.rating, j1, delta)
+            np.add.at(self.rating, j2, -delta)
+            finale1[a:b] = np.where(g, r1 + delta, np.nan)
+            finale2[a:b] = np.where(g, r2 - delta, np.nan)
+
+        posizioni = np.empty(n, dtype=np.int64)
+        posizioni[ordine] = np.arange(n)
+        out["Elo iniziale 1"] = iniziale1[posizioni]
+        out["Elo iniziale 2"] = iniziale2[posizioni]
+        out["Elo 1 Finale"] = finale1[posizioni]
+        out["Elo 2 Finale"] = finale2[posizioni]
+        return out
+
+
+@misura
+def calcola_elo(df, k=32.0, margine="giochi", iniziale=ELO_INIZIALE, scala=400.0):
+    """
+    Colonne "Elo iniziale 1/2" e "Elo 1/2 Finale" per tutte le partite di df,
+    ricalcolate sull'intera storia cronologica.
+    """
+    return MotoreElo(k=k, margine=margine, iniziale=iniziale, scala=scala).replay(df)
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from library.partite import ArchivioPartite
+from library.punteggio import PUNTI_P1, PUNTI_P2
+from library.spareggi import MatriciScontri
+from library.strumenti import misura
+
+
+def _compatte(partite, dizionari=None):
+    if isinstance(partite, pd.DataFrame):
+        return ArchivioPartite.da_dataframe(partite.reset_index(drop=True), dizionari)
+    if dizionari is not None and partite.dizionari is not dizionari:
+        raise ValueError("partite e storia devono avere gli stessi dizionari (selezioni dello stesso archivio)")
+    return partite
+
+
+class IndiceGiocatori:
+    """
+    Indice giocatore -> righe delle sue partite, costruito una volta per
+    versione dei dati.
+
+    Le righe di ogni giocatore sono memorizzate in formato CSR (un unico
+    array di posizioni più gli offset di inizio per giocatore), quindi
+    trovare le partite di un giocatore è una slice, non una scansione.
+    Insieme all'indice vengono precalcolati gli aggregati per giocatore
+    (punti, partite, saldo set e giochi, posizione con spareggi) sulla
+    `storia`: le partite di tutti i round fino a quello indicizzato, come
+    la classifica cumulativa. Senza storia valgono le partite indicizzate.
+    Tutto si calcola sugli array di ArchivioPartite, senza DataFrame.
+    """
+
+    @misura(nome="IndiceGiocatori")
+    def __init__(self, partite, storia=None):
+        # Le partite restano in forma compatta; i DataFrame si creano solo per le righe chieste
+        self.partite = _compatte(partite)
+        storia = self.partite if storia is None else _compatte(storia, self.partite.dizionari)
+        n, m = len(self.partite), len(storia)
+        ids, inverso = np.unique(np.concatenate([self.partite.player1, self.partite.player2,
+                                                 storia.player1, storia.player2]), return_inverse=True)
+        # Codici in ordine di nome, come la lista dei giocatori
+        nomi = self.partite.dizionari.giocatori.decodifica(ids).astype(str)
+        per_nome = np.argsort(nomi, kind="stable")
+        rango = np.empty(len(ids), dtype=np.int64)
+        rango[per_nome] = np.arange(len(ids))
+        inverso = rango[inverso]
+        self.giocatori = nomi[per_nome].tolist()
+        self._codici = {g: i for i, g in enumerate(self.giocatori)}
+        c1, c2 = inverso[:n], inverso[n:2 * n]
+        s1, s2 = inverso[2 * n:2 * n + m], inverso[2 * n + m:]
+
+        # CSR: per ogni giocatore le sue righe, in ordine di riga
+        codici = np.concatenate([c1, c2])
+        righe = np.concatenate([np.arange(n), np.arange(n)])
+        ordine = np.lexsort((righe, codici))
+        self._righe = righe[ordine]
+        self._inizi = np.searchsorted(codici[ordine], np.arange(len(self.giocatori) + 1))
+        self._giocata = self.partite.vincitore >= 0
+
+        # Aggregati per giocatore sulle sole partite giocate e complete della storia
+        giochi1 = storia.giochi[:, :, 0].astype(np.int64)
+        giochi2 = storia.giochi[:, :, 1].astype(np.int64)
+        set_giocato = (giochi1 >= 0) & (giochi2 >= 0)
+        vinti1 = (set_giocato & (giochi1 > giochi2)).sum(axis=1)
+        vinti2 = (set_giocato & (giochi2 > giochi1)).sum(axis=1)
+        punti1, punti2 = PUNTI_P1[vinti1, vinti2], PUNTI_P2[vinti1, vinti2]
+        valida = (storia.vincitore >= 0) & (punti1 >= 0)
+        tot_giochi1 = np.where(set_giocato, giochi1, 0).sum(axis=1)
+        tot_giochi2 = np.where(set_giocato, giochi2, 0).sum(axis=1)
+
+        def somma(pesi1, pesi2):
+            pesi1 = np.where(valida, pesi1, 0)
+            pesi2 = np.where(valida, pesi2, 0)
+            return (np.bincount(s1, weights=pesi1, minlength=len(self.giocatori))
+                    + np.bincount(s2, weights=pesi2, minlength=len(self.giocatori))).astype(np.int64)
+
+        self.aggregati = pd.DataFrame({
+            "Giocatore": self.giocatori,
+            "Punti": somma(punti1, punti2),
+            "Partite Giocate": somma(1, 1),
+            "Set Vinti": somma(vinti1, vinti2),
+            "Set Persi": somma(vinti2, vinti1),
+            "Giochi Vinti": somma(tot_giochi1, tot_giochi2),
+            "Giochi Persi": somma(tot_giochi2, tot_giochi1),
+        })
+        self.aggregati["Saldo Set"] = self.aggregati["Set Vinti"] - self.aggregati["Set Persi"]
+        self.aggregati["Saldo Giochi"] = self.aggregati["Giochi Vinti"] - self.aggregati["Giochi Persi"]
+
+        # Posizione con gli stessi spareggi della classifica (scontri diretti, saldi, nome),
+        # contando come la classifica i soli giocatori con almeno una partita completa (gli altri 0)
+        matrici = MatriciScontri.da_codici(
+            self.giocatori, s1[valida], s2[valida], punti1[valida], punti2[valida], vinti1[valida], vinti2[valida],
+            tot_giochi1[valida], tot_giochi2[valida])
+        ordine = matrici.ordine()
+        ordine = ordine[self.aggregati["Partite Giocate"].to_numpy()[ordine] > 0]
+        posizione = np.zeros(len(self.giocatori), dtype=np.int64)
+        posizione[ordine] = np.arange(1, len(ordine) + 1)
+        self.aggregati["Posizione"] = posizione
+
+    def righe(self, giocatore):
+        """
+        Posizioni (in self.partite) delle partite del giocatore.
+        """
+        i = self._codici.get(giocatore)
+        if i is None:
+            return np.empty(0, dtype=np.int64)
+        return self._righe[self._inizi[i]:self._inizi[i + 1]]
+
+    def giocate(self, giocatore):
+        righe = self.righe(giocatore)
+        return self.partite.a_dataframe(righe[self._giocata[righe]])
+
+    def future(self, giocatore):
+        righe = self.righe(giocatore)
+        return self.partite.a_dataframe(righe[~self._giocata[righe]])
+
+    def statistiche(self, giocatore):
+        """
+        Aggregati cumulativi del giocatore come dizionario, None se non ha
+        ancora partite complete.
+        """
+        i = self._codici.get(giocatore)
+        if i is None or self.aggregati.at[i, "Partite Giocate"] == 0:
+            return None
+        return self.aggregati.iloc[i].to_dict()
@@ -0,0 +1,128 @@
+"""
+Registro delle leghe servite dallo stesso processo.
+
+Ogni lega ha una cartella dati con la struttura di operations/output
+(rounds/, partite.parquet, tabelloni/ e, se la lega usa il database,
+risultati.sqlite: vedi library.database). Le leghe si dichiarano in
+operations/leghe.json come {nome: cartella}:
+
+    {"sabato": "operations/leghe/sabato", "over50": "operations/leghe/over50"}
+
+La lega predefinita ("principale", su operations/output) c'è sempre. Il
+file si rilegge quando cambia: una lega nuova non richiede un riavvio.
+Le cache in memoria di ogni lega stanno in library.cache.
+"""
+import json
+import threading
+from pathlib import Path
+
+from library import dati
+
+REGISTRO = Path("operations/leghe.json")
+PREDEFINITA = "principale"
+
+
+class Lega:
+    """
+    Una lega: nome, cartella dei dati e percorsi che ne derivano, più il
+    suo motore delle classifiche (creato alla prima richiesta).
+    """
+
+    def __init__(self, nome, cartella):
+        self.nome = nome
+        self.cartella = Path(cartella)
+        self.base_dir = self.cartella / "rounds"
+        self.archivio = self.cartella / "partite.parquet"
+        self.tabelloni = self.cartella / "tabelloni"
+        self.database = self.cartella / dati.DATABASE
+        self._motore = None
+        self._lock = threading.Lock()
+
+    @property
+    def motore(self):
+        with self._lock:
+            if self._motore is None:
+                from library import classifica
+
+                # La lega predefinita usa il motore del modulo, quello che aggiorna anche l'osservatore
+                predefinita = self.base_dir == dati.BASE_DIR
+                self._motore = classifica._motore if predefinita else classifica.MotoreClassifica(self.base_dir)
+            return self._motore
+
+    def classifica(self, round_name, turno_name):
+        """
+        Classifica cumulativa fino a (round_name, turno_name) compreso:
+        aggregata in SQL se la lega ha il database, altrimenti dal motore.
+        """
+        db = dati.database(self.base_dir)
+        if db is not None:
+            return db.classifica(round_name, turno_name)
+        self.motore.aggiorna()
+        return self.motore.classifica(round_name, turno_name)
+
+    def __repr__(self):
+        return f"Lega({self.nome!r}, {str(self.cartella)!r})"
+
+
+class RegistroLeghe:
+    def __init__(self, percorso=REGISTRO):
+        self.percorso = percorso
+        self._lock = threading.Lock()
+        self._impronta = None
+        self._leghe = {}
+        self._altre = {}  # base_dir -> Lega per le cartelle non registrate
+
+    def _aggiorna(self):
+        # Rilegge il file solo se è cambiato; le leghe rimaste uguali tengono il loro motore
+        try:
+            st = self.percorso.stat()
+            impronta = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            impronta = None
+        if self._leghe and impronta == self._impronta:
+            return
+        dichiarate = json.loads(self.percorso.read_text(encoding="utf-8")) if impronta is not None else {}
+        cartelle = {PREDEFINITA: dati.BASE_DIR.parent, **{n: Path(c) for n, c in dichiarate.items()}}
+        self._leghe = {nome: self._leghe[nome] if nome in self._leghe and self._leghe[nome].cartella == cartella
+                       else Lega(nome, cartella) for nome, cartella in cartelle.items()}
+        self._impronta = impronta
+
+    def nomi(self):
+        with self._lock:
+            self._aggiorna()
+            return list(self._leghe)
+
+    def lega(self, nome=None):
+        with self._lock:
+            self._aggiorna()
+            nome = PREDEFINITA if nome is None else nome
+            if nome not in self._leghe:
+                raise KeyError(f"lega sconosciuta: {nome}")
+            return self._leghe[nome]
+
+    def lega_di(self, base_dir=None):
+        """
+        La lega con questa cartella dei round; per una cartella non
+        registrata (benchmark, prove) una lega anonima accanto ai suoi dati.
+        """
+        base_dir = dati.BASE_DIR if base_dir is None else base_dir
+        with self._lock:
+            self._aggiorna()
+            for lega in self._leghe.values():
+                if lega.base_dir == base_dir:
+                    return lega
+            if base_dir not in self._altre:
+                self._altre[base_dir] = Lega(str(base_dir), base_dir.parent)
+            return self._altre[base_dir]
+
+
+_registro = RegistroLeghe()
+
+def nomi():
+    return _registro.nomi()
+
+def lega(nome=None):
+    return _registro.lega(nome)
+
+def lega_di(base_dir=None):
+    return _registro.lega_di(base_dir)
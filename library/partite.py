@@ -0,0 +1,281 @@
+import sys
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from library.punteggio import NUM_SET, parse_set
+from library.elo import COLONNE_ELO
+
+_EPOCA = date(1970, 1, 1)
+_DATA_MANCANTE = np.iinfo(np.int32).min
+
+
+class Dizionario:
+    """
+    Tabella di internamento testo <-> id intero di un archivio: ogni nome,
+    luogo, superficie o punteggio di set è memorizzato una volta sola, le
+    partite contengono solo gli id (-1 = mancante). Cresce solo con i
+    valori distinti dell'archivio e sparisce con lui.
+    """
+
+    def __init__(self):
+        self.valori = []
+        self._id = {}
+        self._lock = threading.Lock()
+
+    def codifica(self, colonna, dtype=np.int32):
+        serie = pd.Series(colonna, dtype=object)
+        serie = serie.where(serie.notna() & (serie != ""), None)
+        codici, distinti = pd.factorize(serie, use_na_sentinel=True)
+        massimo = np.iinfo(dtype).max
+        with self._lock:
+            ids = np.empty(len(distinti), dtype=np.int64)
+            for i, valore in enumerate(distinti):
+                valore = str(valore)
+                ids[i] = self._id.get(valore, -1)
+                if ids[i] < 0:
+                    if len(self.valori) > massimo:
+                        raise OverflowError(f"più di {massimo + 1} valori distinti: gli id non stanno in "
+                                            f"{np.dtype(dtype).name}")
+                    ids[i] = self._id[valore] = len(self.valori)
+                    self.valori.append(valore)
+        return np.where(codici >= 0, ids[codici] if len(ids) else 0, -1).astype(dtype)
+
+    def decodifica(self, ids):
+        # Array di oggetti con None per i mancanti
+        tabella = np.array(self.valori + [None], dtype=object)
+        return tabella[np.where(ids >= 0, ids, len(self.valori))]
+
+    def categorie(self, ids):
+        # Categoriale con le sole categorie presenti, senza ricreare le stringhe
+        presenti, codici = np.unique(ids[ids >= 0], return_inverse=True)
+        tutti = np.full(len(ids), -1, dtype=np.int64)
+        tutti[ids >= 0] = codici
+        return pd.Categorical.from_codes(tutti, categories=[self.valori[i] for i in presenti], validate=False)
+
+    def id(self, valore):
+        return self._id.get(valore, -1)
+
+    @property
+    def nbytes(self):
+        return sum(sys.getsizeof(v) for v in self.valori)
+
+
+class Dizionari:
+    """
+    I dizionari di un archivio, uno per tipo di testo. Le selezioni di un
+    archivio (seleziona) li condividono, così i loro id restano confrontabili.
+    """
+
+    __slots__ = ("giocatori", "luoghi", "superfici", "orari", "set")
+
+    def __init__(self):
+        for nome in self.__slots__:
+            setattr(self, nome, Dizionario())
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, nome).nbytes for nome in self.__slots__)
+
+
+class Partita:
+    """
+    Vista su una riga di ArchivioPartite: nessuna copia, gli attributi
+    vengono letti dagli array (e decodificati) solo quando servono.
+    """
+
+    __slots__ = ("_archivio", "_i")
+
+    def __init__(self, archivio, i):
+        self._archivio = archivio
+        self._i = i
+
+    def _testo(self, dizionario, ids):
+        i = ids[self._i]
+        return dizionario.valori[i] if i >= 0 else None
+
+    @property
+    def round(self):
+        return int(self._archivio.round[self._i])
+
+    @property
+    def turno(self):
+        return int(self._archivio.turno[self._i])
+
+    @property
+    def data(self):
+        giorni = self._archivio.data[self._i]
+        return None if giorni == _DATA_MANCANTE else _EPOCA + timedelta(days=int(giorni))
+
+    @property
+    def orario(self):
+        return self._testo(self._archivio.dizionari.orari, self._archivio.orario)
+
+    @property
+    def luogo(self):
+        return self._testo(self._archivio.dizionari.luoghi, self._archivio.luogo)
+
+    @property
+    def player1(self):
+        return self._testo(self._archivio.dizionari.giocatori, self._archivio.player1)
+
+    @property
+    def player2(self):
+        return self._testo(self._archivio.dizionari.giocatori, self._archivio.player2)
+
+    @property
+    def vincitore(self):
+        return self._testo(self._archivio.dizionari.giocatori, self._archivio.vincitore)
+
+    @property
+    def superficie(self):
+        return self._testo(self._archivio.dizionari.superfici, self._archivio.superficie)
+
+    @property
+    def set(self):
+        return tuple(self._testo(self._archivio.dizionari.set, self._archivio.set[:, s]) for s in range(NUM_SET))
+
+    @property
+    def giochi(self):
+        # ((giochi 1, giochi 2) per set), -1 se il set non è stato giocato
+        g = self._archivio.giochi[self._i]
+        return tuple((int(g[s, 0]), int(g[s, 1])) for s in range(NUM_SET))
+
+    @property
+    def giocata(self):
+        return bool(self._archivio.vincitore[self._i] >= 0)
+
+    @property
+    def elo(self):
+        return tuple(float(x) for x in self._archivio.elo[self._i])
+
+    def __repr__(self):
+        return f"Partita({self.round}, {self.turno}, {self.player1!r} vs {self.player2!r}, {self.set})"
+
+
+class ArchivioPartite:
+    """
+    Partite in forma compatta, una colonna per array NumPy:
+    - giocatori, luoghi, superfici, orari e punteggi dei set come id int32
+      nei dizionari dell'archivio (`dizionari`, condivisi dalle sue selezioni),
+    - date come giorni dal 1970 (int32), giochi per set come int8,
+    - Elo in float32.
+    I DataFrame esistono solo ai bordi: da_dataframe() quando i dati
+    arrivano, a_dataframe() quando una pagina li deve mostrare.
+    """
+
+    COLONNE = ("round", "turno", "data", "orario", "luogo", "player1", "player2", "set", "vincitore",
+               "superficie", "elo", "giochi")
+    __slots__ = COLONNE + ("dizionari",)
+
+    def __init__(self, dizionari, **colonne):
+        self.dizionari = dizionari
+        for nome in self.COLONNE:
+            setattr(self, nome, colonne[nome])
+
+    @classmethod
+    def da_dataframe(cls, df, dizionari=None):
+        """
+        Da un DataFrame nel formato dell'archivio (o di un file turno: Turno
+        e Round mancanti valgono 0, le colonne Giochi si ricavano dai set).
+        Con `dizionari` i testi si codificano in quelli (per confrontare gli
+        id con un altro archivio), altrimenti in dizionari nuovi.
+        """
+        d = Dizionari() if dizionari is None else dizionari
+        n = len(df)
+        date = df["Data"]
+        if not pd.api.types.is_datetime64_any_dtype(date):
+            date = pd.to_datetime(date, format="%d/%m/%Y", errors="coerce")  # testo dei file turno
+        giorni = (date.to_numpy().astype("datetime64[D]") - np.datetime64("1970-01-01", "D")).astype(np.int64)
+        giorni = np.where(date.isna().to_numpy(), _DATA_MANCANTE, giorni).astype(np.int32)
+
+        giochi = np.empty((n, NUM_SET, 2), dtype=np.int8)
+        for s in range(NUM_SET):
+            if f"Giochi 1 Set {s + 1}" in df.columns:
+                giochi[:, s, 0] = df[f"Giochi 1 Set {s + 1}"].to_numpy()
+                giochi[:, s, 1] = df[f"Giochi 2 Set {s + 1}"].to_numpy()
+            else:
+                g1, g2 = parse_set(df[f"Set {s + 1}"], decisivo=s == NUM_SET - 1)
+                giochi[:, s, 0], giochi[:, s, 1] = g1, g2
+
+        def intero(colonna):
+            if colonna not in df.columns:
+                return np.zeros(n, dtype=np.int16)
+            return pd.to_numeric(df[colonna], errors="coerce").fillna(0).to_numpy().astype(np.int16)
+
+        return cls(
+            d,
+            round=intero("Round"),
+            turno=intero("Turno"),
+            data=giorni,
+            orario=d.orari.codifica(df["Orario"]),
+            luogo=d.luoghi.codifica(df["Luogo"]),
+            player1=d.giocatori.codifica(df["Player 1"]),
+            player2=d.giocatori.codifica(df["Player 2"]),
+            vincitore=d.giocatori.codifica(df["Vincitore"]),
+            superficie=d.superfici.codifica(df["Superficie"]),
+            set=np.stack([d.set.codifica(df[f"Set {s + 1}"]) for s in range(NUM_SET)], axis=1),
+            elo=np.stack([pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float64) for c in COLONNE_ELO],
+                         axis=1).astype(np.float32),
+            giochi=giochi,
+        )
+
+    def a_dataframe(self, righe=None):
+        """
+        DataFrame nel formato di archivio.carica_partite (stesse colonne e
+        tipi), delle sole righe indicate se `righe` non è None.
+        """
+        a = self if righe is None else self.seleziona(righe)
+        d = self.dizionari
+        date = np.where(a.data == _DATA_MANCANTE, np.datetime64("NaT"),
+                        np.datetime64("1970-01-01", "D") + a.data.astype("timedelta64[D]"))
+        # Tutte le colonne in un dict e un solo costruttore: inserirle una alla volta costa di più
+        colonne = {
+            "Round": a.round,
+            "Turno": a.turno,
+            "Data": date.astype("datetime64[s]"),
+            "Orario": pd.array(d.orari.decodifica(a.orario), dtype="str"),
+            "Luogo": d.luoghi.categorie(a.luogo),
+            "Player 1": d.giocatori.categorie(a.player1),
+            "Player 2": d.giocatori.categorie(a.player2),
+        }
+        for s in range(NUM_SET):
+            colonne[f"Set {s + 1}"] = pd.array(d.set.decodifica(a.set[:, s]), dtype="str")
+        colonne["Vincitore"] = d.giocatori.categorie(a.vincitore)
+        colonne["Superficie"] = d.superfici.categorie(a.superficie)
+        for k, colonna in enumerate(COLONNE_ELO):
+            # Arrotondato alla precisione del float32, senza cifre spurie
+            colonne[colonna] = np.round(a.elo[:, k].astype(np.float64), 3)
+        for s in range(NUM_SET):
+            colonne[f"Giochi 1 Set {s + 1}"] = a.giochi[:, s, 0]
+            colonne[f"Giochi 2 Set {s + 1}"] = a.giochi[:, s, 1]
+        df = pd.DataFrame(colonne)
+        return df
+
+    def seleziona(self, righe):
+        """
+        Sotto-archivio con le sole righe indicate (indici o maschera), con
+        gli stessi dizionari.
+        """
+        return ArchivioPartite(self.dizionari, **{nome: getattr(self, nome)[righe] for nome in self.COLONNE})
+
+    def righe_giocatore(self, giocatore):
+        i = self.dizionari.giocatori.id(giocatore)
+        return np.flatnonzero((self.player1 == i) | (self.player2 == i)) if i >= 0 else np.empty(0, dtype=np.int64)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, nome).nbytes for nome in self.COLONNE) + self.dizionari.nbytes
+
+    def __len__(self):
+        return len(self.round)
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return Partita(self, i % len(self))
+
+    def __iter__(self):
+        return (Partita(self, i) for i in range(len(self)))
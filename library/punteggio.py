@@ -0,0 +1,107 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from library.strumenti import misura
+
+NUM_SET = 3
+
+# Punti in base ai set vinti (set giocatore 1, set giocatore 2); -1 = partita incompleta
+PUNTI_P1 = np.full((NUM_SET + 1, NUM_SET + 1), -1, dtype=np.int8)
+PUNTI_P1[2, 0], PUNTI_P1[2, 1], PUNTI_P1[1, 2], PUNTI_P1[0, 2] = 3, 2, 1, 0
+PUNTI_P2 = PUNTI_P1.T.copy()
+
+# Grammatica di un set, unica per classifica e validazione: "6-4", "7-6(5)", "6(3)-7", spazi
+# ammessi attorno ai numeri
+SET = re.compile(r"^\s*(\d{1,2})\s*(?:\((\d{1,2})\))?\s*-\s*(\d{1,2})\s*(?:\((\d{1,2})\))?\s*$")
+
+
+def set_possibile(giochi1, giochi2, tiebreak=False, decisivo=False):
+    """
+    Regole di un set, le stesse per classifica e validazione: un set finisce
+    6-0..6-4, 7-5 o 7-6 e il tiebreak "(5)" si indica solo sul 7-6; il set
+    decisivo può essere un match tiebreak a 10 con due punti di scarto
+    (10-8, 12-10). Vettoriale: accetta scalari o array.
+    """
+    giochi1, giochi2 = np.asarray(giochi1), np.asarray(giochi2)
+    alto, basso = np.maximum(giochi1, giochi2), np.minimum(giochi1, giochi2)
+    normale = ((alto == 6) & (basso <= 4)) | ((alto == 7) & ((basso == 5) | (basso == 6)))
+    tiebreak = np.asarray(tiebreak)
+    normale &= ~tiebreak | (basso == 6)
+    match_tiebreak = (alto >= 10) & (alto - basso >= 2) & ((alto == 10) | (alto - basso == 2)) & ~tiebreak
+    return (basso >= 0) & (normale | (np.asarray(decisivo) & match_tiebreak))
+
+def leggi_testi(testi):
+    """
+    Giochi (g1, g2) e tiebreak indicato di ogni testo secondo SET: -1, -1
+    per i testi mancanti o non conformi. Da chiamare sui valori distinti
+    di una colonna (sono pochi), come fanno parse_set e la validazione.
+    """
+    g1 = np.full(len(testi), -1, dtype=np.int16)
+    g2 = np.full(len(testi), -1, dtype=np.int16)
+    tiebreak = np.zeros(len(testi), dtype=bool)
+    for i, testo in enumerate(testi):
+        parti = SET.match(testo) if isinstance(testo, str) else None
+        if parti is not None:
+            g1[i], g2[i] = int(parti.group(1)), int(parti.group(3))
+            tiebreak[i] = parti.group(2) is not None or parti.group(4) is not None
+    return g1, g2, tiebreak
+
+def parse_set(colonna, decisivo=False):
+    """
+    Converte una colonna di stringhe "6-4", "7-6(5)" nei giochi dei due
+    giocatori (array int16, -1 se il set manca, non rispetta la grammatica
+    SET o non rispetta set_possibile). `decisivo` (anche un array per
+    riga) ammette il match tiebreak. I punteggi distinti sono pochi: si
+    analizzano solo quelli, senza cicli Python sulle righe, e si riportano
+    su tutta la colonna per indice.
+    """
+    codici, distinti = pd.factorize(pd.Series(colonna, dtype=object))
+    g1, g2, tiebreak = leggi_testi(distinti)
+    # Sentinella per i valori mancanti (codice -1 di factorize)
+    g1, g2 = np.append(g1, np.int16(-1))[codici], np.append(g2, np.int16(-1))[codici]
+    possibile = set_possibile(g1, g2, np.append(tiebreak, False)[codici], decisivo)
+    return np.where(possibile, g1, -1).astype(np.int16), np.where(possibile, g2, -1).astype(np.int16)
+
+@misura
+def calcola_punteggi(df):
+    """
+    Punteggio di tutte le partite del DataFrame in un colpo solo.
+
+    Restituisce un DataFrame con lo stesso indice e le colonne
+    "Giochi 1 Set i"/"Giochi 2 Set i" (-1 se il set manca), "Set Vinti 1",
+    "Set Vinti 2", "Punti 1", "Punti 2" (-1 se la partita è incompleta)
+    e "Completa".
+    """
+    giochi1 = np.empty((len(df), NUM_SET), dtype=np.int16)
+    giochi2 = np.empty((len(df), NUM_SET), dtype=np.int16)
+    for i in range(NUM_SET):
+        giochi1[:, i], giochi2[:, i] = parse_set(df[f"Set {i + 1}"], decisivo=i == NUM_SET - 1)
+
+    giocato = (giochi1 >= 0) & (giochi2 >= 0)
+    vinti1 = (giocato & (giochi1 > giochi2)).sum(axis=1)
+    vinti2 = (giocato & (giochi2 > giochi1)).sum(axis=1)
+    punti1 = PUNTI_P1[vinti1, vinti2]
+    punti2 = PUNTI_P2[vinti1, vinti2]
+
+    risultato = {}
+    for i in range(NUM_SET):
+        risultato[f"Giochi 1 Set {i + 1}"] = giochi1[:, i]
+        risultato[f"Giochi 2 Set {i + 1}"] = giochi2[:, i]
+    risultato["Set Vinti 1"] = vinti1.astype(np.int8)
+    risultato["Set Vinti 2"] = vinti2.astype(np.int8)
+    risultato["Punti 1"] = punti1
+    risultato["Punti 2"] = punti2
+    risultato["Completa"] = punti1 >= 0
+    return pd.DataFrame(risultato, index=df.index)
+
+def linee_set(punteggi):
+    """
+    Righe "6 7 -" dei giochi per set di ciascun giocatore, come mostrate nelle card.
+    """
+    linee = []
+    for g in (1, 2):
+        colonne = punteggi[[f"Giochi {g} Set {i + 1}" for i in range(NUM_SET)]].astype(str).replace("-1", "-")
+        linee.append(colonne.agg(" ".join, axis=1))
+    return linee[0], linee[1]
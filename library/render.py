@@ -0,0 +1,245 @@
+import json
+import math
+from pathlib import Path
+
+from library.punteggio import calcola_punteggi, linee_set
+from library.strumenti import misura
+
+PARTITE_PER_PAGINA = 20
+ALTEZZA_CARD = 190
+ALTEZZA_MASSIMA = 1200
+
+STILE_VINCITORE = "font-weight: 800; color: #2e7d32;"  # verde vittoria
+STILE_SCONFITTO = "font-weight: 600; color: #b71c1c;"  # rosso sconfitta
+
+# Una sola card come template: i dati arrivano in JSON e il browser la
+# ripete per ogni partita, così il markup viaggia una volta per pagina.
+_TEMPLATE = """
+<style>
+  body { margin: 0; }
+  .card-wrap { width: 100%; display: flex; justify-content: flex-start; }
+  .card {
+      border-radius: 10px;
+      padding: 16px 20px;
+      margin-bottom: 14px;
+      background: linear-gradient(135deg, #fff5b7, #fbd72b);
+      box-shadow: 0 2px 20px rgba(0, 0, 0, 0.05);
+      font-family: 'Segoe UI', sans-serif;
+      width: 100%;
+      max-width: 500px;
+  }
+  .testa { display: flex; justify-content: space-between; margin-bottom: 12px; font-size: 15px; color: #777; }
+  .corpo { display: flex; justify-content: space-between; align-items: flex-start; }
+  .nome { font-size: 18px; margin-bottom: 6px; }
+  .vince { __VINCE__ }
+  .perde { __PERDE__ }
+  .set1 { font-size: 16px; margin-bottom: 10px; }
+  .set2 { font-size: 16px; }
+  .punti { text-align: right; font-size: 16px; font-weight: bold; }
+</style>
+<div id="partite"></div>
+<template id="card">
+  <div class="card-wrap">
+    <div class="card">
+      <div class="testa">
+        <div>📍 <strong data-campo="luogo"></strong></div>
+        <div data-campo="data"></div>
+        <div data-campo="superficie"></div>
+      </div>
+      <div class="corpo">
+        <div style="text-align: left;">
+          <div class="nome" data-campo="p1"></div>
+          <div class="set1" data-campo="linea1"></div>
+          <div class="nome" data-campo="p2"></div>
+          <div class="set2" data-campo="linea2"></div>
+        </div>
+        <div class="punti">
+          <div style="margin-bottom: 26px;" data-campo="punti1"></div>
+          <div data-campo="punti2"></div>
+        </div>
+      </div>
+    </div>
+  </div>
+</template>
+<script>
+  const partite = __PARTITE__;
+  const lista = document.getElementById("partite");
+  const modello = document.getElementById("card").content;
+  const frammento = document.createDocumentFragment();
+  for (const p of partite) {
+    const card = modello.cloneNode(true);
+    for (const el of card.querySelectorAll("[data-campo]")) {
+      el.textContent = p[el.dataset.campo];
+    }
+    card.querySelector('[data-campo="p1"]').classList.add(p.vince1 ? "vince" : "perde");
+    card.querySelector('[data-campo="p2"]').classList.add(p.vince2 ? "vince" : "perde");
+    frammento.appendChild(card);
+  }
+  lista.appendChild(frammento);
+</script>
+"""
+
+
+@misura
+def dati_card(df, colonna_data="Data"):
+    """
+    Campi delle card di tutte le partite giocate di df, calcolati per colonna
+    (punteggi compresi) e restituiti come lista di dizionari serializzabili.
+    """
+    if df.empty:
+        return []
+    punteggi = calcola_punteggi(df)
+    linea1, linea2 = linee_set(punteggi)
+    completa = punteggi["Completa"].to_numpy()
+    punti1 = [f"{p} pt" if c else "- pt" for p, c in zip(punteggi["Punti 1"].tolist(), completa)]
+    punti2 = [f"{p} pt" if c else "- pt" for p, c in zip(punteggi["Punti 2"].tolist(), completa)]
+    vincitore = df["Vincitore"].astype(object)
+    vince1 = (df["Player 1"].astype(object) == vincitore).tolist()
+    vince2 = (df["Player 2"].astype(object) == vincitore).tolist()
+
+    campi = zip(df["Luogo"].astype(str), df[colonna_data].astype(str), df["Superficie"].astype(str),
+                df["Player 1"].astype(str), df["Player 2"].astype(str), linea1, linea2, punti1, punti2, vince1, vince2)
+    return [
+        {"luogo": l, "data": d, "superficie": s, "p1": g1, "p2": g2, "linea1": s1, "linea2": s2,
+         "punti1": pt1, "punti2": pt2, "vince1": v1, "vince2": v2}
+        for l, d, s, g1, g2, s1, s2, pt1, pt2, v1, v2 in campi
+    ]
+
+@misura
+def html_partite(card):
+    """
+    Documento HTML unico per una lista di card (vedi dati_card) e altezza
+    consigliata per il componente; oltre ALTEZZA_MASSIMA il componente scorre.
+    """
+    partite = json.dumps(card, ensure_ascii=False).replace("</", "<\\/")
+    documento = (_TEMPLATE.replace("__VINCE__", STILE_VINCITORE)
+                 .replace("__PERDE__", STILE_SCONFITTO)
+                 .replace("__PARTITE__", partite))
+    return documento, min(max(len(card), 1) * ALTEZZA_CARD, ALTEZZA_MASSIMA)
+
+def numero_pagine(n_partite, per_pagina=PARTITE_PER_PAGINA):
+    return max(1, math.ceil(n_partite / per_pagina))
+
+@misura
+def mostra_partite(df, chiave, colonna_data="Data", per_pagina=PARTITE_PER_PAGINA):
+    """
+    Mostra le partite giocate di df in un solo componente HTML, una pagina
+    alla volta: al browser arrivano solo le card della pagina corrente.
+    """
+    import streamlit as st
+    from streamlit.components.v1 import html
+
+    pagine = numero_pagine(len(df), per_pagina)
+    pagina = 1
+    if pagine > 1:
+        pagina = st.number_input("Pagina", min_value=1, max_value=pagine, value=1, step=1, key=chiave)
+    inizio = (pagina - 1) * per_pagina
+    documento, altezza = html_partite(dati_card(df.iloc[inizio:inizio + per_pagina], colonna_data))
+    html(documento, height=altezza, scrolling=altezza >= ALTEZZA_MASSIMA)
+
+def scegli_lega(etichetta="Lega"):
+    """
+    Lega della sessione (vedi library.leghe): con più leghe registrate un
+    selettore nella sidebar, legato a ?lega= nell'URL così un link apre
+    direttamente la lega giusta. La scelta resta in session_state.
+    """
+    import streamlit as st
+    from library import leghe
+
+    nomi = leghe.nomi()
+    scelta = st.query_params.get("lega") or st.session_state.get("lega_selezionata")
+    if scelta not in nomi:
+        scelta = nomi[0]
+    if len(nomi) > 1:
+        scelta = st.sidebar.selectbox(etichetta, nomi, index=nomi.index(scelta))
+        st.query_params["lega"] = scelta
+    st.session_state["lega_selezionata"] = scelta
+    return leghe.lega(scelta)
+
+def scegli_round(etichetta="Seleziona Round", base_dir=None):
+    """
+    Selettore del round condiviso da tutte le pagine: la scelta resta in
+    session_state passando da una pagina all'altra. All'inizio (o se il
+    round non esiste nella lega di base_dir) propone l'ultimo round con
+    almeno una partita giocata.
+    """
+    import streamlit as st
+    from library.cache import carica_partite, get_rounds
+
+    rounds = get_rounds(base_dir)
+    if not rounds:
+        st.error("Nessun round trovato.")
+        st.stop()
+
+    scelto = st.session_state.get("round_selezionato")
+    if scelto not in rounds:
+        giocate = carica_partite(colonne=["Round", "Vincitore"], base_dir=base_dir).dropna(subset=["Vincitore"])
+        in_corso = f"round_{giocate['Round'].max()}" if not giocate.empty else rounds[0]
+        scelto = in_corso if in_corso in rounds else rounds[0]
+
+    scelto = st.selectbox(etichetta, rounds, index=rounds.index(scelto))
+    st.session_state["round_selezionato"] = scelto
+    return scelto
+
+def scegli_scheda(schede, chiave):
+    """
+    Al posto di st.tabs: le schede di st.tabs eseguono tutte il loro codice
+    a ogni rerun, qui la pagina sa quale è aperta e calcola solo i dati di
+    quella. La scelta resta in session_state.
+    """
+    import streamlit as st
+
+    return st.radio("Sezione", schede, key=chiave, horizontal=True, label_visibility="collapsed")
+
+def mostra_segnalazioni(base_dir=None):
+    """
+    Avviso nella sidebar con gli errori trovati nei file turno (vedi
+    library.validazione) della lega di base_dir: le righe non valide
+    restano nei dati ma chi pubblica i risultati deve saperlo.
+    """
+    import streamlit as st
+    from library import dati
+    from library.validazione import formatta, segnalazioni
+
+    cartella = dati.BASE_DIR if base_dir is None else base_dir
+    errori = {p: e for p, e in segnalazioni().items() if Path(p).parent.parent == cartella}
+    if not errori:
+        return
+    totale = sum(len(e) for e in errori.values())
+    with st.sidebar.expander(f"⚠️ {totale} errori nei file turno", expanded=False):
+        for percorso, elenco in sorted(errori.items()):
+            st.markdown(f"**{percorso}**")
+            st.code("\n".join(formatta(e) for e in elenco), language="text")
+
+def grafico_andamento(serie, colonna="Punti", evidenzia=None, soglia=None):
+    """
+    Grafico plotly dell'andamento (Punti o Elo) di tutti i giocatori da
+    cache.andamento_giocatori(). Le storie lunghe vengono ridotte con LTTB
+    prima di disegnare; con `evidenzia` un giocatore è in primo piano e gli
+    altri restano sullo sfondo in grigio.
+    """
+    import plotly.graph_objects as go
+    from library.serie import PUNTI_GRAFICO, riduci
+
+    ridotta = riduci(serie, colonna, soglia or PUNTI_GRAFICO)
+    figura = go.Figure()
+    for giocatore, righe in ridotta.groupby("Giocatore", sort=True):
+        primo_piano = evidenzia is None or giocatore == evidenzia
+        figura.add_trace(go.Scattergl(
+            x=righe["Passo"], y=righe[colonna], name=giocatore, mode="lines+markers" if primo_piano else "lines",
+            line={"width": 3 if giocatore == evidenzia else 1.5, **({} if primo_piano else {"color": "#cccccc"})},
+            customdata=list(zip(righe["Round"], righe["Turno"])),
+            hovertemplate=f"<b>{giocatore}</b><br>Round %{{customdata[0]}} · Turno %{{customdata[1]}}"
+                          f"<br>{colonna}: %{{y}}<extra></extra>",
+            showlegend=primo_piano,
+        ))
+    # Etichette dei turni sull'asse x (al più ~12, per leggibilità)
+    passi = serie.drop_duplicates("Passo").sort_values("Passo")
+    passi = passi.iloc[::max(1, len(passi) // 12)]
+    figura.update_layout(
+        xaxis={"tickmode": "array", "tickvals": passi["Passo"],
+               "ticktext": [f"R{r} T{t}" for r, t in zip(passi["Round"], passi["Turno"])], "title": "Turno"},
+        yaxis={"title": colonna}, height=420, margin={"l": 10, "r": 10, "t": 30, "b": 10},
+        legend={"orientation": "h"}, hovermode="closest",
+    )
+    return figura
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from library.elo import ELO_INIZIALE, MotoreElo
+from library.punteggio import calcola_punteggi
+from library.strumenti import misura
+
+PUNTI_GRAFICO = 300  # punti per giocatore oltre i quali il grafico viene ridotto con LTTB
+
+
+@misura
+def serie_temporali(df, motore=None):
+    """
+    Punti cumulati ed Elo di ogni giocatore dopo ogni turno, in un solo
+    passaggio: i punti (e l'ultimo Elo) di ogni partita finiscono in una
+    matrice turno x giocatore, poi una somma cumulata (e un riempimento in
+    avanti per l'Elo) lungo i turni dà tutta la storia. Nessun ricalcolo
+    della classifica turno per turno.
+
+    Restituisce un DataFrame lungo: Giocatore, Passo (0, 1, ... in ordine
+    cronologico), Round, Turno, Data (ultima partita del turno), Punti, Elo.
+    """
+    colonne = ["Giocatore", "Passo", "Round", "Turno", "Data", "Punti", "Elo"]
+    if df is None or df.empty:
+        return pd.DataFrame(columns=colonne)
+    df = df.reset_index(drop=True)
+    elo = (motore or MotoreElo()).replay(df)
+    punteggi = calcola_punteggi(df)
+    vincitore = df["Vincitore"].astype(object)
+    valida = (vincitore.notna() & (vincitore != "")).to_numpy() & punteggi["Completa"].to_numpy()
+
+    giocatori, inverso = np.unique(np.concatenate([df["Player 1"].astype(str).to_numpy(),
+                                                   df["Player 2"].astype(str).to_numpy()]), return_inverse=True)
+    n, k = len(df), len(giocatori)
+    c1, c2 = inverso[:n], inverso[n:]
+
+    # Passi: i turni con almeno una partita valida, in ordine (Round, Turno)
+    round_ = df["Round"].to_numpy().astype(np.int64) if "Round" in df.columns else np.zeros(n, dtype=np.int64)
+    turno = df["Turno"].to_numpy().astype(np.int64)
+    chiave = round_ * 10_000 + turno
+    passi, passo = np.unique(chiave[valida], return_inverse=True)
+    m = len(passi)
+    if m == 0:
+        return pd.DataFrame(columns=colonne)
+    c1, c2 = c1[valida], c2[valida]
+
+    punti = np.zeros((m, k), dtype=np.int32)
+    np.add.at(punti, (passo, c1), punteggi["Punti 1"].to_numpy()[valida])
+    np.add.at(punti, (passo, c2), punteggi["Punti 2"].to_numpy()[valida])
+    punti = np.cumsum(punti, axis=0)
+
+    # Elo: valore dopo l'ultima partita del turno, poi riempito in avanti
+    rating = np.full((m, k), np.nan)
+    rating[passo, c1] = elo["Elo 1 Finale"].to_numpy()[valida]
+    rating[passo, c2] = elo["Elo 2 Finale"].to_numpy()[valida]
+    presente = ~np.isnan(rating)
+    ultimo = np.maximum.accumulate(np.where(presente, np.arange(m)[:, None], -1), axis=0)
+    rating = np.where(ultimo >= 0, rating[np.maximum(ultimo, 0), np.arange(k)], ELO_INIZIALE)
+
+    date = df["Data"]
+    if not pd.api.types.is_datetime64_any_dtype(date):
+        date = pd.to_datetime(date, format="%d/%m/%Y", errors="coerce")
+    data_passo = pd.Series(date.to_numpy()[valida]).groupby(passo).max().reindex(range(m)).to_numpy()
+
+    return pd.DataFrame({
+        "Giocatore": np.repeat(giocatori, m),
+        "Passo": np.tile(np.arange(m), k),
+        "Round": np.tile(passi // 10_000, k),
+        "Turno": np.tile(passi % 10_000, k),
+        "Data": np.tile(data_passo, k),
+        "Punti": punti.T.ravel().astype(np.int64),
+        "Elo": np.round(rating.T.ravel(), 1),
+    }, columns=colonne)
+
+def lttb(x, y, soglia):
+    """
+    Largest-Triangle-Three-Buckets: indici di `soglia` punti della serie
+    (x, y) che ne conservano la forma (primo e ultimo sempre inclusi). Per
+    ogni intervallo si tiene il punto che forma il triangolo più grande con
+    il punto scelto prima e la media dell'intervallo successivo.
+    `y` può essere una matrice (una serie per riga, stessa x): il ciclo è
+    sugli intervalli, vettoriale su tutte le serie insieme.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    singola = y.ndim == 1
+    y = np.atleast_2d(y)
+    k, n = y.shape
+    if soglia >= n or soglia < 3:
+        scelti = np.broadcast_to(np.arange(n), (k, n))
+        return scelti[0] if singola else scelti
+    bordi = np.linspace(1, n - 1, soglia - 1).astype(np.int64)
+    scelti = np.empty((k, soglia), dtype=np.int64)
+    scelti[:, 0], scelti[:, -1] = 0, n - 1
+    righe = np.arange(k)
+    a = np.zeros(k, dtype=np.int64)
+    for i in range(soglia - 2):
+        inizio, fine = bordi[i], bordi[i + 1]
+        dopo = bordi[i + 2] if i + 2 < len(bordi) else n
+        mx, my = x[fine:dopo].mean(), y[:, fine:dopo].mean(axis=1)
+        xa, ya = x[a][:, None], y[righe, a][:, None]
+        area = np.abs((xa - mx) * (y[:, inizio:fine] - ya) - (xa - x[inizio:fine]) * (my[:, None] - ya))
+        a = inizio + np.argmax(area, axis=1)
+        scelti[:, i + 1] = a
+    return scelti[0] if singola else scelti
+
+def riduci(serie, colonna, soglia=PUNTI_GRAFICO):
+    """
+    Serie di serie_temporali() ridotta con LTTB giocatore per giocatore,
+    sulla colonna da disegnare: le storie corte restano intatte.
+    """
+    if serie.empty:
+        return serie
+    # serie_temporali dà a ogni giocatore gli stessi passi: una matrice giocatore x passo
+    m = serie["Passo"].nunique()
+    valori = serie[colonna].to_numpy().reshape(-1, m)
+    scelti = lttb(np.arange(m), valori, soglia)
+    return serie.iloc[(scelti + np.arange(len(valori))[:, None] * m).ravel()]
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+from library.punteggio import NUM_SET, calcola_punteggi
+
+COLONNE_SCONTRI = ["Player 1", "Player 2", "Punti 1", "Punti 2", "Set Vinti 1", "Set Vinti 2",
+                   "Giochi 1", "Giochi 2"]
+
+
+def scontri(df):
+    """
+    Le sole partite giocate e complete, ridotte a quello che serve per la
+    classifica: giocatori, punti, set vinti e giochi totali di ciascuno.
+    L'indice è quello delle righe di `df` da cui vengono.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=COLONNE_SCONTRI)
+    vincitore = df["Vincitore"].astype(object)
+    df = df[(vincitore.notna() & (vincitore != "")).to_numpy()]
+    punteggi = calcola_punteggi(df)
+    complete = punteggi["Completa"].to_numpy()
+
+    giochi = {}
+    for g in (1, 2):
+        colonne = np.stack([punteggi[f"Giochi {g} Set {i + 1}"].to_numpy() for i in range(NUM_SET)], axis=1)
+        giochi[g] = np.where(colonne >= 0, colonne, 0).sum(axis=1)
+
+    return pd.DataFrame({
+        "Player 1": df["Player 1"].astype(str).to_numpy()[complete],
+        "Player 2": df["Player 2"].astype(str).to_numpy()[complete],
+        "Punti 1": punteggi["Punti 1"].to_numpy()[complete],
+        "Punti 2": punteggi["Punti 2"].to_numpy()[complete],
+        "Set Vinti 1": punteggi["Set Vinti 1"].to_numpy()[complete],
+        "Set Vinti 2": punteggi["Set Vinti 2"].to_numpy()[complete],
+        "Giochi 1": giochi[1][complete],
+        "Giochi 2": giochi[2][complete],
+    }, columns=COLONNE_SCONTRI, index=df.index[complete])
+
+
+class MatriciScontri:
+    """
+    Matrici dense giocatore x giocatore costruite una volta dalle partite:
+    - punti[i, j]: punti fatti da i contro j
+    - set[i, j], giochi[i, j]: saldo set e giochi di i contro j
+    - partite[i, j]: partite complete tra i e j
+    I totali di classifica sono somme di riga, gli scontri diretti tra un
+    gruppo di giocatori sono somme sulla sottomatrice: ordinare non richiede
+    di riscorrere le partite.
+    """
+
+    def __init__(self, giocatori, punti, set, giochi, partite):
+        self.giocatori = list(giocatori)
+        self.punti = punti
+        self.set = set
+        self.giochi = giochi
+        self.partite = partite
+        self._rango_nome = np.argsort(np.argsort(np.array(self.giocatori, dtype=object)))
+
+    @classmethod
+    def da_codici(cls, giocatori, c1, c2, punti1, punti2, set1, set2, giochi1, giochi2):
+        """
+        Matrici da partite già codificate: c1/c2 sono gli indici dei
+        giocatori in `giocatori`, gli altri array sono per partita.
+        """
+        n = len(giocatori)
+        c1 = np.asarray(c1, dtype=np.int64)
+        c2 = np.asarray(c2, dtype=np.int64)
+        punti, saldo_set, saldo_giochi, partite = (np.zeros((n, n), dtype=np.int32) for _ in range(4))
+        diff_set = np.asarray(set1, dtype=np.int32) - np.asarray(set2, dtype=np.int32)
+        diff_giochi = np.asarray(giochi1, dtype=np.int32) - np.asarray(giochi2, dtype=np.int32)
+        np.add.at(punti, (c1, c2), np.asarray(punti1, dtype=np.int32))
+        np.add.at(punti, (c2, c1), np.asarray(punti2, dtype=np.int32))
+        np.add.at(saldo_set, (c1, c2), diff_set)
+        np.add.at(saldo_set, (c2, c1), -diff_set)
+        np.add.at(saldo_giochi, (c1, c2), diff_giochi)
+        np.add.at(saldo_giochi, (c2, c1), -diff_giochi)
+        np.add.at(partite, (c1, c2), 1)
+        np.add.at(partite, (c2, c1), 1)
+        return cls(giocatori, punti, saldo_set, saldo_giochi, partite)
+
+    @classmethod
+    def da_partite(cls, df):
+        """
+        Matrici da un DataFrame di partite (anche con partite future o
+        incomplete, che vengono ignorate).
+        """
+        return cls.da_scontri(scontri(df))
+
+    @classmethod
+    def da_scontri(cls, s):
+        giocatori, inverso = np.unique(np.concatenate([s["Player 1"].to_numpy(), s["Player 2"].to_numpy()]),
+                                       return_inverse=True)
+        n = len(s)
+        return cls.da_codici(giocatori, inverso[:n], inverso[n:], s["Punti 1"], s["Punti 2"], s["Set Vinti 1"],
+                             s["Set Vinti 2"], s["Giochi 1"], s["Giochi 2"])
+
+    @classmethod
+    def somma(cls, matrici, giocatori):
+        """
+        Somma di matrici con codici comuni: la lista dei giocatori di
+        ciascuna deve essere un prefisso di `giocatori` (codici assegnati in
+        ordine di apparizione), le più piccole vengono estese con zeri.
+        """
+        n = len(giocatori)
+        totali = [np.zeros((n, n), dtype=np.int32) for _ in range(4)]
+        for m in matrici:
+            k = len(m.giocatori)
+            for totale, parte in zip(totali, (m.punti, m.set, m.giochi, m.partite)):
+                totale[:k, :k] += parte
+        return cls(giocatori, *totali)
+
+    def _risolvi(self, gruppo, saldo_set, saldo_giochi):
+        # Classifica avulsa tra i pari punti: punti, saldo set e saldo giochi
+        # negli scontri diretti; se il gruppo si divide, si riapplica ai sottogruppi
+        if len(gruppo) <= 1:
+            return list(gruppo)
+        sotto = np.ix_(gruppo, gruppo)
+        chiavi = np.stack([self.punti[sotto].sum(axis=1), self.set[sotto].sum(axis=1),
+                           self.giochi[sotto].sum(axis=1)], axis=1)
+        ordine = np.lexsort((-chiavi[:, 2], -chiavi[:, 1], -chiavi[:, 0]))
+        gruppo, chiavi = gruppo[ordine], chiavi[ordine]
+        tagli = np.flatnonzero((np.diff(chiavi, axis=0) != 0).any(axis=1)) + 1
+        if len(tagli) == 0:
+            # Scontri diretti in perfetta parità: saldo set e giochi generali, poi nome
+            return list(gruppo[np.lexsort((self._rango_nome[gruppo], -saldo_giochi[gruppo], -saldo_set[gruppo]))])
+        risultato = []
+        for parte in np.split(gruppo, tagli):
+            risultato.extend(self._risolvi(parte, saldo_set, saldo_giochi))
+        return risultato
+
+    def ordine(self):
+        """
+        Indici dei giocatori in ordine di classifica: punti, poi scontri
+        diretti tra i pari punti, poi saldo set e saldo giochi, poi nome.
+        """
+        punti = self.punti.sum(axis=1)
+        saldo_set = self.set.sum(axis=1)
+        saldo_giochi = self.giochi.sum(axis=1)
+        indici = np.lexsort((self._rango_nome, -punti))
+        risultato = []
+        for gruppo in np.split(indici, np.flatnonzero(np.diff(punti[indici])) + 1):
+            risultato.extend(self._risolvi(gruppo, saldo_set, saldo_giochi))
+        return np.array(risultato, dtype=np.int64)
+
+    def tabella(self):
+        """
+        Classifica ordinata dei giocatori con almeno una partita completa.
+        """
+        ordine = self.ordine()
+        ordine = ordine[self.partite.sum(axis=1)[ordine] > 0]
+        return pd.DataFrame({
+            "Giocatore": [self.giocatori[i] for i in ordine],
+            "Punti": self.punti.sum(axis=1)[ordine].astype(np.int64),
+            "Partite Giocate": self.partite.sum(axis=1)[ordine].astype(np.int64),
+            "Saldo Set": self.set.sum(axis=1)[ordine].astype(np.int64),
+            "Saldo Giochi": self.giochi.sum(axis=1)[ordine].astype(np.int64),
+        })
@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+
+from library.partite import _DATA_MANCANTE
+from library.strumenti import misura
+
+PARTITE_FORMA = 5
+
+COLONNE_SPLIT = ["Giocatore", "Partite", "Vinte", "Perse", "% Vittorie", "Set Vinti", "Set Persi", "% Set",
+                 "Giochi Vinti", "Giochi Persi", "% Giochi"]
+
+
+def _percentuale(vinti, persi):
+    totale = vinti + persi
+    return np.round(np.divide(100.0 * vinti, totale, out=np.zeros(len(totale)), where=totale > 0), 1)
+
+
+class StatisticheGiocatori:
+    """
+    Statistiche di tutti i giocatori calcolate in un solo passaggio sulle
+    partite giocate di un ArchivioPartite:
+    - ogni partita diventa due righe, una dal punto di vista di ciascun
+      giocatore, ordinate per giocatore e in ordine cronologico,
+    - serie, forma e totali sono operazioni per gruppo su quegli array
+      (run-length, somme cumulate, bincount), senza cicli per giocatore.
+    Risultati:
+    - riepilogo: una riga per giocatore (vittorie, serie, forma, rapporti
+      set e giochi, tiebreak),
+    - andamento: una riga per partita e giocatore, con la forma mobile,
+    - per_superficie / per_luogo: gli stessi totali divisi per Superficie e Luogo.
+    """
+
+    @misura(nome="StatisticheGiocatori")
+    def __init__(self, partite, forma=PARTITE_FORMA):
+        self.forma = forma
+        righe = np.flatnonzero(partite.vincitore >= 0)
+        n = len(righe)
+
+        # Formato lungo: prima tutte le partite viste dal Player 1, poi dal Player 2
+        id_giocatore = np.concatenate([partite.player1[righe], partite.player2[righe]])
+        id_avversario = np.concatenate([partite.player2[righe], partite.player1[righe]])
+        vinta = np.concatenate([partite.vincitore[righe]] * 2) == id_giocatore
+        giochi = partite.giochi[righe].astype(np.int16)
+        miei = np.concatenate([giochi[:, :, 0], giochi[:, :, 1]])
+        suoi = np.concatenate([giochi[:, :, 1], giochi[:, :, 0]])
+        giocato = (miei >= 0) & (suoi >= 0)
+        tiebreak = giocato & (np.maximum(miei, suoi) == 7) & (np.minimum(miei, suoi) == 6)
+        colonne = {
+            "Set Vinti": (giocato & (miei > suoi)).sum(axis=1),
+            "Set Persi": (giocato & (suoi > miei)).sum(axis=1),
+            "Giochi Vinti": np.where(giocato, miei, 0).sum(axis=1),
+            "Giochi Persi": np.where(giocato, suoi, 0).sum(axis=1),
+            "Tiebreak Vinti": (tiebreak & (miei > suoi)).sum(axis=1),
+            "Tiebreak Persi": (tiebreak & (suoi > miei)).sum(axis=1),
+        }
+        round_ = np.concatenate([partite.round[righe]] * 2)
+        turno = np.concatenate([partite.turno[righe]] * 2)
+        data = np.concatenate([partite.data[righe]] * 2)
+        superficie = np.concatenate([partite.superficie[righe]] * 2)
+        luogo = np.concatenate([partite.luogo[righe]] * 2)
+
+        # Codici locali 0..k-1 e ordine cronologico dentro ogni giocatore
+        presenti, codice = np.unique(id_giocatore, return_inverse=True)
+        k = len(presenti)
+        dizionari = partite.dizionari
+        nomi = dizionari.giocatori.decodifica(presenti)
+        self.per_superficie = self._dividi("Superficie", dizionari.superfici, superficie, codice, vinta, colonne, nomi)
+        self.per_luogo = self._dividi("Luogo", dizionari.luoghi, luogo, codice, vinta, colonne, nomi)
+
+        ordine = np.lexsort((np.tile(np.arange(n), 2), turno, data, round_, codice))
+        codice, vinta = codice[ordine], vinta[ordine]
+        inizi = np.searchsorted(codice, np.arange(k + 1))
+        posizione = np.arange(2 * n) - inizi[codice]  # indice della partita nella storia del giocatore
+        conteggi = np.diff(inizi)
+
+        # Serie: run di risultati uguali consecutivi dello stesso giocatore
+        cambio = np.ones(2 * n, dtype=bool)
+        cambio[1:] = (codice[1:] != codice[:-1]) | (vinta[1:] != vinta[:-1])
+        run = np.cumsum(cambio) - 1
+        lunghezza_run = np.bincount(run)
+        inizio_run = np.flatnonzero(cambio)
+        run_giocatore, run_vinta = codice[inizio_run], vinta[inizio_run]
+        serie_vittorie = np.zeros(k, dtype=np.int64)
+        serie_sconfitte = np.zeros(k, dtype=np.int64)
+        np.maximum.at(serie_vittorie, run_giocatore[run_vinta], lunghezza_run[run_vinta])
+        np.maximum.at(serie_sconfitte, run_giocatore[~run_vinta], lunghezza_run[~run_vinta])
+        ultimo = inizi[1:] - 1
+        attuale = lunghezza_run[run[ultimo]] if n else np.zeros(0, dtype=np.int64)
+        attuale_vinta = vinta[ultimo] if n else np.zeros(0, dtype=bool)
+
+        # Forma mobile: vittorie nelle ultime `forma` partite, da una somma cumulata per giocatore
+        cumulate = np.cumsum(vinta)
+        cumulate = cumulate - np.concatenate([[0], cumulate])[inizi[codice]]  # ripartono da 0 per giocatore
+        indietro = np.arange(2 * n) - forma
+        vittorie_finestra = cumulate - np.where(posizione >= forma, cumulate[np.maximum(indietro, 0)], 0)
+        finestra = np.minimum(posizione + 1, forma)
+        in_forma = posizione >= (conteggi[codice] - forma)
+        lettere = np.where(vinta, "V", "S")
+        sequenza = ["".join(lettere[a:b][max(0, b - a - forma):]) for a, b in zip(inizi[:-1], inizi[1:])]
+
+        totali = {nome: np.bincount(codice, weights=valori[ordine], minlength=k).astype(np.int64)
+                  for nome, valori in colonne.items()}
+        vinte = np.bincount(codice, weights=vinta, minlength=k).astype(np.int64)
+        self.riepilogo = pd.DataFrame({
+            "Giocatore": nomi,
+            "Partite": conteggi,
+            "Vinte": vinte,
+            "Perse": conteggi - vinte,
+            "% Vittorie": _percentuale(vinte, conteggi - vinte),
+            "Serie Attuale": [("V" if v else "S") + str(int(lung)) for v, lung in zip(attuale_vinta, attuale)],
+            "Serie Vittorie Max": serie_vittorie,
+            "Serie Sconfitte Max": serie_sconfitte,
+            "Forma": sequenza,
+            f"Vittorie Ultime {forma}": np.bincount(codice[in_forma], weights=vinta[in_forma],
+                                                    minlength=k).astype(np.int64),
+            **{nome: totali[nome] for nome in ("Set Vinti", "Set Persi")},
+            "% Set": _percentuale(totali["Set Vinti"], totali["Set Persi"]),
+            **{nome: totali[nome] for nome in ("Giochi Vinti", "Giochi Persi")},
+            "% Giochi": _percentuale(totali["Giochi Vinti"], totali["Giochi Persi"]),
+            **{nome: totali[nome] for nome in ("Tiebreak Vinti", "Tiebreak Persi")},
+        })
+        self._codici = {g: i for i, g in enumerate(nomi)}
+
+        date = np.where(data[ordine] == _DATA_MANCANTE, np.datetime64("NaT"),
+                        np.datetime64("1970-01-01", "D") + data[ordine].astype("timedelta64[D]"))
+        self.andamento = pd.DataFrame({
+            "Giocatore": nomi[codice],
+            "Partita": posizione + 1,
+            "Round": round_[ordine],
+            "Turno": turno[ordine],
+            "Data": date.astype("datetime64[s]"),
+            "Avversario": dizionari.giocatori.decodifica(id_avversario[ordine]),
+            "Vinta": vinta,
+            "Forma": np.round(100.0 * vittorie_finestra / np.maximum(finestra, 1), 1),
+        })
+        self._inizi = inizi
+
+    @staticmethod
+    def _dividi(nome, dizionario, ids, codice, vinta, colonne, nomi):
+        # Totali per (giocatore, valore): un bincount sul codice combinato
+        valori, inverso = np.unique(ids, return_inverse=True)
+        gruppi, gruppo = np.unique(codice * len(valori) + inverso, return_inverse=True)
+        m = len(gruppi)
+        somma = lambda pesi: np.bincount(gruppo, weights=pesi, minlength=m).astype(np.int64)
+        partite, vinte = somma(None), somma(vinta)
+        set_vinti, set_persi = somma(colonne["Set Vinti"]), somma(colonne["Set Persi"])
+        giochi_vinti, giochi_persi = somma(colonne["Giochi Vinti"]), somma(colonne["Giochi Persi"])
+        tabella = pd.DataFrame({
+            "Giocatore": nomi[gruppi // max(len(valori), 1)],
+            nome: dizionario.decodifica(valori[gruppi % max(len(valori), 1)]),
+            "Partite": partite,
+            "Vinte": vinte,
+            "Perse": partite - vinte,
+            "% Vittorie": _percentuale(vinte, partite - vinte),
+            "Set Vinti": set_vinti,
+            "Set Persi": set_persi,
+            "% Set": _percentuale(set_vinti, set_persi),
+            "Giochi Vinti": giochi_vinti,
+            "Giochi Persi": giochi_persi,
+            "% Giochi": _percentuale(giochi_vinti, giochi_persi),
+        }, columns=COLONNE_SPLIT[:1] + [nome] + COLONNE_SPLIT[1:])
+        tabella[nome] = tabella[nome].fillna("Sconosciuto")
+        return tabella
+
+    def giocatore(self, giocatore):
+        """
+        Riepilogo del giocatore come dizionario, None se non ha partite giocate.
+        """
+        i = self._codici.get(giocatore)
+        return None if i is None else self.riepilogo.iloc[i].to_dict()
+
+    def andamento_giocatore(self, giocatore):
+        i = self._codici.get(giocatore)
+        if i is None:
+            return self.andamento.iloc[:0]
+        return self.andamento.iloc[self._inizi[i]:self._inizi[i + 1]]
+
+    def split(self, giocatore, per="Superficie"):
+        tabella = self.per_superficie if per == "Superficie" else self.per_luogo
+        return tabella[tabella["Giocatore"] == giocatore].drop(columns="Giocatore").reset_index(drop=True)
+
+    def migliori(self, superficie=None, luogo=None, minimo_partite=1):
+        """
+        Classifica per percentuale di vittorie (poi % giochi), su tutte le
+        partite o solo su una superficie / un luogo: "i migliori sulla terra".
+        """
+        if superficie is not None:
+            tabella = self.per_superficie[self.per_superficie["Superficie"] == superficie]
+        elif luogo is not None:
+            tabella = self.per_luogo[self.per_luogo["Luogo"] == luogo]
+        else:
+            tabella = self.riepilogo
+        tabella = tabella[tabella["Partite"] >= minimo_partite]
+        return tabella.sort_values(["% Vittorie", "% Giochi", "Partite", "Giocatore"],
+                                   ascending=[False, False, False, True]).reset_index(drop=True)
@@ -0,0 +1,170 @@
+import functools
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Profilazione spenta di default: ogni funzione misurata paga solo il
+# controllo di un booleano. Si accende con TENNIS_PROFILO=1 o con abilita().
+ABILITATO = os.environ.get("TENNIS_PROFILO", "") not in ("", "0")
+MEMORIA = False
+
+_lock = threading.Lock()
+_statistiche = {}  # nome -> [chiamate, secondi, righe, picco_memoria_byte]
+
+
+def abilita(memoria=False):
+    """
+    Accende la raccolta; con memoria=True traccia anche il picco di memoria
+    (tracemalloc, più costoso: usarlo solo mentre si profila).
+    """
+    global ABILITATO, MEMORIA
+    ABILITATO = True
+    MEMORIA = memoria
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def disabilita():
+    global ABILITATO, MEMORIA
+    ABILITATO = False
+    if MEMORIA and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    MEMORIA = False
+
+def azzera():
+    with _lock:
+        _statistiche.clear()
+
+def _righe(risultato):
+    # Righe elaborate: la prima dimensione di DataFrame/array, altrimenti la lunghezza
+    forma = getattr(risultato, "shape", None)
+    if forma:
+        return forma[0]
+    if isinstance(risultato, (list, tuple, dict)):
+        return len(risultato)
+    return 0
+
+def _registra(nome, secondi, righe, picco):
+    with _lock:
+        voce = _statistiche.setdefault(nome, [0, 0.0, 0, 0])
+        voce[0] += 1
+        voce[1] += secondi
+        voce[2] += righe
+        voce[3] = max(voce[3], picco)
+
+@contextmanager
+def sezione(nome, righe=0):
+    """
+    Misura un blocco di codice: with sezione("render card"): ...
+    Il picco di memoria è indicativo se le sezioni sono annidate.
+    """
+    if not ABILITATO:
+        yield
+        return
+    memoria = MEMORIA and tracemalloc.is_tracing()
+    if memoria:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    inizio = time.perf_counter()
+    try:
+        yield
+    finally:
+        secondi = time.perf_counter() - inizio
+        picco = tracemalloc.get_traced_memory()[1] - base if memoria else 0
+        _registra(nome, secondi, righe, picco)
+
+def misura(funzione=None, nome=None):
+    """
+    Decoratore per le funzioni dati: tempo, chiamate, righe del risultato
+    e (se attivo) picco di memoria. Utilizzabile come @misura o @misura(nome=...).
+    """
+    def decora(f):
+        etichetta = nome or f.__qualname__
+
+        @functools.wraps(f)
+        def involucro(*args, **kwargs):
+            if not ABILITATO:
+                return f(*args, **kwargs)
+            memoria = MEMORIA and tracemalloc.is_tracing()
+            if memoria:
+                base = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            inizio = time.perf_counter()
+            risultato = f(*args, **kwargs)
+            secondi = time.perf_counter() - inizio
+            picco = tracemalloc.get_traced_memory()[1] - base if memoria else 0
+            _registra(etichetta, secondi, _righe(risultato), picco)
+            return risultato
+
+        return involucro
+
+    return decora(funzione) if funzione is not None else decora
+
+def statistiche():
+    """
+    Copia delle misure: {nome: {"chiamate", "secondi", "righe", "picco_memoria_byte"}}.
+    """
+    with _lock:
+        return {
+            nome: {"chiamate": c, "secondi": s, "righe": r, "picco_memoria_byte": m}
+            for nome, (c, s, r, m) in _statistiche.items()
+        }
+
+def prometheus(prefisso="tennis"):
+    """
+    Misure nel formato testuale di Prometheus (text exposition format).
+    """
+    metriche = [
+        ("funzione_chiamate_totali", "counter", "Numero di chiamate", "chiamate"),
+        ("funzione_secondi_totali", "counter", "Tempo totale (wall clock) in secondi", "secondi"),
+        ("funzione_righe_totali", "counter", "Righe elaborate", "righe"),
+        ("funzione_memoria_picco_byte", "gauge", "Picco di memoria allocata in una chiamata", "picco_memoria_byte"),
+    ]
+    dati = statistiche()
+    righe = []
+    for suffisso, tipo, aiuto, campo in metriche:
+        metrica = f"{prefisso}_{suffisso}"
+        righe.append(f"# HELP {metrica} {aiuto}")
+        righe.append(f"# TYPE {metrica} {tipo}")
+        for nome, valori in sorted(dati.items()):
+            etichetta = nome.replace("\\", "\\\\").replace('"', '\\"')
+            righe.append(f'{metrica}{{funzione="{etichetta}"}} {valori[campo]}')
+    return "\n".join(righe) + "\n"
+
+def pannello_debug():
+    """
+    Pannello opzionale nella sidebar: compare con ?debug=1 nell'URL
+    (o TENNIS_DEBUG=1) e permette di accendere la profilazione e leggere
+    le misure, anche in formato Prometheus.
+    """
+    import streamlit as st
+
+    if st.query_params.get("debug") != "1" and os.environ.get("TENNIS_DEBUG", "") in ("", "0"):
+        return
+
+    with st.sidebar.expander("🛠️ Profilazione", expanded=True):
+        attivo = st.toggle("Raccogli misure", value=ABILITATO)
+        con_memoria = st.toggle("Picco di memoria (lento)", value=MEMORIA)
+        if attivo and (not ABILITATO or con_memoria != MEMORIA):
+            disabilita()
+            abilita(memoria=con_memoria)
+        elif not attivo and ABILITATO:
+            disabilita()
+        if st.button("Azzera misure"):
+            azzera()
+
+        misure = statistiche()
+        if misure:
+            st.dataframe(
+                [
+                    {"Funzione": nome, "Chiamate": v["chiamate"], "ms totali": round(v["secondi"] * 1000, 2),
+                     "ms/chiamata": round(v["secondi"] * 1000 / v["chiamate"], 3), "Righe": v["righe"],
+                     "Picco MB": round(v["picco_memoria_byte"] / 2**20, 2)}
+                    for nome, v in sorted(misure.items(), key=lambda kv: -kv[1]["secondi"])
+                ],
+                hide_index=True,
+            )
+            st.code(prometheus(), language="text")
+        else:
+            st.caption("Nessuna misura raccolta.")
@@ -0,0 +1,222 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from library.strumenti import misura
+
+BYE = "BYE"
+DIMENSIONI = (2, 4, 8, 16, 32, 64)
+NOMI_TURNI = {1: "Finale", 2: "Semifinali", 4: "Quarti", 8: "Ottavi", 16: "Sedicesimi", 32: "Trentaduesimi"}
+COLONNE_TABELLONE = ["Posizione", "Testa di Serie", "Giocatore", "Girone", "Posizione Girone"]
+
+# Chiave dei metadati Parquet con la firma dei dati da cui è stato generato il tabellone
+_CHIAVE_FIRMA = b"tennis_comm.firma"
+
+
+def ordine_teste_di_serie(n):
+    """
+    Testa di serie in ogni posizione di un tabellone da n (potenza di 2),
+    nello schema classico: le posizioni 2i e 2i+1 si incontrano al primo
+    turno, la 1 e la 2 solo in finale, la somma di ogni coppia è n + 1.
+    """
+    ordine = np.array([1])
+    while len(ordine) < n:
+        m = 2 * len(ordine)
+        ordine = np.stack([ordine, m + 1 - ordine], axis=1).ravel()
+    return ordine
+
+def turno_incontro(a, b):
+    """
+    Turno (1 = primo, log2 n = finale) in cui si incontrerebbero i
+    giocatori delle posizioni a e b (da 0), se vincessero sempre: è la
+    posizione del bit più alto in cui differiscono. Vettoriale.
+    """
+    diff = np.bitwise_xor(np.asarray(a, dtype=np.int64), np.asarray(b, dtype=np.int64))
+    return np.where(diff > 0, np.floor(np.log2(np.maximum(diff, 1))).astype(np.int64) + 1, 0)
+
+def _assegnazione(costi):
+    """
+    Assegnazione di costo minimo righe -> colonne (metodo ungherese in
+    O(n²·m), vettoriale sulle colonne), con righe <= colonne.
+    Restituisce la colonna di ogni riga.
+    """
+    costi = np.asarray(costi, dtype=float)
+    righe, colonne = costi.shape
+    u = np.zeros(righe + 1)
+    v = np.zeros(colonne + 1)
+    riga_di = np.zeros(colonne + 1, dtype=np.int64)  # riga (da 1) assegnata a ogni colonna, 0 = libera
+    via = np.zeros(colonne + 1, dtype=np.int64)
+    for i in range(1, righe + 1):
+        riga_di[0] = i
+        j0 = 0
+        minimo = np.full(colonne + 1, np.inf)
+        usata = np.zeros(colonne + 1, dtype=bool)
+        while True:
+            usata[j0] = True
+            i0 = riga_di[j0]
+            ridotti = costi[i0 - 1] - u[i0] - v[1:]
+            libere = ~usata[1:]
+            migliora = libere & (ridotti < minimo[1:])
+            minimo[1:][migliora] = ridotti[migliora]
+            via[1:][migliora] = j0
+            candidati = np.where(libere, minimo[1:], np.inf)
+            j1 = int(np.argmin(candidati)) + 1
+            delta = candidati[j1 - 1]
+            u[riga_di[usata]] += delta
+            v[usata] -= delta
+            minimo[~usata] -= delta
+            j0 = j1
+            if riga_di[j0] == 0:
+                break
+        while j0:
+            j1 = via[j0]
+            riga_di[j0] = riga_di[j1]
+            j0 = j1
+    risultato = np.empty(righe, dtype=np.int64)
+    assegnate = np.flatnonzero(riga_di[1:])
+    risultato[riga_di[1:][assegnate] - 1] = assegnate
+    return risultato
+
+def qualificati(gironi, per_girone):
+    """
+    Qualificati ordinati per il sorteggio: prima tutti i primi dei gironi,
+    poi i secondi e così via; a parità di posizione contano punti, saldo
+    set e saldo giochi (colonne di calcola_classifica_punti, se presenti).
+    `gironi` è {nome: classifica già ordinata}.
+    """
+    righe = []
+    for nome, classifica in gironi.items():
+        testa = classifica.head(per_girone).reset_index(drop=True)
+        for i, riga in testa.iterrows():
+            righe.append({"Giocatore": riga["Giocatore"], "Girone": nome, "Posizione Girone": i + 1,
+                          "Punti": riga.get("Punti", 0), "Saldo Set": riga.get("Saldo Set", 0),
+                          "Saldo Giochi": riga.get("Saldo Giochi", 0)})
+    df = pd.DataFrame(righe, columns=["Giocatore", "Girone", "Posizione Girone", "Punti", "Saldo Set", "Saldo Giochi"])
+    return df.sort_values(["Posizione Girone", "Punti", "Saldo Set", "Saldo Giochi", "Giocatore"],
+                          ascending=[True, False, False, False, True], kind="stable").reset_index(drop=True)
+
+@misura
+def genera_tabellone(gironi, per_girone=2, dimensione=None, seed=0):
+    """
+    Tabellone a eliminazione diretta dalle classifiche di uno o più gironi.
+
+    - Teste di serie nell'ordine di qualificati(); il tabellone è la più
+      piccola potenza di 2 che li contiene (o `dimensione`), i posti vuoti
+      sono BYE contro le teste di serie più alte.
+    - Le teste 1 e 2 hanno posizione fissa; dentro ogni fascia (3-4, 5-8,
+      9-16, ...) le posizioni si sorteggiano evitando che giocatori dello
+      stesso girone si incontrino presto: ogni fascia è un problema di
+      assegnazione (metodo ungherese) con costo per posizione dato dagli
+      incontri con i compagni di girone già piazzati, pesato in modo che
+      un incontro in un turno prima conti più di tutti quelli dopo. I
+      giocatori dello stesso girone nella stessa fascia si piazzano uno
+      strato alla volta, così si evitano anche tra loro.
+    Il sorteggio è riproducibile a parità di seed.
+    """
+    entrati = qualificati(gironi, per_girone)
+    q = len(entrati)
+    if q < 2:
+        raise ValueError("servono almeno 2 qualificati per un tabellone")
+    n = dimensione or next(d for d in DIMENSIONI + (q,) if d >= q)
+    if n not in DIMENSIONI or n < q:
+        raise ValueError(f"dimensione non valida: {n} (ammesse {DIMENSIONI}, almeno {q})")
+    turni = int(np.log2(n))
+    rng = np.random.default_rng(seed)
+
+    teste = ordine_teste_di_serie(n)
+    posizione_testa = np.empty(n + 1, dtype=np.int64)
+    posizione_testa[teste] = np.arange(n)
+    gironi_codici, girone = np.unique(entrati["Girone"].astype(str).to_numpy(), return_inverse=True)
+
+    posto = np.full(q, -1, dtype=np.int64)  # posizione nel tabellone di ogni qualificato
+    posto[0] = posizione_testa[1]
+    if q > 1:
+        posto[1] = posizione_testa[2]
+    # Peso di un incontro al turno r: base n, così un turno prima domina tutti quelli dopo
+    pesi = float(n) ** (turni - np.arange(turni + 1))
+    pesi[0] = 0.0
+
+    inizio = 2
+    while inizio < q:
+        fine = min(2 * inizio, q)  # fascia: teste inizio+1 .. 2*inizio (solo quelle con un giocatore)
+        liberi = posizione_testa[np.arange(inizio + 1, fine + 1)]
+        liberi = liberi[rng.permutation(len(liberi))]  # a parità di costo decide il sorteggio
+        fascia = np.arange(inizio, fine)
+        # Strati: il k-esimo giocatore di ogni girone nella fascia
+        strato = pd.Series(girone[fascia]).groupby(girone[fascia]).cumcount().to_numpy()
+        for k in range(strato.max() + 1):
+            giocatori = fascia[strato == k]
+            piazzati = np.flatnonzero(posto >= 0)
+            stesso = girone[giocatori][:, None] == girone[piazzati][None, :]
+            incontri = turno_incontro(liberi[None, :, None], posto[piazzati][None, None, :])
+            costi = (pesi[incontri] * stesso[:, None, :]).sum(axis=2)
+            scelti = _assegnazione(costi)
+            posto[giocatori] = liberi[scelti]
+            liberi = np.delete(liberi, scelti)
+        inizio = fine
+
+    tabellone = pd.DataFrame({
+        "Posizione": np.arange(1, n + 1),
+        "Testa di Serie": pd.array([pd.NA] * n, dtype="Int64"),
+        "Giocatore": BYE,
+        "Girone": pd.array([None] * n, dtype="str"),
+        "Posizione Girone": pd.array([pd.NA] * n, dtype="Int64"),
+    }, columns=COLONNE_TABELLONE)
+    tabellone.loc[posto, "Testa di Serie"] = np.arange(1, q + 1)
+    tabellone.loc[posto, "Giocatore"] = entrati["Giocatore"].to_numpy()
+    tabellone.loc[posto, "Girone"] = entrati["Girone"].to_numpy()
+    tabellone.loc[posto, "Posizione Girone"] = entrati["Posizione Girone"].to_numpy()
+    return tabellone
+
+def incontri(tabellone):
+    """
+    Tutti gli incontri del tabellone, turno per turno: il primo con i
+    giocatori, i successivi con "Vincente <incontro>" (chi ha un BYE passa
+    direttamente al turno dopo).
+    """
+    nomi = tabellone["Giocatore"].tolist()
+    righe = []
+    turno = 1
+    while len(nomi) > 1:
+        nome_turno = NOMI_TURNI.get(len(nomi) // 2, f"Turno {turno}")
+        successivi = []
+        for i in range(0, len(nomi), 2):
+            sigla = f"{nome_turno[0]}{i // 2 + 1}" if len(nomi) > 2 else "F"
+            a, b = nomi[i], nomi[i + 1]
+            if BYE in (a, b):
+                successivi.append(b if a == BYE else a)
+                continue
+            righe.append({"Turno": turno, "Nome Turno": nome_turno, "Incontro": sigla, "Giocatore 1": a,
+                          "Giocatore 2": b})
+            successivi.append(f"Vincente {sigla}")
+        nomi = successivi
+        turno += 1
+    return pd.DataFrame(righe, columns=["Turno", "Nome Turno", "Incontro", "Giocatore 1", "Giocatore 2"])
+
+def salva_tabellone(tabellone, percorso, firma):
+    """
+    Scrive il tabellone in Parquet con la firma dei dati di partenza nei
+    metadati; scrittura atomica come l'archivio delle partite.
+    """
+    tabella = pa.Table.from_pandas(tabellone, preserve_index=False)
+    tabella = tabella.replace_schema_metadata({**(tabella.schema.metadata or {}), _CHIAVE_FIRMA: json.dumps(firma)})
+    percorso.parent.mkdir(parents=True, exist_ok=True)
+    temporaneo = percorso.with_suffix(".parquet.tmp")
+    pq.write_table(tabella, temporaneo)
+    os.replace(temporaneo, percorso)
+
+def carica_tabellone(percorso, firma):
+    """
+    Il tabellone salvato se è stato generato dagli stessi dati (stessa
+    firma), altrimenti None.
+    """
+    if not percorso.exists():
+        return None
+    metadati = pq.read_schema(percorso).metadata or {}
+    if metadati.get(_CHIAVE_FIRMA) != json.dumps(firma).encode():
+        return None
+    return pq.read_table(percorso).to_pandas()
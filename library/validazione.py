@@ -0,0 +1,296 @@
+"""
+Lettura e validazione dei file turno.
+
+Uso da riga di comando (controllo prima di pubblicare i risultati):
+
+    python -m library.validazione                      # tutti i file sotto operations/output/rounds
+    python -m library.validazione round_1/turno_3.csv  # file singoli
+
+Stampa tutti gli errori trovati (file, riga, colonna, valore, messaggio) ed
+esce con codice 1 se ce n'è almeno uno.
+"""
+import re
+import sys
+import threading
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+from pyarrow import compute as pc
+from pyarrow import csv as pacsv
+
+from library import dati
+from library.elo import COLONNE_ELO
+from library.punteggio import NUM_SET, SET, leggi_testi, set_possibile
+
+FORMATO_DATA = "%d/%m/%Y"
+COLONNE_OBBLIGATORIE = ["Data", "Orario", "Luogo", "Player 1", "Player 2", "Set 1", "Set 2", "Set 3",
+                        "Vincitore", "Superficie"]
+
+# Schema di lettura: tutto come testo (le conversioni sono validate dopo,
+# così un valore sbagliato diventa un errore segnalato e non un'eccezione)
+SCHEMA_TURNO = {c: pa.string() for c in ["Turno"] + COLONNE_OBBLIGATORIE + COLONNE_ELO}
+
+ORARIO = re.compile(r"^\s*\d{1,2}[:.]\d{2}\s*$")
+
+ErroreValidazione = namedtuple("ErroreValidazione", ["file", "riga", "colonna", "valore", "messaggio"])
+
+
+class ErroreDatiTurno(ValueError):
+    """
+    File turno con dati non validi: `errori` contiene tutte le segnalazioni.
+    """
+
+    def __init__(self, percorso, errori):
+        self.percorso = percorso
+        self.errori = list(errori)
+        dettaglio = "\n".join(formatta(e) for e in self.errori)
+        super().__init__(f"{percorso}: {len(self.errori)} errori\n{dettaglio}")
+
+
+def formatta(errore):
+    valore = "" if errore.valore is None else f" [{errore.valore!r}]"
+    return f"{errore.file}:{errore.riga} {errore.colonna}{valore}: {errore.messaggio}"
+
+def leggi_csv(percorso):
+    """
+    Lettura veloce (lettore CSV di pyarrow) con tipi espliciti: le colonne
+    note arrivano come testo, celle vuote come mancanti.
+    """
+    return pacsv.read_csv(
+        percorso,
+        convert_options=pacsv.ConvertOptions(column_types=SCHEMA_TURNO, strings_can_be_null=True,
+                                             null_values=[""], quoted_strings_can_be_null=True),
+    )
+
+def _testo(colonna):
+    """
+    Colonna Arrow di testo in un solo blocco con le celle vuote mancanti,
+    come le produce leggi_csv. Da valida(df) o da chi chiama analizza_set
+    può arrivare un array qualsiasi: lo si converte.
+    """
+    if not isinstance(colonna, (pa.Array, pa.ChunkedArray)):
+        valori = np.asarray(colonna, dtype=object)
+        colonna = pa.array(np.where(valori == "", None, valori), from_pandas=True)
+    if isinstance(colonna, pa.ChunkedArray):
+        colonna = colonna.combine_chunks()
+    return colonna if pa.types.is_string(colonna.type) else colonna.cast(pa.string())
+
+def _distinti(colonna):
+    # Codici per riga e valori distinti (None per i mancanti) di una colonna Arrow di testo
+    codificata = pc.dictionary_encode(colonna, null_encoding="encode")
+    return codificata.indices.to_numpy(zero_copy_only=False), codificata.dictionary.to_pylist()
+
+def _booleani(maschera):
+    # Confronto Arrow -> maschera NumPy, i mancanti contano come falso
+    return pc.fill_null(maschera, False).to_numpy(zero_copy_only=False)
+
+def analizza_set(colonna, decisivo=False):
+    """
+    Giochi e validità dei set di una colonna: (giochi1, giochi2, stato) con
+    stato 0 = vuoto, 1 = valido, -1 = testo non conforme alla grammatica
+    punteggio.SET, -2 = punteggio impossibile secondo punteggio.set_possibile:
+    la stessa lettura della classifica (punteggio.leggi_testi), `decisivo`
+    ammette il match tiebreak. Si analizzano solo i valori distinti.
+    """
+    codici, distinti = _distinti(_testo(colonna))
+    # Una tabella (giochi1, giochi2, stato) per valore distinto, riportata sulle righe per indice
+    g1, g2, tiebreak = leggi_testi(distinti)
+    possibile = set_possibile(g1, g2, tiebreak, decisivo)
+    stato = np.select([np.array([t is None for t in distinti], dtype=bool), g1 < 0, ~possibile], [0, -1, -2], 1)
+    tabella = np.stack([np.where(stato == 1, g1, -1), np.where(stato == 1, g2, -1), stato], axis=1).astype(np.int16)
+    righe = tabella[codici]
+    return righe[:, 0], righe[:, 1], righe[:, 2].astype(np.int8)
+
+def _per_distinti(colonna, converti, mancante):
+    # Applica `converti` una volta per valore distinto (i file hanno pochi valori ripetuti);
+    # il `mancante` in fondo fissa il tipo anche per una colonna senza righe
+    codici, distinti = _distinti(colonna)
+    valori = np.array([mancante if v is None else converti(v) for v in distinti] + [mancante])
+    return valori[codici]
+
+def _numero(testo):
+    try:
+        return float(testo)
+    except ValueError:
+        return np.nan
+
+def _data(testo):
+    try:
+        datetime.strptime(testo, FORMATO_DATA)
+        return True
+    except ValueError:
+        return False
+
+def numerica(colonna):
+    """
+    Colonna Arrow di testo in numeri come pd.to_numeric(errors="coerce"):
+    interi se lo sono tutti, altrimenti float64, i non numeri mancanti.
+    Il cast diretto copre il caso normale; il valore per valore solo i
+    file con errori.
+    """
+    if isinstance(colonna, pa.ChunkedArray):
+        colonna = colonna.combine_chunks()
+    if pa.types.is_integer(colonna.type) or pa.types.is_floating(colonna.type):
+        return colonna
+    colonna = _testo(colonna)
+    for tipo in (pa.int64(), pa.float64()):
+        try:
+            return pc.cast(colonna, tipo)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+    return pa.array(_per_distinti(colonna, _numero, np.nan), from_pandas=True)
+
+def valida(df, file="", turno=None):
+    """
+    Tutti gli errori di un file turno in un solo passaggio (vettoriale per
+    colonna): colonne mancanti, date e orari, giocatori, grammatica e
+    plausibilità dei set, set dopo la fine della partita, vincitore coerente
+    con i set. Le righe sono numerate come nel file (intestazione = riga 1).
+    """
+    return _valida({c: df[c].astype(object).to_numpy() for c in df.columns}, file, turno)
+
+def _valida(colonne, file, turno):
+    # colonne: {nome: colonna Arrow (o array di oggetti)}, mancante o "" per le celle vuote
+    errori = []
+
+    def segnala(maschera, colonna, messaggio, valori=None):
+        if not maschera.any():
+            return
+        for i in np.flatnonzero(maschera):
+            valore = None if valori is None else valori[int(i)].as_py()
+            errori.append(ErroreValidazione(str(file), int(i) + 2, colonna, valore, messaggio))
+
+    mancanti = [c for c in COLONNE_OBBLIGATORIE if c not in colonne]
+    for c in mancanti:
+        errori.append(ErroreValidazione(str(file), 1, c, None, "colonna mancante"))
+    if mancanti:
+        return errori
+
+    testo = {c: _testo(v) for c, v in colonne.items()}
+    n = len(testo["Data"])
+    # Celle vuote delle sole colonne che le controllano (i set le ricavano da analizza_set)
+    vuoto = {c: v.is_null().to_numpy(zero_copy_only=False) for c, v in testo.items()
+             if c in ("Turno", "Data", "Orario", "Player 1", "Player 2", "Vincitore") or c in COLONNE_ELO}
+
+    if "Turno" in testo:
+        valori = _per_distinti(testo["Turno"], _numero, np.nan)
+        segnala(~vuoto["Turno"] & np.isnan(valori), "Turno", "non è un numero", testo["Turno"])
+        if turno is not None:
+            segnala(~np.isnan(valori) & (valori != turno), "Turno", f"diverso dal turno del file ({turno})",
+                    testo["Turno"])
+
+    data_ok = _per_distinti(testo["Data"], _data, True)
+    segnala(vuoto["Data"], "Data", "data mancante")
+    segnala(~vuoto["Data"] & ~data_ok, "Data", "data non nel formato gg/mm/aaaa", testo["Data"])
+
+    orario_ok = _per_distinti(testo["Orario"], lambda v: bool(ORARIO.match(str(v))), True)
+    segnala(~vuoto["Orario"] & ~orario_ok, "Orario", "orario non nel formato hh:mm", testo["Orario"])
+
+    for c in ("Player 1", "Player 2"):
+        segnala(vuoto[c], c, "giocatore mancante")
+    segnala(~vuoto["Player 1"] & _booleani(pc.equal(testo["Player 1"], testo["Player 2"])), "Player 2",
+            "un giocatore non può affrontare sé stesso", testo["Player 2"])
+
+    for c in COLONNE_ELO:
+        if c in testo:
+            valori = _per_distinti(testo[c], _numero, np.nan)
+            segnala(~vuoto[c] & np.isnan(valori), c, "non è un numero", testo[c])
+
+    # Set: grammatica e plausibilità, poi l'andamento della partita
+    vinti1 = np.zeros(n, dtype=np.int8)
+    vinti2 = np.zeros(n, dtype=np.int8)
+    leggibili = np.ones(n, dtype=bool)
+    precedente_vuoto = np.zeros(n, dtype=bool)
+    for s in range(NUM_SET):
+        c = f"Set {s + 1}"
+        g1, g2, stato = analizza_set(testo[c], decisivo=s == NUM_SET - 1)
+        segnala(stato == -1, c, "punteggio non leggibile (atteso es. 6-4 o 7-6(5))", testo[c])
+        segnala(stato == -2, c, "punteggio di set impossibile", testo[c])
+        segnala((stato != 0) & precedente_vuoto, c, f"set {s + 1} presente ma set precedente vuoto", testo[c])
+        segnala((stato != 0) & ((vinti1 == 2) | (vinti2 == 2)), c, "set giocato a partita già conclusa", testo[c])
+        leggibili &= stato >= 0
+        precedente_vuoto |= stato == 0
+        vinti1 += ((stato == 1) & (g1 > g2)).astype(np.int8)
+        vinti2 += ((stato == 1) & (g2 > g1)).astype(np.int8)
+
+    conclusa = leggibili & ((vinti1 == 2) | (vinti2 == 2))
+    ha_set = (vinti1 + vinti2) > 0
+    vincitore = testo["Vincitore"]
+    primo = _booleani(pc.equal(vincitore, testo["Player 1"]))
+    secondo = _booleani(pc.equal(vincitore, testo["Player 2"]))
+    giocatore = primo | secondo
+    segnala(~vuoto["Vincitore"] & ~giocatore, "Vincitore", "il vincitore non è uno dei due giocatori", vincitore)
+    segnala(~vuoto["Vincitore"] & giocatore & conclusa & np.where(vinti1 == 2, ~primo, ~secondo), "Vincitore",
+            "il vincitore non corrisponde ai set", vincitore)
+    segnala(~vuoto["Vincitore"] & leggibili & ~conclusa, "Vincitore",
+            "vincitore indicato ma punteggio incompleto (la partita non conta)", vincitore)
+    segnala(vuoto["Vincitore"] & ha_set, "Vincitore", "set presenti ma vincitore mancante")
+
+    errori.sort(key=lambda e: e.riga)
+    return errori
+
+
+_lock = threading.Lock()
+_segnalazioni = {}  # percorso -> [ErroreValidazione]
+
+def registra(percorso, errori):
+    with _lock:
+        if errori:
+            _segnalazioni[str(percorso)] = list(errori)
+        else:
+            _segnalazioni.pop(str(percorso), None)
+
+def segnalazioni(percorso=None):
+    """
+    Errori dell'ultima lettura di ogni file turno che ne aveva: {percorso: [errori]}.
+    Con `percorso`, la sola lista di quel file.
+    """
+    with _lock:
+        if percorso is not None:
+            return list(_segnalazioni.get(str(percorso), []))
+        return {p: list(e) for p, e in _segnalazioni.items()}
+
+def leggi_tabella(percorso, turno=None, rigoroso=False):
+    """
+    Legge e valida un file turno restando in Arrow: (tabella, errori), le
+    colonne come testo. Gli errori vengono registrati (vedi segnalazioni());
+    con rigoroso=True un file con errori solleva ErroreDatiTurno.
+    """
+    tabella = leggi_csv(percorso)
+    errori = _valida({c: tabella.column(c) for c in tabella.column_names}, percorso, turno)
+    registra(percorso, errori)
+    if errori and rigoroso:
+        raise ErroreDatiTurno(percorso, errori)
+    return tabella, errori
+
+def leggi_turno(percorso, turno=None, rigoroso=False):
+    """
+    Come leggi_tabella, con il file in un DataFrame: (df, errori).
+    """
+    tabella, errori = leggi_tabella(percorso, turno, rigoroso)
+    return tabella.to_pandas(), errori
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    base = dati.BASE_DIR
+    file = [Path(a) if Path(a).exists() else base / a for a in argv] or \
+        sorted(base.glob("round_*/turno_*.csv"), key=lambda p: (int(p.parent.name.split("_")[1]), int(p.stem.split("_")[1])))
+    totale = 0
+    for percorso in file:
+        try:
+            _, errori = leggi_turno(percorso, turno=int(percorso.stem.split("_")[1]))
+        except (OSError, pa.ArrowInvalid) as e:
+            errori = [ErroreValidazione(str(percorso), 0, "", None, f"file illeggibile: {e}")]
+        for errore in errori:
+            print(formatta(errore))
+        totale += len(errori)
+    print(f"{len(file)} file controllati, {totale} errori")
+    return 1 if totale else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
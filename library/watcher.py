@@ -0,0 +1,152 @@
+import logging
+import threading
+
+from library import cache
+from library import dati
+from library import leghe
+
+INTERVALLO = 0.5  # secondi tra due controlli dei file
+
+log = logging.getLogger(__name__)
+
+
+class OsservatoreRisultati(threading.Thread):
+    """
+    Thread in background che controlla (per mtime e dimensione) i file
+    turno sotto BASE_DIR. Quando un risultato cambia:
+    - aggiorna la classifica incrementale (rilegge solo il file cambiato),
+    - ricostruisce gli indici giocatore dei round toccati (leggendoli, il
+      loader riallinea una volta l'archivio Parquet),
+    - incrementa `versione`, che le sessioni Streamlit confrontano in memoria
+      per sapere se devono ridisegnare la pagina.
+    Un solo thread per processo fa gli stat dei file: i visitatori non
+    rileggono nulla finché non c'è una nuova versione.
+    """
+
+    def __init__(self, base_dir=None, intervallo=INTERVALLO):
+        super().__init__(name="osservatore-risultati", daemon=True)
+        self.base_dir = base_dir
+        self.intervallo = intervallo
+        self.versione = 0
+        self.ultimi_cambiati = []
+        self._impronte = {}
+        self._inizializzato = False
+        self._ascoltatori = []
+        self._fermo = threading.Event()
+        self.ultimo_errore = None  # eccezione dell'ultimo giro non riuscito, None se è andato bene
+
+    def _cartella(self):
+        return dati.BASE_DIR if self.base_dir is None else self.base_dir
+
+    def _scansiona(self):
+        cartella = self._cartella()
+        impronte = {}
+        if not cartella.exists():
+            return impronte
+        for r in cartella.iterdir():
+            if r.is_dir() and r.name.startswith("round"):
+                for f in r.glob("turno_*.csv"):
+                    impronte[(r.name, f.stem)] = cache.impronta(f)
+        return impronte
+
+    def aggiungi_ascoltatore(self, callback):
+        """
+        callback(versione, cambiati) chiamata dal thread a ogni modifica.
+        """
+        self._ascoltatori.append(callback)
+
+    def controlla(self):
+        """
+        Un giro di controllo; restituisce i (round, turno) cambiati.
+        """
+        impronte = self._scansiona()
+        cambiati = sorted(
+            (k for k in impronte.keys() | self._impronte.keys() if impronte.get(k) != self._impronte.get(k)),
+            key=lambda k: (dati.numero(k[0]), dati.numero(k[1])),
+        )
+        if not self._inizializzato:
+            # Primo giro: fotografa lo stato attuale senza notificare nulla
+            self._impronte = impronte
+            self._inizializzato = True
+            return []
+        if not cambiati:
+            return []
+
+        base_dir = self._cartella()
+        lega = leghe.lega_di(base_dir)
+        # CSV modificati a mano: nel database, se la lega ne ha uno (quelli esportati hanno già la loro impronta)
+        dati.database(base_dir)
+        lega.motore.aggiorna()
+        for round_name in {r for r, _ in cambiati}:
+            cache.indice_giocatori(round_name, base_dir=base_dir)
+
+        # Le nuove impronte si registrano solo ad aggiornamento riuscito
+        self._impronte = impronte
+        self.ultimi_cambiati = cambiati
+        self.versione += 1
+        for callback in list(self._ascoltatori):
+            callback(self.versione, cambiati)
+        return cambiati
+
+    def run(self):
+        while not self._fermo.wait(self.intervallo):
+            try:
+                self.controlla()
+                self.ultimo_errore = None
+            except OSError:
+                # File a metà scrittura o appena rimosso: si riprova al giro dopo
+                pass
+            except Exception as e:
+                # Dati non validi o errore inatteso: l'osservatore non si ferma, l'errore si
+                # registra (una volta finché resta lo stesso) e resta in `ultimo_errore`
+                if repr(e) != repr(self.ultimo_errore):
+                    log.exception("aggiornamento dei risultati non riuscito")
+                self.ultimo_errore = e
+
+    def ferma(self):
+        self._fermo.set()
+
+
+_osservatori = {}  # base_dir -> OsservatoreRisultati
+_lock = threading.Lock()
+
+def avvia_osservatore(intervallo=INTERVALLO, base_dir=None):
+    """
+    Avvia (una sola volta per processo e per lega) l'osservatore dei
+    risultati della cartella base_dir e lo restituisce.
+    """
+    base_dir = dati.BASE_DIR if base_dir is None else base_dir
+    with _lock:
+        osservatore = _osservatori.get(base_dir)
+        if osservatore is None or not osservatore.is_alive():
+            osservatore = _osservatori[base_dir] = OsservatoreRisultati(base_dir, intervallo=intervallo)
+            osservatore.controlla()
+            osservatore.start()
+        return osservatore
+
+def segui_aggiornamenti(intervallo=1.0, base_dir=None):
+    """
+    Da chiamare in cima a una pagina Streamlit: ogni `intervallo` secondi un
+    fragment confronta la versione dell'osservatore della lega (la cartella
+    base_dir, predefinita se None) con quella già vista
+    dalla sessione e, se è cambiata, ridisegna l'app. Il controllo è un
+    confronto di interi in memoria, nessuna lettura di file. Se l'ultimo
+    giro dell'osservatore è fallito l'errore compare nella sidebar.
+    """
+    import streamlit as st
+
+    osservatore = avvia_osservatore(base_dir=base_dir)
+    if osservatore.ultimo_errore is not None:
+        # I risultati nuovi non arrivano finché l'errore resta: chi pubblica deve saperlo
+        st.sidebar.warning(f"Aggiornamento dei risultati non riuscito: {osservatore.ultimo_errore}")
+    # Una versione vista per lega: cambiare lega non conta come un aggiornamento
+    chiave = f"versione_dati:{osservatore._cartella()}"
+    st.session_state.setdefault(chiave, osservatore.versione)
+
+    @st.fragment(run_every=intervallo)
+    def _controlla_versione():
+        if osservatore.versione != st.session_state[chiave]:
+            st.session_state[chiave] = osservatore.versione
+            st.rerun(scope="app")
+
+    _controlla_versione()
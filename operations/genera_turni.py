@@ -1,5 +1,9 @@
-import pandas as pd
+import hashlib
+import json
 import os
+import tempfile
+
+import pandas as pd
 
 # Leggi il CSV delle partite generate
 df_matches = pd.read_csv("output/calendario.csv")
@@ -14,43 +18,73 @@ default_set3 = ""
 default_vincitore = ""
 default_superficie = "Terra Rossa"
 
-def crea_csv_per_turni_e_round(df, base_folder="output/rounds"):
-    # Prendi tutti i round unici
-    rounds = df["Round"].unique()
+def scrivi_atomico(percorso, contenuto):
+    """
+    Scrive il file in un temporaneo nella stessa cartella e poi lo rinomina:
+    chi legge (l'app Streamlit) vede sempre il file vecchio o quello nuovo,
+    mai uno scritto a metà. Il file prende i permessi di quello che
+    sostituisce, o quelli di un file nuovo (0666 meno l'umask): mkstemp
+    lo creerebbe leggibile solo dal proprietario.
+    """
+    cartella = os.path.dirname(percorso)
+    try:
+        permessi = os.stat(percorso).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        permessi = 0o666 & ~umask
+    fd, temporaneo = tempfile.mkstemp(dir=cartella, prefix=".tmp_", suffix=".tmp")
+    try:
+        os.fchmod(fd, permessi)
+        with os.fdopen(fd, "wb") as f:
+            f.write(contenuto)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporaneo, percorso)
+    except BaseException:
+        os.remove(temporaneo)
+        raise
 
-    for round_num in rounds:
+def crea_csv_per_turni_e_round(df, base_folder="output/rounds", manifest=True):
+    # Aggiungi colonne con valori di default una volta sola per tutto il calendario
+    df = df.assign(
+        Data=default_data,
+        Orario=default_orario,
+        Luogo=default_luogo,
+        **{"Set 1": default_set1, "Set 2": default_set2, "Set 3": default_set3},
+        Vincitore=default_vincitore,
+        Superficie=default_superficie,
+    )
+    hashes = {}
+
+    # Un solo passaggio: groupby divide il calendario per (round, turno)
+    for (round_num, turno), df_turno in df.groupby(["Round", "Turno"], sort=True):
         # Cartella per il round
         round_folder = os.path.join(base_folder, f"round_{round_num}")
         os.makedirs(round_folder, exist_ok=True)
 
-        # Filtra le partite di questo round
-        df_round = df[df["Round"] == round_num]
-
-        # Prendi tutti i turni di questo round
-        turni = df_round["Turno"].unique()
-
-        for turno in turni:
-            df_turno = df_round[df_round["Turno"] == turno].copy()
-
-            # Aggiungi colonne con valori di default
-            df_turno["Turno"] = turno
-            df_turno["Data"] = default_data
-            df_turno["Orario"] = default_orario
-            df_turno["Luogo"] = default_luogo
-            df_turno["Set 1"] = default_set1
-            df_turno["Set 2"] = default_set2
-            df_turno["Set 3"] = default_set3
-            df_turno["Vincitore"] = default_vincitore
-            df_turno["Superficie"] = default_superficie
-
-            # Seleziona colonne nell'ordine richiesto
-            df_out = df_turno[["Turno","Data", "Orario", "Luogo", "Player 1", "Player 2",
-                               "Set 1", "Set 2", "Set 3", "Vincitore", "Superficie"]]
-
-            # Salva CSV nel path corretto
-            output_path = os.path.join(round_folder, f"turno_{turno}.csv")
-            df_out.to_csv(output_path, index=False)
-            print(f"CSV generato: {output_path}")
+        # Seleziona colonne nell'ordine richiesto
+        df_out = df_turno[["Turno","Data", "Orario", "Luogo", "Player 1", "Player 2",
+                           "Set 1", "Set 2", "Set 3", "Vincitore", "Superficie"]]
+        contenuto = df_out.to_csv(index=False).encode("utf-8")
+        digest = hashlib.sha256(contenuto).hexdigest()
+
+        # Salva CSV nel path corretto solo se il contenuto è cambiato
+        output_path = os.path.join(round_folder, f"turno_{turno}.csv")
+        hashes[f"round_{round_num}/turno_{turno}.csv"] = digest
+        if os.path.exists(output_path):
+            with open(output_path, "rb") as f:
+                if hashlib.sha256(f.read()).hexdigest() == digest:
+                    print(f"CSV invariato: {output_path}")
+                    continue
+        scrivi_atomico(output_path, contenuto)
+        print(f"CSV generato: {output_path}")
+
+    if manifest:
+        # Manifest degli hash: permette a chi legge di capire cosa è cambiato senza rileggere tutto
+        manifest_path = os.path.join(base_folder, "manifest.json")
+        scrivi_atomico(manifest_path, json.dumps(hashes, indent=2, sort_keys=True).encode("utf-8"))
+        print(f"Manifest generato: {manifest_path}")
 
 # Esegui la funzione
 crea_csv_per_turni_e_round(df_matches)
@@ -0,0 +1,119 @@
+import csv
+
+import numpy as np
+import pandas as pd
+
+BYE = "BYE"
+COLONNE = ["MatchID", "Round", "Turno", "Player 1", "Player 2"]
+
+
+def _accoppiamenti(n, turno):
+    """
+    Posizioni (sinistra, destra) delle coppie di un turno del metodo del
+    cerchio, calcolate aritmeticamente: il giocatore 0 resta fermo e gli
+    altri ruotano di una posizione a turno, come nella versione a liste.
+    """
+    m = n - 1
+    half = n // 2
+    rotazione = 1 + (np.arange(m) - turno) % m
+    sinistra = np.concatenate([[0], rotazione[:half - 1]])
+    destra = np.concatenate([[rotazione[m - 1]], rotazione[m - 2 - np.arange(half - 1)]])
+    return sinistra, destra
+
+def turni_round_robin(players, num_rounds=1, bilancia_casa=False, evita=(), capienza=None):
+    """
+    Genera il calendario round-robin un turno alla volta, senza costruirlo
+    tutto in memoria: produce (round, turno, player_1, player_2) con gli
+    array dei giocatori di ogni partita del turno.
+
+    - bilancia_casa: alterna chi è "Player 1" in modo che ognuno lo sia
+      lo stesso numero di volte (±1); nei round pari le coppie si invertono.
+    - evita: coppie di giocatori che non devono incontrarsi (partite saltate
+      come quelle contro il BYE).
+    - capienza: massimo di partite per turno (campi disponibili); i turni
+      più grandi vengono divisi in turni successivi.
+    """
+    for round_num, turno, _, p1, p2 in _turni(players, num_rounds, bilancia_casa, evita, capienza):
+        yield round_num, turno, p1, p2
+
+def _turni(players, num_rounds, bilancia_casa, evita, capienza):
+    # Come turni_round_robin, con i MatchID di ogni partita: la posizione della coppia nel
+    # cerchio completo, come nel generatore originale (le partite col BYE lasciano un buco)
+    giocatori = list(players)  # la lista del chiamante non viene modificata
+    if len(giocatori) % 2 != 0:
+        giocatori.append(BYE)  # Se dispari, aggiunge un bye
+    n = len(giocatori)
+    if n < 2:
+        return
+    nomi = np.array(giocatori, dtype=object)
+    bye = giocatori.index(BYE) if BYE in giocatori else -1
+
+    # Coppie da evitare codificate come min * n + max
+    posizione = {g: i for i, g in enumerate(giocatori)}
+    codici_evita = np.array(
+        [min(posizione[a], posizione[b]) * n + max(posizione[a], posizione[b])
+         for a, b in evita if a in posizione and b in posizione],
+        dtype=np.int64,
+    )
+
+    half = n // 2
+    coppia = np.arange(half)
+    for round_num in range(1, num_rounds + 1):
+        turno_out = 0
+        for turno in range(n - 1):
+            sinistra, destra = _accoppiamenti(n, turno)
+
+            if bilancia_casa:
+                # Fisso: alterna per turno; gli altri: inverte le coppie dispari
+                scambia = np.where(coppia == 0, turno % 2 == 1, coppia % 2 == 1)
+                if round_num % 2 == 0:
+                    scambia = ~scambia
+                sinistra, destra = np.where(scambia, destra, sinistra), np.where(scambia, sinistra, destra)
+
+            tieni = (sinistra != bye) & (destra != bye)  # salta bye
+            if len(codici_evita):
+                codici = np.minimum(sinistra, destra) * n + np.maximum(sinistra, destra)
+                tieni &= ~np.isin(codici, codici_evita)
+            sinistra, destra = sinistra[tieni], destra[tieni]
+            ids = (round_num - 1) * (n - 1) * half + turno * half + coppia[tieni] + 1
+
+            if len(sinistra) == 0:
+                continue
+            passo = capienza or len(sinistra)
+            for inizio in range(0, len(sinistra), passo):
+                turno_out += 1
+                fine = inizio + passo
+                yield round_num, turno_out, ids[inizio:fine], nomi[sinistra[inizio:fine]], nomi[destra[inizio:fine]]
+
+def round_robin_schedule(players, num_rounds=1, bilancia_casa=False, evita=(), capienza=None):
+    """
+    Genera un calendario round-robin con turni (giornate) per i match.
+    Ogni turno ha partite senza giocatori duplicati.
+    Ripete il ciclo per num_rounds volte (rounds).
+    """
+    blocchi = list(_turni(players, num_rounds, bilancia_casa, evita, capienza))
+    if not blocchi:
+        return pd.DataFrame(columns=COLONNE)
+    lunghezze = [len(p1) for _, _, _, p1, _ in blocchi]
+    return pd.DataFrame({
+        "MatchID": np.concatenate([ids for _, _, ids, _, _ in blocchi]),
+        "Round": np.repeat([r for r, _, _, _, _ in blocchi], lunghezze),
+        "Turno": np.repeat([t for _, t, _, _, _ in blocchi], lunghezze),
+        "Player 1": np.concatenate([p1 for _, _, _, p1, _ in blocchi]),
+        "Player 2": np.concatenate([p2 for _, _, _, _, p2 in blocchi]),
+    })
+
+def scrivi_calendario(percorso, players, num_rounds=1, bilancia_casa=False, evita=(), capienza=None):
+    """
+    Scrive il calendario in CSV man mano che i turni vengono generati,
+    con memoria costante anche per migliaia di giocatori.
+    Restituisce il numero di partite scritte.
+    """
+    partite = 0
+    with open(percorso, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(COLONNE)
+        for round_num, turno, ids, p1, p2 in _turni(players, num_rounds, bilancia_casa, evita, capienza):
+            writer.writerows(zip(ids.tolist(), [round_num] * len(p1), [turno] * len(p1), p1, p2))
+            partite += len(p1)
+    return partite
@@ -1,116 +1,54 @@
 import streamlit as st
-from streamlit.components.v1 import html
-from library import *
+from library import (calcola_classifica_punti, carica_partite, get_turni, incontri, mostra_partite,
+                     mostra_segnalazioni, pannello_debug, proiezione_fase_finale, scegli_lega, scegli_round,
+                     scegli_scheda, segui_aggiornamenti, tabellone_fase_finale)
 
 # -- Streamlit app --
 
 st.set_page_config(page_title="🎾 Tennis Elo Dashboard", layout="wide")
 
+# Lega della sessione: ogni lega ha la sua cartella dati e la sua cache
+lega = scegli_lega()
 
-#rounds = get_rounds()
-#round_selected = st.selectbox("Seleziona Round", rounds)
-round_selected="round_1"
-turni = get_turni(BASE_DIR / round_selected)
+# Ridisegna la pagina quando un organizzatore aggiorna un file turno della lega
+segui_aggiornamenti(base_dir=lega.base_dir)
+
+# Pannello di profilazione nella sidebar (?debug=1)
+pannello_debug()
+
+
+# Round scelto dall'utente, condiviso tra le pagine; ogni round si carica alla prima visita
+round_selected = scegli_round(base_dir=lega.base_dir)
+mostra_segnalazioni(lega.base_dir)
+turni = get_turni(lega.base_dir / round_selected)
 turno_selected = st.selectbox("Seleziona Turno", turni)
 
-df_turno = load_turno_csv(round_selected, turno_selected)
+SCHEDE = ["Partite Giocate", "Prossime Partite", "Classifica", "Fase Finale Provvisoria"]
+# Solo la sezione aperta calcola i suoi dati (partite del turno, classifica o proiezione)
+scheda = scegli_scheda(SCHEDE, "scheda_turni")
 
-if df_turno is None:
-    st.error("Dati turno non trovati.")
-    st.stop()
+if scheda in SCHEDE[:2]:
+    df_turno = carica_partite(round_name=round_selected, turno_name=turno_selected, base_dir=lega.base_dir)
 
-# Dividi partite già giocate da quelle future
-df_giocate = df_turno[df_turno["Vincitore"].notna() & (df_turno["Vincitore"] != "")]
-df_future = df_turno[df_turno["Vincitore"].isna() | (df_turno["Vincitore"] == "")]
+    if df_turno.empty:
+        st.error("Dati turno non trovati.")
+        st.stop()
 
-tab1, tab2, tab3, tab4 = st.tabs(["Partite Giocate", "Prossime Partite", "Classifica","Fase Finale Provvisoria"])
+    # Data nel formato dei file turno (gg/mm/aaaa)
+    df_turno["Data"] = df_turno["Data"].dt.strftime("%d/%m/%Y")
 
-with tab1:
+    # Dividi partite già giocate da quelle future
+    df_giocate = df_turno[df_turno["Vincitore"].notna() & (df_turno["Vincitore"] != "")]
+    df_future = df_turno[df_turno["Vincitore"].isna() | (df_turno["Vincitore"] == "")]
+
+if scheda == SCHEDE[0]:
 
     if df_giocate.empty:
         st.info("Nessuna partita giocata ancora in questo turno.")
     else:
-        for _, row in df_giocate.iterrows():
-            vincitore = row['Vincitore']
-            p1, p2 = row['Player 1'], row['Player 2']
-
-            # Evidenzia il vincitore
-            style_p1 = (
-                "font-weight: 800; color: #2e7d32;"  # verde vittoria
-                if p1 == vincitore else
-                "font-weight: 600; color: #b71c1c;"  # rosso sconfitta
-            )
-
-            style_p2 = (
-                "font-weight: 800; color: #2e7d32;"
-                if p2 == vincitore else
-                "font-weight: 600; color: #b71c1c;"
-            )
-
-            # Set
-            s1 = row['Set 1'] if pd.notna(row['Set 1']) else "-"
-            s2 = row['Set 2'] if pd.notna(row['Set 2']) else "-"
-            s3 = row['Set 3'] if pd.notna(row['Set 3']) else "-"
-
-            sets = [estrai_punteggio(row[f'Set {i}']) for i in range(1, 4)]
-
-            # Conta i set vinti da ciascun giocatore
-            set_vinti_p1 = sum(1 for s1, s2 in sets if s1 is not None and s2 is not None and s1 > s2)
-            set_vinti_p2 = sum(1 for s1, s2 in sets if s1 is not None and s2 is not None and s2 > s1)
-
-            # Calcolo dei punti
-            if set_vinti_p1 == 2 and set_vinti_p2 == 0:
-                punti_p1, punti_p2 = 3, 0
-            elif set_vinti_p1 == 2 and set_vinti_p2 == 1:
-                punti_p1, punti_p2 = 2, 1
-            elif set_vinti_p1 == 1 and set_vinti_p2 == 2:
-                punti_p1, punti_p2 = 1, 2
-            elif set_vinti_p1 == 0 and set_vinti_p2 == 2:
-                punti_p1, punti_p2 = 0, 3
-            else:
-                punti_p1 = punti_p2 = "-"
-
-            # Format set linee
-            set_line_p1 = " ".join(str(s[0]) if s[0] is not None else "-" for s in sets)
-            set_line_p2 = " ".join(str(s[1]) if s[1] is not None else "-" for s in sets)
-
-            html_card = f"""
-              <div style="width: 100%; display: flex; justify-content: flex-start;"> 
-                  <div style="
-                      border-radius: 10px;
-                      padding: 16px 20px;
-                      margin-bottom: 14px;
-                      background: linear-gradient(135deg, #fff5b7, #fbd72b);
-                      box-shadow: 0 2px 20px rgba(0, 0, 0, 0.05);
-                      font-family: 'Segoe UI', sans-serif;
-                      width: 100%;
-                      max-width: 500px;
-                  ">
-                    <div style="display: flex; justify-content: space-between; margin-bottom: 12px; font-size: 15px; color: #777;">
-                      <div>📍 <strong>{row['Luogo']}</strong></div>
-                      <div>{row['Data']}</div> 
-                      <div>{row['Superficie']}</div>
-                    </div>
-                
-                    <div style="display: flex; justify-content: space-between; align-items: flex-start;">
-                      <div style="text-align: left;">
-                        <div style="{style_p1} font-size: 18px; margin-bottom: 6px;">{p1}</div>
-                        <div style="font-size: 16px; margin-bottom: 10px;">{set_line_p1}</div>
-                
-                        <div style="{style_p2} font-size: 18px; margin-bottom: 6px;">{p2}</div>
-                        <div style="font-size: 16px;">{set_line_p2}</div>
-                      </div>
-                
-                      <div style="text-align: right; font-size: 16px; font-weight: bold;">
-                        <div style="margin-bottom: 26px;">{punti_p1} pt</div>
-                        <div>{punti_p2} pt</div>
-                      </div>
-                    </div>
-                  </div>
-                </div>
-            """
-            html(html_card, height=200)
-with tab2:
+        # Tutte le card del turno in un solo componente
+        mostra_partite(df_giocate, chiave="pagina_turno")
+elif scheda == SCHEDE[1]:
 
     if df_future.empty:
         st.info("Non ci sono altre partite in programma per questo turno.")
@@ -141,9 +79,9 @@ with tab2:
                     """,
                     unsafe_allow_html=True,
                 )
-with tab3:
+elif scheda == SCHEDE[2]:
     # Calcola la classifica
-    df_classifica = calcola_classifica_punti(round_selected, turno_selected)
+    df_classifica = calcola_classifica_punti(round_selected, turno_selected, base_dir=lega.base_dir)
 
     # Layout a due colonne: sinistra (classifica) e destra (vuota o per altri contenuti)
     col_sx, col_dx = st.columns([1, 2])  # sinistra stretta, destra più ampia
@@ -173,19 +111,15 @@ with tab3:
 
     # La col_dx resta vuota o può contenere altri componenti (grafici, partite, etc.)
 
-with tab4:
-    df_classifica = calcola_classifica_punti(round_selected, turno_selected)
+elif scheda == SCHEDE[3]:
+    df_classifica = calcola_classifica_punti(round_selected, turno_selected, base_dir=lega.base_dir)
 
     if len(df_classifica) >= 4:
-        primo = df_classifica.loc[0, "Giocatore"]
-        secondo = df_classifica.loc[1, "Giocatore"]
-        terzo = df_classifica.loc[2, "Giocatore"]
-        quarto = df_classifica.loc[3, "Giocatore"]
-
-        semifinals = [
-            {"player1": primo, "player2": quarto},
-            {"player1": secondo, "player2": terzo},
-        ]
+        # Tabellone dei primi N (4, 8, 16, ... fino ai classificati), salvato su disco per i rerun
+        dimensioni = [d for d in (4, 8, 16, 32, 64) if d <= len(df_classifica)]
+        qualificati = st.radio("Qualificati", dimensioni, horizontal=True, key="qualificati_fase_finale")
+        tabellone = tabellone_fase_finale(round_selected, turno_selected, qualificati, base_dir=lega.base_dir)
+        df_incontri = incontri(tabellone)
 
 
         def match_card(player1, player2, title=""):
@@ -208,15 +142,34 @@ with tab4:
                 """
 
 
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown(match_card(semifinals[0]["player1"], semifinals[0]["player2"], "Semifinale 1"),
-                        unsafe_allow_html=True)
-        with col2:
-            st.markdown(match_card(semifinals[1]["player1"], semifinals[1]["player2"], "Semifinale 2"),
-                        unsafe_allow_html=True)
-
-        st.markdown(match_card("Vincente SF1", "Vincente SF2", "Finale"), unsafe_allow_html=True)
+        # Un turno per riga, due card per colonna
+        for _, turno in df_incontri.groupby("Turno", sort=True):
+            st.markdown(f"**{turno['Nome Turno'].iloc[0]}**")
+            colonne = st.columns(min(len(turno), 2))
+            for i, (_, incontro) in enumerate(turno.iterrows()):
+                with colonne[i % len(colonne)]:
+                    st.markdown(match_card(incontro["Giocatore 1"], incontro["Giocatore 2"], incontro["Incontro"]),
+                                unsafe_allow_html=True)
+
+        # Proiezione per il tabellone scelto: le partite rimaste nel round giocate molte volte
+        probabilita, primi_incontri = proiezione_fase_finale(round_selected, qualificati, base_dir=lega.base_dir)
+        if probabilita["Qualificazione"].isin([0.0, 1.0]).all():
+            st.success(f"Qualificati già decisi: le partite rimaste non possono cambiare i primi {qualificati}.")
+        else:
+            st.subheader("Proiezione (simulazione Monte Carlo sulle partite rimaste)")
+            # Probabilità in percentuale per le barre
+            colonne = [c for c in probabilita.columns if c not in ("Giocatore", "Punti")]
+            probabilita[colonne] *= 100
+            primi_incontri["Probabilità"] *= 100
+            barra = lambda c: st.column_config.ProgressColumn(c, format="%.1f%%", min_value=0, max_value=100)
+
+            col_sx, col_dx = st.columns([3, 2])
+            with col_sx:
+                st.dataframe(probabilita, hide_index=True, column_config={c: barra(c) for c in colonne})
+            with col_dx:
+                st.markdown("**Semifinali più probabili**" if qualificati == 4 else "**Primo turno più probabile**")
+                st.dataframe(primi_incontri.head(6), hide_index=True,
+                             column_config={"Probabilità": barra("Probabilità")})
 
     else:
         st.info("Aspetta che siano giocate almeno 2 partite nel turno corrente per mostrare le semifinali.")
\ No newline at end of file
@@ -1,120 +1,49 @@
 import streamlit as st
-from streamlit.components.v1 import html
-from library import *
-
-BASE_DIR = Path("operations/output/rounds")
+from library import (andamento_giocatori, grafico_andamento, indice_giocatori, mostra_partite, mostra_segnalazioni,
+                     pannello_debug, scegli_lega, scegli_round, scegli_scheda, segui_aggiornamenti,
+                     statistiche_giocatori)
 
 st.set_page_config(page_title="📋 Dettaglio Giocatore", layout="wide")
 
-round_selected = "round_1"  # Fisso per ora, puoi renderlo dinamico
-turni = get_turni(BASE_DIR / round_selected)
+# Lega della sessione: ogni lega ha la sua cartella dati e la sua cache
+lega = scegli_lega()
 
-# Carica tutti i dati fino all'ultimo turno
-df_all = pd.DataFrame()
-for turno in turni:
-    df = load_turno_csv(round_selected, turno)
-    if df is not None:
-        df_all = pd.concat([df_all, df], ignore_index=True)
+# Ridisegna la pagina quando un organizzatore aggiorna un file turno della lega
+segui_aggiornamenti(base_dir=lega.base_dir)
 
-# Estrai giocatori
-giocatori = sorted(set(df_all["Player 1"]).union(df_all["Player 2"]))
-giocatore = st.selectbox("Seleziona un giocatore", giocatori)
+# Pannello di profilazione nella sidebar (?debug=1)
+pannello_debug()
 
-# Partite giocate
-giocate = df_all[df_all["Vincitore"].notna() & (df_all["Vincitore"] != "")]
-giocate_player = giocate[(giocate["Player 1"] == giocatore) | (giocate["Player 2"] == giocatore)]
+# Round scelto dall'utente, condiviso tra le pagine; ogni round si carica alla prima visita
+round_selected = scegli_round(base_dir=lega.base_dir)
+mostra_segnalazioni(lega.base_dir)
 
-# Partite future
-future = df_all[df_all["Vincitore"].isna() | (df_all["Vincitore"] == "")]
-future_player = future[(future["Player 1"] == giocatore) | (future["Player 2"] == giocatore)]
+# Indice giocatore -> partite del round, con gli aggregati cumulativi fino al round;
+# costruito una volta per versione dei dati
+indice = indice_giocatori(round_selected, base_dir=lega.base_dir)
+
+# Estrai giocatori
+giocatori = indice.giocatori
+giocatore = st.selectbox("Seleziona un giocatore", giocatori)
 
-tab1, tab2, tab3 = st.tabs(["🕹️ Partite Giocate", "📅 Partite Future", "📈 Statistiche"])
+SCHEDE = ["🕹️ Partite Giocate", "📅 Partite Future", "📈 Statistiche"]
+# Solo la sezione aperta calcola i suoi dati (le partite del giocatore sono lookup nell'indice)
+scheda = scegli_scheda(SCHEDE, "scheda_giocatore")
 
-with tab1:
+if scheda == SCHEDE[0]:
+    giocate_player = indice.giocate(giocatore)
     if giocate_player.empty:
         st.info("Nessuna partita giocata finora.")
     else:
-        # Converte il campo "Data" in datetime
-        giocate_player["Data"] = pd.to_datetime(giocate["Data"], format="%d/%m/%Y", errors="coerce")
+        # "Data" arriva già come datetime dall'archivio
         giocate_player["Data_formattata"] = giocate_player["Data"].dt.strftime("%d %B %Y")  # Es: 23 giugno 2025
         # Ordina per data crescente (dal più vecchio al più recente)
         giocate_player = giocate_player.sort_values(by="Data")
-        for _, row in giocate_player.iterrows():
-            vincitore = row['Vincitore']
-            p1, p2 = row['Player 1'], row['Player 2']
-
-            # Evidenzia il vincitore
-            style_p1 = (
-                "font-weight: 800; color: #2e7d32;" if p1 == vincitore else
-                "font-weight: 600; color: #b71c1c;"
-            )
-            style_p2 = (
-                "font-weight: 800; color: #2e7d32;" if p2 == vincitore else
-                "font-weight: 600; color: #b71c1c;"
-            )
-
-            # Estrai set
-            sets = [estrai_punteggio(row[f'Set {i}']) for i in range(1, 4)]
-
-            # Conta set vinti
-            set_vinti_p1 = sum(1 for s1, s2 in sets if s1 is not None and s2 is not None and s1 > s2)
-            set_vinti_p2 = sum(1 for s1, s2 in sets if s1 is not None and s2 is not None and s2 > s1)
-
-            # Calcola punti
-            if set_vinti_p1 == 2 and set_vinti_p2 == 0:
-                punti_p1, punti_p2 = 3, 0
-            elif set_vinti_p1 == 2 and set_vinti_p2 == 1:
-                punti_p1, punti_p2 = 2, 1
-            elif set_vinti_p1 == 1 and set_vinti_p2 == 2:
-                punti_p1, punti_p2 = 1, 2
-            elif set_vinti_p1 == 0 and set_vinti_p2 == 2:
-                punti_p1, punti_p2 = 0, 3
-            else:
-                punti_p1 = punti_p2 = "-"
-
-            # Format set lines
-            set_line_p1 = " ".join(str(s[0]) if s[0] is not None else "-" for s in sets)
-            set_line_p2 = " ".join(str(s[1]) if s[1] is not None else "-" for s in sets)
-
-            # HTML rendering
-            html_card = f"""
-              <div style="width: 100%; display: flex; justify-content: flex-start;"> 
-                  <div style="
-                      border-radius: 10px;
-                      padding: 16px 20px;
-                      margin-bottom: 14px;
-                      background: linear-gradient(135deg, #fff5b7, #fbd72b);
-                      box-shadow: 0 2px 20px rgba(0, 0, 0, 0.05);
-                      font-family: 'Segoe UI', sans-serif;
-                      width: 100%;
-                      max-width: 500px;
-                  ">
-                    <div style="display: flex; justify-content: space-between; margin-bottom: 12px; font-size: 15px; color: #777;">
-                      <div>📍 <strong>{row['Luogo']}</strong></div>
-                      <div>{row['Data_formattata']}</div>
-                      <div>{row['Superficie']}</div>
-                    </div>
-
-                    <div style="display: flex; justify-content: space-between; align-items: flex-start;">
-                      <div style="text-align: left;">
-                        <div style="{style_p1} font-size: 18px; margin-bottom: 6px;">{p1}</div>
-                        <div style="font-size: 16px; margin-bottom: 10px;">{set_line_p1}</div>
-
-                        <div style="{style_p2} font-size: 18px; margin-bottom: 6px;">{p2}</div>
-                        <div style="font-size: 16px;">{set_line_p2}</div>
-                      </div>
-
-                      <div style="text-align: right; font-size: 16px; font-weight: bold;">
-                        <div style="margin-bottom: 26px;">{punti_p1} pt</div>
-                        <div>{punti_p2} pt</div>
-                      </div>
-                    </div>
-                  </div>
-                </div>
-            """
-            html(html_card, height=200)
+        # Tutte le card del giocatore in un solo componente
+        mostra_partite(giocate_player, chiave="pagina_giocatore", colonna_data="Data_formattata")
 
-with tab2:
+elif scheda == SCHEDE[1]:
+    future_player = indice.future(giocatore)
     if future_player.empty:
         st.info("Nessuna partita futura trovata.")
     else:
@@ -130,15 +59,51 @@ with tab2:
                 </div>
             """, unsafe_allow_html=True)
 
-with tab3:
-    # Classifica generale
-    ultimo_turno = turni[-1]
-    classifica = calcola_classifica_punti(round_selected, ultimo_turno)
+elif scheda == SCHEDE[2]:
+    # Posizione, punti e partite cumulativi dall'indice: gli stessi della classifica delle altre pagine
+    stats = indice.statistiche(giocatore)
 
-    if giocatore in classifica["Giocatore"].values:
-        stats = classifica[classifica["Giocatore"] == giocatore].iloc[0]
-        st.success(f"🏆 **Posizione in classifica:** {classifica[classifica['Giocatore'] == giocatore].index[0] + 1}")
-        st.metric("🎯 Punti Totali", stats["Punti"])
-        st.metric("🎾 Partite Giocate", stats["Partite Giocate"])
+    if stats is not None:
+        st.success(f"🏆 **Posizione in classifica:** {int(stats['Posizione'])}")
+        st.metric("🎯 Punti Totali", int(stats["Punti"]))
+        st.metric("🎾 Partite Giocate", int(stats["Partite Giocate"]))
     else:
         st.warning("Il giocatore non ha ancora punti registrati.")
+
+    # Serie, forma, rapporti e split: calcolati per tutti i giocatori una volta per versione dei dati
+    analisi = statistiche_giocatori(round_selected, base_dir=lega.base_dir)
+    profilo = analisi.giocatore(giocatore)
+    if profilo is not None:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("✅ Vittorie", f"{profilo['Vinte']}/{profilo['Partite']}", f"{profilo['% Vittorie']}%")
+        col2.metric("🔥 Serie attuale", profilo["Serie Attuale"],
+                    f"max {profilo['Serie Vittorie Max']} vittorie di fila")
+        col3.metric(f"📈 Forma (ultime {analisi.forma})", profilo["Forma"],
+                    f"{profilo[f'Vittorie Ultime {analisi.forma}']} vittorie")
+        col4.metric("🎲 Tiebreak", f"{profilo['Tiebreak Vinti']}-{profilo['Tiebreak Persi']}")
+
+        col1, col2 = st.columns(2)
+        col1.metric("Set vinti/persi", f"{profilo['Set Vinti']}-{profilo['Set Persi']}", f"{profilo['% Set']}%")
+        col2.metric("Giochi vinti/persi", f"{profilo['Giochi Vinti']}-{profilo['Giochi Persi']}",
+                    f"{profilo['% Giochi']}%")
+
+        st.subheader("Per superficie")
+        st.dataframe(analisi.split(giocatore, "Superficie"), hide_index=True)
+        st.subheader("Per luogo")
+        st.dataframe(analisi.split(giocatore, "Luogo"), hide_index=True)
+
+        # Andamento del giocatore sullo sfondo degli altri, un solo calcolo per tutti
+        andamento = andamento_giocatori(round_selected, base_dir=lega.base_dir)
+        if not andamento.empty:
+            st.subheader("📉 Andamento")
+            valore = st.radio("Mostra", ["Punti", "Elo"], horizontal=True)
+            st.plotly_chart(grafico_andamento(andamento, valore, evidenzia=giocatore), use_container_width=True)
+
+    st.subheader("🏅 Migliori per superficie")
+    superfici = sorted(analisi.per_superficie["Superficie"].unique())
+    if superfici:
+        superficie = st.selectbox("Superficie", superfici)
+        st.dataframe(analisi.migliori(superficie=superficie)[["Giocatore", "Partite", "Vinte", "% Vittorie", "% Giochi"]],
+                     hide_index=True)
+    else:
+        st.info("Nessuna partita giocata finora.")
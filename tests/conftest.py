@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+RADICE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RADICE))
+
+from benchmarks.genera_lega import genera_lega
+
+
+@pytest.fixture
+def lega(tmp_path):
+    # Lega sintetica nel layout di operations/output/rounds: 12 giocatori, 2 round,
+    # le ultime partite ancora da giocare e qualcuna interrotta
+    base_dir = tmp_path / "rounds"
+    genera_lega(base_dir, 12, 2)
+    return base_dir
@@ -0,0 +1,118 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from conftest import RADICE
+from library.api import ServizioApi, _accetta_gzip
+
+
+class Osservatore:
+    versione = 1
+
+
+async def richiesta(porta, percorso, **intestazioni):
+    reader, writer = await asyncio.open_connection("127.0.0.1", porta)
+    righe = [f"GET {percorso} HTTP/1.1", "Host: prova", "Connection: close"]
+    righe += [f"{k.replace('_', '-')}: {v}" for k, v in intestazioni.items()]
+    writer.write(("\r\n".join(righe) + "\r\n\r\n").encode("latin-1"))
+    risposta = await reader.read()
+    writer.close()
+    testa, _, corpo = risposta.partition(b"\r\n\r\n")
+    prima, *campi = testa.decode("latin-1").split("\r\n")
+    return int(prima.split(" ")[1]), {k.lower(): v.strip() for k, _, v in (c.partition(":") for c in campi)}, corpo
+
+def conversazione(servizio, *passi):
+    # Esegue le richieste in ordine su un server locale; ogni passo vede le risposte precedenti
+    async def principale():
+        server = await asyncio.start_server(servizio.gestisci, "127.0.0.1", 0)
+        porta = server.sockets[0].getsockname()[1]
+        risposte = []
+        async with server:
+            for passo in passi:
+                percorso, intestazioni = passo(risposte)
+                risposte.append(await richiesta(porta, percorso, **intestazioni))
+        return risposte
+    return asyncio.run(principale())
+
+@pytest.fixture
+def servizio(monkeypatch):
+    monkeypatch.chdir(RADICE)  # dati di operations/output
+    return ServizioApi(Osservatore())
+
+
+def test_etag_e_304_per_forma(servizio):
+    gz, chiaro, gz_304, chiaro_con_etag_gz = conversazione(
+        servizio,
+        lambda r: ("/api/classifica", {"Accept_Encoding": "gzip"}),
+        lambda r: ("/api/classifica", {}),
+        lambda r: ("/api/classifica", {"Accept_Encoding": "gzip", "If_None_Match": r[0][1]["etag"]}),
+        lambda r: ("/api/classifica", {"If_None_Match": r[0][1]["etag"]}),
+    )
+    assert gz[0] == 200 and gz[1]["content-encoding"] == "gzip" and gz[1]["etag"].endswith('-gz"')
+    assert json.loads(gzip.decompress(gz[2])) == json.loads(chiaro[2])
+    assert chiaro[0] == 200 and "content-encoding" not in chiaro[1] and not chiaro[1]["etag"].endswith('-gz"')
+    assert gz_304[0] == 304 and gz_304[2] == b""
+    # L'ETag della forma compressa non vale per quella in chiaro
+    assert chiaro_con_etag_gz[0] == 200 and chiaro_con_etag_gz[2] == chiaro[2]
+    assert json.loads(chiaro[2])["classifica"]
+
+def test_cache_per_parametri_dell_endpoint(servizio):
+    calcoli = []
+    calcola = servizio.calcola
+    servizio.calcola = lambda percorso, parametri: calcoli.append(percorso) or calcola(percorso, parametri)
+    risposte = conversazione(servizio, *[lambda r, p=p: (p, {}) for p in (
+        "/api/rounds", "/api/rounds?x=1", "/api/classifica?round=round_1&turno=turno_2",
+        "/api/classifica?turno=turno_2&round=round_1&y=2", "/api/classifica?round=round_99")])
+    assert [r[0] for r in risposte] == [200, 200, 200, 200, 404]
+    assert calcoli == ["/api/rounds", "/api/classifica", "/api/classifica"]
+    Osservatore.versione = 2  # nuova versione dei dati: si ricalcola
+    try:
+        conversazione(servizio, lambda r: ("/api/rounds", {}))
+    finally:
+        Osservatore.versione = 1
+    assert calcoli[-1] == "/api/rounds" and len(calcoli) == 4
+
+def test_metodo_non_ammesso(servizio):
+    async def principale():
+        server = await asyncio.start_server(servizio.gestisci, "127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.sockets[0].getsockname()[1])
+        writer.write(b"POST /api/rounds HTTP/1.1\r\nConnection: close\r\n\r\n")
+        risposta = await reader.read()
+        writer.close()
+        server.close()
+        return risposta
+    assert asyncio.run(principale()).startswith(b"HTTP/1.1 405")
+
+def test_content_length_non_valida(servizio):
+    async def principale():
+        server = await asyncio.start_server(servizio.gestisci, "127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.sockets[0].getsockname()[1])
+        writer.write(b"GET /api/rounds HTTP/1.1\r\nContent-Length: abc\r\n\r\n")
+        risposta = await reader.read()
+        writer.close()
+        server.close()
+        return risposta
+    assert asyncio.run(principale()).startswith(b"HTTP/1.1 400")
+
+def test_errore_interno_in_json(servizio, monkeypatch):
+    guasto = [True]
+
+    def elo(parametri):
+        if guasto:
+            raise RuntimeError("archivio illeggibile")
+        return {"elo": []}
+
+    monkeypatch.setitem(servizio._rotte, "/api/elo", elo)
+    errore, dopo = conversazione(servizio, lambda r: ("/api/elo", {}), lambda r: guasto.clear() or ("/api/elo", {}))
+    assert errore[0] == 500 and json.loads(errore[2]) == {"errore": "errore interno"}
+    # Il 500 non resta in cache: alla richiesta dopo si ricalcola
+    assert dopo[0] == 200 and json.loads(dopo[2]) == {"elo": []}
+
+@pytest.mark.parametrize("valore, compressa", [
+    ("gzip", True), ("gzip, deflate, br", True), ("br;q=1.0, gzip;q=0.8", True), ("*", True),
+    ("gzip;q=0", False), ("gzip; q=0.0, *;q=1", False), ("identity", False), ("*;q=0", False), ("", False),
+])
+def test_accept_encoding_con_q(valore, compressa):
+    assert _accetta_gzip(valore) is compressa
@@ -0,0 +1,57 @@
+import os
+
+import pandas as pd
+
+from library import cache
+from library.archivio import carica_partite, sincronizza_archivio
+from library.caricamento import scopri_turni
+
+
+def riscrivi(percorso, modifica):
+    df = pd.read_csv(percorso, dtype=str)
+    modifica(df)
+    df.to_csv(percorso, index=False)
+    st = percorso.stat()
+    os.utime(percorso, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_archivio_uguale_ai_csv(lega, tmp_path):
+    percorso = tmp_path / "partite.parquet"
+    assert sincronizza_archivio(lega, percorso)
+    assert not sincronizza_archivio(lega, percorso)  # niente di cambiato: nessuna riscrittura
+    df = carica_partite(base_dir=lega, percorso=percorso)
+    voci = scopri_turni(lega)
+    csv = pd.concat([pd.read_csv(v.percorso, dtype=str) for v in voci], ignore_index=True)
+    assert df["Player 1"].astype(str).tolist() == csv["Player 1"].tolist()
+    assert df["Set 1"].fillna("").tolist() == csv["Set 1"].fillna("").tolist()
+    assert df["Data"].dt.strftime("%d/%m/%Y").tolist() == csv["Data"].tolist()
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_filtri(lega, tmp_path):
+    percorso = tmp_path / "partite.parquet"
+    tutte = carica_partite(base_dir=lega, percorso=percorso)
+    turno = carica_partite("round_2", "turno_3", base_dir=lega, percorso=percorso)
+    assert len(turno) and (turno["Round"] == 2).all() and (turno["Turno"] == 3).all()
+    giocatore = carica_partite(giocatore="Giocatore 00003", colonne=["Player 1", "Player 2"], base_dir=lega,
+                               percorso=percorso)
+    assert list(giocatore.columns) == ["Player 1", "Player 2"]
+    assert len(giocatore) == ((tutte["Player 1"] == "Giocatore 00003") | (tutte["Player 2"] == "Giocatore 00003")).sum()
+
+def test_turno_modificato_si_rilegge(lega, tmp_path):
+    percorso = tmp_path / "partite.parquet"
+    sincronizza_archivio(lega, percorso)
+    file = lega / "round_1" / "turno_1.csv"
+    riscrivi(file, lambda df: df.__setitem__("Luogo", "Campo Nuovo"))
+    assert sincronizza_archivio(lega, percorso)
+    df = carica_partite("round_1", base_dir=lega, percorso=percorso)
+    assert (df.loc[df["Turno"] == 1, "Luogo"] == "Campo Nuovo").all()
+    assert (df.loc[df["Turno"] == 2, "Luogo"] != "Campo Nuovo").all()
+
+def test_impronta_senza_effetti(lega, tmp_path):
+    percorso = tmp_path / "partite.parquet"
+    prima = cache._impronta_partizione(None, lega, percorso)
+    assert not percorso.exists()
+    assert cache._impronta_partizione(None, lega, percorso) == prima
+    riscrivi(lega / "round_2" / "turno_1.csv", lambda df: df.__setitem__("Orario", "18:00"))
+    assert cache._impronta_partizione(None, lega, percorso) != prima
+    assert cache._impronta_partizione("round_1", lega, percorso) == cache._impronte_turni(lega, fino_a="round_1")
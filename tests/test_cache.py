@@ -0,0 +1,53 @@
+import os
+
+from library import cache
+from library.cache import CacheLRU
+
+
+def test_colpo_e_ricalcolo_su_impronta():
+    c = CacheLRU(4)
+    chiamate = []
+    calcola = lambda: chiamate.append(1) or len(chiamate)
+    assert c.ottieni("a", (1, 10), calcola) == 1
+    assert c.ottieni("a", (1, 10), calcola) == 1
+    assert (c.colpi, c.mancati) == (1, 1)
+    assert c.ottieni("a", (2, 10), calcola) == 2  # file cambiato: si ricalcola
+    assert c.cerca("a", (2, 10)) == 2
+    assert c.cerca("a", (1, 10)) is None
+    assert c.cerca("b", (1, 10)) is None
+
+def test_capacita_scarta_meno_recente():
+    c = CacheLRU(2)
+    c.ottieni("a", 0, lambda: "A")
+    c.ottieni("b", 0, lambda: "B")
+    c.ottieni("a", 0, lambda: "?")  # "a" torna la più recente
+    c.ottieni("c", 0, lambda: "C")
+    assert len(c) == 2
+    assert c.cerca("a", 0) == "A"
+    assert c.cerca("b", 0) is None
+    c.svuota()
+    assert len(c) == 0
+
+def test_impronta_file(tmp_path):
+    percorso = tmp_path / "turno_1.csv"
+    assert cache.impronta(percorso) is None
+    percorso.write_text("x")
+    prima = cache.impronta(percorso)
+    percorso.write_text("xy")
+    assert cache.impronta(percorso) != prima
+
+def test_turno_riletto_solo_se_cambia(lega):
+    df = cache.load_turno_csv("round_1", "turno_1", lega)
+    df["Colonna"] = 1  # la copia restituita non tocca la voce in cache
+    c = cache.cache_lega(lega)
+    colpi = c.colpi
+    assert "Colonna" not in cache.load_turno_csv("round_1", "turno_1", lega)
+    assert c.colpi == colpi + 1
+    file = lega / "round_1" / "turno_1.csv"
+    testo = file.read_text(encoding="utf-8")
+    for luogo in ["Stadio Centrale", "Montella", "Circolo Tennis", "Palazzetto", "Campo Comunale"]:
+        testo = testo.replace(luogo, "Campo Nuovo")
+    file.write_text(testo, encoding="utf-8")
+    st = file.stat()
+    os.utime(file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert (cache.load_turno_csv("round_1", "turno_1", lega)["Luogo"] == "Campo Nuovo").all()
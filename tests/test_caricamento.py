@@ -0,0 +1,45 @@
+import threading
+
+import pandas as pd
+
+from library import dati
+from library.caricamento import carica_turni, mappa, scopri_turni
+
+
+def test_mappa_mantiene_l_ordine():
+    thread = set()
+
+    def quadrato(x):
+        thread.add(threading.get_ident())
+        return x * x
+
+    assert mappa(quadrato, range(500), lavoratori=4) == [x * x for x in range(500)]
+    assert threading.get_ident() not in thread  # blocchi nel pool
+    thread.clear()
+    assert mappa(quadrato, range(6), lavoratori=4) == [x * x for x in range(6)]
+    assert thread == {threading.get_ident()}  # pochi elementi: niente pool
+
+def test_scopri_turni_in_ordine_numerico(tmp_path):
+    for r, t in [(1, 2), (1, 10), (10, 1), (2, 1), (1, 1)]:
+        (tmp_path / f"round_{r}").mkdir(exist_ok=True)
+        (tmp_path / f"round_{r}" / f"turno_{t}.csv").write_text("x\n")
+    (tmp_path / "round_1" / "note.txt").write_text("")
+    assert [(v.round, v.turno) for v in scopri_turni(tmp_path)] == [
+        ("round_1", "turno_1"), ("round_1", "turno_2"), ("round_1", "turno_10"), ("round_2", "turno_1"),
+        ("round_10", "turno_1")]
+
+def test_carica_turni(lega):
+    df = carica_turni(lega)
+    voci = scopri_turni(lega)
+    assert len(df) == sum(len(pd.read_csv(v.percorso)) for v in voci)
+    assert df[["Round", "Turno"]].drop_duplicates().apply(tuple, axis=1).tolist() == \
+        [(dati.numero(v.round), dati.numero(v.turno)) for v in voci]
+    pd.testing.assert_frame_equal(carica_turni(lega, lavoratori=4), df)
+
+def test_carica_turni_salta_i_file_spariti(lega):
+    voci = scopri_turni(lega)
+    voci[1].percorso.unlink()  # sparito dopo la scansione
+    df = carica_turni(lega, voci=voci)
+    assert len(df) == sum(len(pd.read_csv(v.percorso)) for v in voci if v.percorso.exists())
+    assert (dati.numero(voci[1].round), dati.numero(voci[1].turno)) not in \
+        set(df[["Round", "Turno"]].apply(tuple, axis=1))
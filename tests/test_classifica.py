@@ -0,0 +1,89 @@
+import os
+
+import pandas as pd
+
+from library import dati
+from library.classifica import MotoreClassifica
+
+
+def classifica_originale(base_dir, round_name, turno_name):
+    # La classifica della prima versione (riga per riga, solo punti e partite), come riferimento
+    righe = []
+    for r in dati.get_rounds(base_dir):
+        for t in dati.get_turni(base_dir / r):
+            if (dati.numero(r), dati.numero(t)) <= (dati.numero(round_name), dati.numero(turno_name)):
+                righe.append(pd.read_csv(base_dir / r / f"{t}.csv", dtype=str))
+    df = pd.concat(righe, ignore_index=True)
+    df = df[df["Vincitore"].notna() & (df["Vincitore"] != "")]
+
+    def giochi(testo):
+        try:
+            s1, s2 = testo.split("-")
+            return int(s1.split("(")[0]), int(s2.split("(")[0])
+        except (AttributeError, ValueError):
+            return None, None
+
+    punti, partite = {}, {}
+    for _, riga in df.iterrows():
+        sets = [giochi(riga[f"Set {i}"]) for i in range(1, 4)]
+        vinti1 = sum(1 for a, b in sets if a is not None and a > b)
+        vinti2 = sum(1 for a, b in sets if a is not None and b > a)
+        esito = {(2, 0): (3, 0), (2, 1): (2, 1), (1, 2): (1, 2), (0, 2): (0, 3)}.get((vinti1, vinti2))
+        if esito is None:
+            continue
+        for giocatore, p in zip((riga["Player 1"], riga["Player 2"]), esito):
+            punti[giocatore] = punti.get(giocatore, 0) + p
+            partite[giocatore] = partite.get(giocatore, 0) + 1
+    return {g: (punti[g], partite[g]) for g in punti}
+
+def totali(classifica):
+    return {g: (p, n) for g, p, n in zip(classifica["Giocatore"], classifica["Punti"], classifica["Partite Giocate"])}
+
+def turni(base_dir):
+    return [(r, t) for r in dati.get_rounds(base_dir) for t in dati.get_turni(base_dir / r)]
+
+
+def test_motore_uguale_alla_classifica_originale(lega):
+    motore = MotoreClassifica(lega)
+    motore.aggiorna()
+    for r, t in turni(lega):
+        assert totali(motore.classifica(r, t)) == classifica_originale(lega, r, t), (r, t)
+
+def test_classifica_ordinata_per_punti_e_con_i_saldi(lega):
+    motore = MotoreClassifica(lega)
+    motore.aggiorna()
+    classifica = motore.classifica(*turni(lega)[-1])
+    assert list(classifica.columns) == ["Giocatore", "Punti", "Partite Giocate", "Saldo Set", "Saldo Giochi"]
+    assert classifica["Punti"].is_monotonic_decreasing
+    assert classifica["Saldo Set"].sum() == 0 and classifica["Saldo Giochi"].sum() == 0
+
+def test_aggiorna_recepisce_un_file_modificato(lega):
+    motore = MotoreClassifica(lega)
+    motore.aggiorna()
+    r, t = turni(lega)[0]
+    percorso = lega / r / f"{t}.csv"
+    df = pd.read_csv(percorso, dtype=str)
+    # Il primo risultato si ribalta: vince l'altro giocatore 6-0 6-0
+    df.loc[0, ["Set 1", "Set 2", "Set 3", "Vincitore"]] = ["0-6", "0-6", None, df.loc[0, "Player 2"]]
+    df.to_csv(percorso, index=False)
+    st = percorso.stat()
+    os.utime(percorso, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    motore.aggiorna()
+    for r, t in turni(lega):
+        assert totali(motore.classifica(r, t)) == classifica_originale(lega, r, t), (r, t)
+
+def test_turno_senza_una_colonna(lega):
+    r, t = turni(lega)[0]
+    percorso = lega / r / f"{t}.csv"
+    pd.read_csv(percorso, dtype=str).drop(columns=["Superficie", "Luogo"]).to_csv(percorso, index=False)
+    motore = MotoreClassifica(lega)
+    motore.aggiorna()
+    assert totali(motore.classifica(r, t)) == classifica_originale(lega, r, t)
+
+def test_turno_non_presente_vale_il_precedente(lega):
+    motore = MotoreClassifica(lega)
+    motore.aggiorna()
+    r, t = turni(lega)[-1]
+    pd.testing.assert_frame_equal(motore.classifica(r, "turno_99"), motore.classifica(r, t))
+    assert motore.classifica("round_0", "turno_1").empty
@@ -0,0 +1,88 @@
+import pandas as pd
+
+from library import cache, dati
+from library.classifica import MotoreClassifica
+from library.database import ArchivioSQL, _gira_set
+
+
+def test_classifica_sql_uguale_al_motore(lega):
+    motore = MotoreClassifica(lega)
+    motore.aggiorna()
+    db = ArchivioSQL(lega.parent / "prova.sqlite", lega)
+    db.importa_csv()
+    assert db.rounds() == dati.get_rounds(lega)
+    for r in db.rounds():
+        assert db.turni(r) == dati.get_turni(lega / r)
+        for t in db.turni(r):
+            pd.testing.assert_frame_equal(db.classifica(r, t), motore.classifica(r, t), check_dtype=False)
+
+def test_partite_sql_uguali_ai_csv(lega):
+    db = ArchivioSQL(lega.parent / "prova.sqlite", lega)
+    db.importa_csv()
+    r = dati.get_rounds(lega)[0]
+    t = dati.get_turni(lega / r)[0]
+    csv = pd.read_csv(lega / r / f"{t}.csv", dtype=str)
+    sql = db.partite(r, t)
+    assert sql["Player 1"].tolist() == csv["Player 1"].tolist()
+    assert sql["Set 1"].fillna("").tolist() == csv["Set 1"].fillna("").tolist()
+    assert sql["Vincitore"].fillna("").tolist() == csv["Vincitore"].fillna("").tolist()
+
+def test_registra_risultato_riesporta_il_turno(lega):
+    db = ArchivioSQL(lega.parent / "prova.sqlite", lega)
+    db.importa_csv()
+    r = dati.get_rounds(lega)[-1]
+    t = dati.get_turni(lega / r)[-1]
+    percorso = lega / r / f"{t}.csv"
+    futura = pd.read_csv(percorso, dtype=str).iloc[-1]
+    assert pd.isna(futura["Vincitore"])
+    # Giocatori nell'ordine opposto al file: i set si girano
+    db.registra_risultato(r, t, futura["Player 2"], futura["Player 1"], ["6-3", "6-4"], futura["Player 2"])
+
+    riga = pd.read_csv(percorso, dtype=str).iloc[-1]
+    assert (riga["Set 1"], riga["Set 2"], riga["Vincitore"]) == ("3-6", "4-6", futura["Player 2"])
+    motore = MotoreClassifica(lega)
+    motore.aggiorna()
+    pd.testing.assert_frame_equal(db.classifica(r, t), motore.classifica(r, t), check_dtype=False)
+
+def test_gira_set_tiene_il_tiebreak_con_i_suoi_giochi():
+    assert _gira_set("7-6(5)") == "6(5)-7"
+    assert _gira_set("6(3)-7") == "7-6(3)"
+    assert _gira_set("6-4") == "4-6"
+    assert _gira_set("rit.") == "rit."
+
+def test_registra_risultato_gira_il_tiebreak(lega):
+    db = ArchivioSQL(lega.parent / "prova.sqlite", lega)
+    db.importa_csv()
+    r = dati.get_rounds(lega)[-1]
+    t = dati.get_turni(lega / r)[-1]
+    percorso = lega / r / f"{t}.csv"
+    futura = pd.read_csv(percorso, dtype=str).iloc[-1]
+    db.registra_risultato(r, t, futura["Player 2"], futura["Player 1"], ["7-6(5)", "6(3)-7", "6-4"],
+                          futura["Player 2"])
+
+    riga = pd.read_csv(percorso, dtype=str).iloc[-1]
+    assert (riga["Set 1"], riga["Set 2"], riga["Set 3"]) == ("6(5)-7", "7-6(3)", "4-6")
+    sql = db.partite(r, t, giocatore=futura["Player 1"])
+    assert sql["Set 1"].tolist()[-1] == "6(5)-7"
+
+def test_csv_modificato_a_mano_prima_dell_importazione(lega):
+    db = ArchivioSQL(lega.parent / dati.DATABASE, lega)
+    db.importa_csv()
+    r = dati.get_rounds(lega)[0]
+    t = dati.get_turni(lega / r)[0]
+    percorso = lega / r / f"{t}.csv"
+    prima = cache.load_turno_csv(r, t, lega)
+    classifica = cache.calcola_classifica_punti(r, t, lega)
+
+    # Il primo giocatore cambia nome nel file, senza passare da importa_csv
+    csv = pd.read_csv(percorso, dtype=str)
+    vecchio = csv.loc[0, "Player 1"]
+    csv = csv.replace(vecchio, "Nuovo Nome")
+    csv.to_csv(percorso, index=False)
+
+    dopo = cache.load_turno_csv(r, t, lega)
+    assert dopo["Player 1"].tolist() != prima["Player 1"].tolist()
+    assert dopo.loc[0, "Player 1"] == "Nuovo Nome"
+    giocatori = cache.calcola_classifica_punti(r, t, lega)["Giocatore"].tolist()
+    assert "Nuovo Nome" in giocatori and vecchio not in giocatori
+    assert vecchio in classifica["Giocatore"].tolist()
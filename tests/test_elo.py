@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from library.caricamento import carica_turni
+from library.elo import ELO_INIZIALE, MotoreElo, calcola_elo
+from library.punteggio import NUM_SET, calcola_punteggi
+
+
+def test_replay_uguale_ai_risultati_registrati_uno_alla_volta(lega):
+    df = carica_turni(lega).sort_values(["Round", "Turno"], kind="stable")
+    replay = MotoreElo()
+    colonne = replay.replay(df)
+
+    sequenza = MotoreElo()
+    punteggi = calcola_punteggi(df)
+    for i, riga in df.iterrows():
+        p = punteggi.loc[i]
+        if not isinstance(riga["Vincitore"], str) or not riga["Vincitore"] or not p["Completa"]:
+            continue
+        giochi = sum(max(p[f"Giochi 1 Set {s + 1}"], 0) - max(p[f"Giochi 2 Set {s + 1}"], 0) for s in range(NUM_SET))
+        finali = sequenza.registra(riga["Player 1"], riga["Player 2"], p["Set Vinti 1"], p["Set Vinti 2"], giochi)
+        assert finali[2] == pytest.approx(colonne.loc[i, "Elo 1 Finale"])
+        assert finali[3] == pytest.approx(colonne.loc[i, "Elo 2 Finale"])
+
+    for g in replay.indici:
+        assert replay.elo(g) == pytest.approx(sequenza.elo(g))
+    # Partite da giocare: nessun Elo finale
+    future = df["Vincitore"].isna().to_numpy()
+    assert future.any() and colonne.loc[future, "Elo 1 Finale"].isna().all()
+
+def test_rating_conservato_e_chi_vince_sale(lega):
+    df = carica_turni(lega)
+    motore = MotoreElo()
+    motore.replay(df)
+    assert motore.rating.mean() == pytest.approx(ELO_INIZIALE)
+    assert motore.elo("sconosciuto") == ELO_INIZIALE
+    prima = motore.elo("Giocatore 00000"), motore.elo("Giocatore 00001")
+    dopo = motore.registra("Giocatore 00000", "Giocatore 00001", 2, 0, 8)
+    assert dopo[2] > prima[0] and dopo[3] < prima[1]
+
+def test_calcola_elo_allineato_all_indice(lega):
+    df = carica_turni(lega).iloc[::-1]
+    colonne = calcola_elo(df)
+    assert colonne.index.equals(df.index)
+    assert np.isfinite(colonne["Elo iniziale 1"]).all()
@@ -0,0 +1,37 @@
+import numpy as np
+
+from library import cache, leghe
+from library.indice import IndiceGiocatori
+
+
+def test_aggregati_come_la_classifica(lega):
+    for round_name in cache.get_rounds(lega):
+        turni = cache.get_turni(lega / round_name)
+        classifica = leghe.lega_di(lega).classifica(round_name, turni[-1]).reset_index(drop=True)
+        indice = cache.indice_giocatori(round_name, base_dir=lega)
+        for posizione, riga in classifica.iterrows():
+            stats = indice.statistiche(riga["Giocatore"])
+            assert stats["Posizione"] == posizione + 1
+            for colonna in ["Punti", "Partite Giocate", "Saldo Set", "Saldo Giochi"]:
+                assert stats[colonna] == riga[colonna]
+
+def test_partite_del_round(lega):
+    indice = cache.indice_giocatori("round_2", base_dir=lega)
+    partite = cache.carica_partite("round_2", base_dir=lega)
+    assert indice.giocatori == sorted(indice.giocatori)
+    for giocatore in indice.giocatori:
+        sue = partite[(partite["Player 1"] == giocatore) | (partite["Player 2"] == giocatore)]
+        giocate, future = indice.giocate(giocatore), indice.future(giocatore)
+        assert len(giocate) + len(future) == len(sue)
+        assert (giocate["Round"] == 2).all()
+        assert giocate["Vincitore"].notna().all() and future["Vincitore"].isna().all()
+    assert indice.statistiche("Nessuno") is None
+    assert len(indice.righe("Nessuno")) == 0
+
+def test_da_dataframe(lega):
+    df = cache.carica_partite(base_dir=lega)
+    dal_df = IndiceGiocatori(df)
+    compatto = cache.indice_giocatori(base_dir=lega)
+    assert dal_df.giocatori == compatto.giocatori
+    assert dal_df.aggregati.equals(compatto.aggregati)
+    assert np.array_equal(dal_df.righe(dal_df.giocatori[0]), compatto.righe(dal_df.giocatori[0]))
@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pytest
+
+from library import dati
+from library.cache import BudgetMemoria, CacheLRU
+from library.leghe import PREDEFINITA, RegistroLeghe
+
+
+def test_budget_comune_scarta_tra_leghe():
+    budget = BudgetMemoria(massimo_byte=3000)
+    ferma, visitata = CacheLRU(10, budget), CacheLRU(10, budget)
+    ferma.ottieni("a", 0, lambda: np.zeros(100))  # 800 byte
+    visitata.ottieni("a", 0, lambda: np.zeros(100))
+    visitata.ottieni("b", 0, lambda: np.zeros(100))
+    visitata.ottieni("a", 0, lambda: None)  # colpo: la voce diventa la più recente
+    visitata.ottieni("c", 0, lambda: np.zeros(100))
+    # Oltre il limite esce la voce usata meno di recente, anche se di un'altra lega
+    assert ferma.cerca("a", 0) is None
+    assert all(visitata.cerca(k, 0) is not None for k in "abc")
+    assert budget.occupati == 2400 and budget.scartate == 1
+    visitata.svuota()
+    assert budget.occupati == 0
+
+def test_voce_sopra_il_limite_resta():
+    budget = BudgetMemoria(massimo_byte=100)
+    c = CacheLRU(10, budget)
+    c.ottieni("grande", 0, lambda: np.zeros(1000))
+    assert c.cerca("grande", 0) is not None
+    c.ottieni("altra", 0, lambda: np.zeros(1000))
+    assert c.cerca("grande", 0) is None and len(c) == 1
+
+def test_registro_si_rilegge(tmp_path):
+    percorso = tmp_path / "leghe.json"
+    registro = RegistroLeghe(percorso)
+    assert registro.nomi() == [PREDEFINITA]
+    assert registro.lega().base_dir == dati.BASE_DIR
+    percorso.write_text('{"sabato": "%s"}' % (tmp_path / "sabato").as_posix(), encoding="utf-8")
+    sabato = registro.lega("sabato")
+    assert sabato.base_dir == tmp_path / "sabato" / "rounds"
+    assert sabato.archivio == tmp_path / "sabato" / "partite.parquet"
+    percorso.write_text('{"sabato": "%s", "over50": "%s"}' % ((tmp_path / "sabato").as_posix(),
+                                                               (tmp_path / "over50").as_posix()), encoding="utf-8")
+    st = percorso.stat()
+    os.utime(percorso, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert registro.nomi() == [PREDEFINITA, "sabato", "over50"]
+    assert registro.lega("sabato") is sabato  # stessa cartella: stesso oggetto (e stesso motore)
+    with pytest.raises(KeyError):
+        registro.lega("domenica")
+
+def test_lega_di_cartella_non_registrata(tmp_path, lega):
+    registro = RegistroLeghe(tmp_path / "leghe.json")
+    anonima = registro.lega_di(lega)
+    assert anonima is registro.lega_di(lega)
+    assert anonima.archivio == lega.parent / "partite.parquet"
+    classifica = anonima.classifica("round_1", "turno_2")
+    assert len(classifica) and classifica["Punti"].is_monotonic_decreasing
@@ -0,0 +1,57 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import RADICE
+
+
+@pytest.fixture(autouse=True)
+def radice(monkeypatch):
+    monkeypatch.chdir(RADICE)  # le pagine leggono operations/output
+
+def apri(pagina):
+    at = AppTest.from_file(str(RADICE / pagina), default_timeout=300)
+    at.run()
+    assert not at.exception, [e.value for e in at.exception]
+    return at
+
+
+def test_home():
+    at = apri("app.py")
+    for valore in at.radio[0].options:
+        at.radio[0].set_value(valore).run()
+        assert not at.exception, (valore, [e.value for e in at.exception])
+
+def test_turni_tutte_le_sezioni():
+    at = apri("pages/1Turni.py")
+    turno = next(s for s in at.selectbox if s.label == "Seleziona Turno")
+    turno.set_value(turno.options[-1]).run()
+    for scheda in at.radio(key="scheda_turni").options:
+        at.radio(key="scheda_turni").set_value(scheda).run()
+        assert not at.exception, (scheda, [e.value for e in at.exception])
+    assert at.dataframe  # proiezione e incontri più probabili
+
+def test_turni_fase_finale_per_dimensione_del_tabellone():
+    at = apri("pages/1Turni.py")
+    turno = next(s for s in at.selectbox if s.label == "Seleziona Turno")
+    turno.set_value(turno.options[-1]).run()
+    at.radio(key="scheda_turni").set_value("Fase Finale Provvisoria").run()
+    for qualificati in at.radio(key="qualificati_fase_finale").options:
+        at.radio(key="qualificati_fase_finale").set_value(int(qualificati)).run()
+        assert not at.exception, (qualificati, [e.value for e in at.exception])
+        probabilita = at.dataframe[0].value
+        assert [c for c in probabilita.columns if c.endswith("°")][-1] == f"P{qualificati}°"
+        assert 0 < len(at.dataframe[1].value) <= 6  # primi incontri più probabili
+
+def test_giocatore():
+    at = apri("pages/2Giocatore.py")
+    giocatori = next(s for s in at.selectbox if s.label == "Seleziona un giocatore")
+    for giocatore in giocatori.options[:3]:
+        giocatori.set_value(giocatore).run()
+        assert not at.exception, (giocatore, [e.value for e in at.exception])
+    for radio in at.radio:
+        for valore in radio.options:
+            radio.set_value(valore).run()
+            assert not at.exception, (valore, [e.value for e in at.exception])
+
+def test_regolamento():
+    apri("pages/3Regolamento.py")
@@ -0,0 +1,60 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from library import cache
+from library.partite import ArchivioPartite, Dizionario
+
+
+def test_andata_e_ritorno(lega):
+    df = cache.carica_partite(base_dir=lega)
+    archivio = ArchivioPartite.da_dataframe(df)
+    assert len(archivio) == len(df)
+    ritorno = archivio.a_dataframe()
+    pd.testing.assert_frame_equal(ritorno[["Round", "Turno", "Data"]], df[["Round", "Turno", "Data"]],
+                                  check_dtype=False)
+    for colonna in ["Orario", "Luogo", "Player 1", "Player 2", "Set 1", "Set 2", "Set 3", "Vincitore", "Superficie"]:
+        assert ritorno[colonna].astype(object).where(ritorno[colonna].notna(), None).tolist() == \
+            df[colonna].astype(object).where(df[colonna].notna() & (df[colonna] != ""), None).tolist()
+    assert np.allclose(ritorno["Elo 1 Finale"], df["Elo 1 Finale"], atol=1e-3, equal_nan=True)
+
+def test_vista_partita(lega):
+    df = cache.carica_partite("round_1", "turno_1", base_dir=lega)
+    archivio = ArchivioPartite.da_dataframe(df)
+    partita, riga = archivio[0], df.iloc[0]
+    assert (partita.round, partita.turno) == (1, 1)
+    assert partita.player1 == riga["Player 1"] and partita.player2 == riga["Player 2"]
+    assert partita.data == riga["Data"].date() and isinstance(partita.data, date)
+    assert partita.set[0] == riga["Set 1"]
+    assert partita.giochi[0] == (riga["Giochi 1 Set 1"], riga["Giochi 2 Set 1"])
+    assert partita.giocata == pd.notna(riga["Vincitore"])
+    assert archivio[-1].player1 == df.iloc[-1]["Player 1"]
+    with pytest.raises(IndexError):
+        archivio[len(archivio)]
+    righe = archivio.righe_giocatore(riga["Player 1"])
+    assert 0 in righe and all(riga["Player 1"] in (p.player1, p.player2) for p in map(archivio.__getitem__, righe))
+    assert len(archivio.righe_giocatore("Nessuno")) == 0
+
+def test_dizionari_per_archivio(lega):
+    df = cache.carica_partite(base_dir=lega)
+    primo, secondo = ArchivioPartite.da_dataframe(df), ArchivioPartite.da_dataframe(df.iloc[:3])
+    # Ogni archivio ha i suoi dizionari, grandi quanto i suoi valori distinti
+    assert primo.dizionari is not secondo.dizionari
+    assert len(secondo.dizionari.giocatori.valori) <= 6
+    giocatori = pd.unique(pd.concat([df["Player 1"], df["Player 2"]]).astype(str))
+    assert sorted(primo.dizionari.giocatori.valori) == sorted(giocatori)
+    selezione = primo.seleziona(primo.round == 2)
+    assert selezione.dizionari is primo.dizionari and (selezione.round == 2).all()
+    condivisi = ArchivioPartite.da_dataframe(df.iloc[:3], primo.dizionari)
+    assert np.array_equal(condivisi.player1, primo.player1[:3])
+    assert primo.player1.dtype == primo.set.dtype == primo.orario.dtype == np.int32
+
+def test_codici_oltre_il_tipo():
+    dizionario = Dizionario()
+    assert dizionario.codifica([f"g{i}" for i in range(128)], np.int8).max() == 127
+    with pytest.raises(OverflowError):
+        dizionario.codifica(["un altro"], np.int8)
+    assert len(dizionario.valori) == 128
+    assert dizionario.codifica(["g0", None, ""]).tolist() == [0, -1, -1]
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from library.punteggio import calcola_punteggi, parse_set, set_possibile
+from library.validazione import analizza_set
+
+TESTI = ["6-4", "4-6", "6-0", "7-5", "7-6(5)", "6(3)-7", "7-6", "6-5", "8-6", "7-4", "6-4(3)", "10-8", "12-10",
+         "11-8", "10-9", " 6 - 3 ", "6-", "-4", "a-b", "64", "6-4-3", "7-6(5", "6(3-7", "7-6)5(", "6 4-3",
+         "(5)7-6", "", None]
+
+
+def test_set_possibile():
+    assert set_possibile(6, 4) and set_possibile(7, 5) and set_possibile(6, 7, tiebreak=True)
+    assert not set_possibile(6, 5) and not set_possibile(8, 6) and not set_possibile(6, 4, tiebreak=True)
+    # Match tiebreak solo nel set decisivo, a 10 con due punti di scarto
+    assert not set_possibile(10, 8) and set_possibile(10, 8, decisivo=True) and set_possibile(12, 10, decisivo=True)
+    assert not set_possibile(11, 8, decisivo=True) and not set_possibile(10, 9, decisivo=True)
+    assert set_possibile([6, 6, 7], [4, 5, 6], [False, False, True]).tolist() == [True, False, True]
+
+def test_classifica_e_validazione_leggono_i_set_allo_stesso_modo():
+    for decisivo in (False, True):
+        g1, g2 = parse_set(TESTI, decisivo=decisivo)
+        v1, v2, stato = analizza_set(TESTI, decisivo=decisivo)
+        assert ((g1 >= 0) == (stato == 1)).all(), decisivo
+        assert (g1 == v1).all() and (g2 == v2).all(), decisivo
+
+def test_una_sola_grammatica():
+    # Testi fuori grammatica: illeggibili per la validazione e mancanti per la classifica
+    fuori = ["6-4-3", "7-6(5", "6(3-7", "7-6)5(", "6 4-3", "(5)7-6"]
+    g1, _ = parse_set(fuori)
+    _, _, stato = analizza_set(fuori)
+    assert (g1 == -1).all() and (stato == -1).all()
+
+def test_parse_set():
+    g1, g2 = parse_set(pd.Series(["6-4", "7-6(5)", "6-5", None, "10-8"]), decisivo=np.array([0, 0, 0, 0, 1], bool))
+    assert g1.tolist() == [6, 7, -1, -1, 10] and g2.tolist() == [4, 6, -1, -1, 8]
+
+def test_calcola_punteggi():
+    df = pd.DataFrame({"Set 1": ["6-4", "6-4", "4-6", "2-6", "6-4", "6-4"],
+                       "Set 2": ["6-3", "3-6", "6-4", "3-6", None, "3-6"],
+                       "Set 3": [None, "7-5", "3-6", None, None, "10-8"]}, index=[5, 6, 7, 8, 9, 10])
+    punteggi = calcola_punteggi(df)
+    assert punteggi.index.tolist() == df.index.tolist()
+    assert punteggi["Punti 1"].tolist() == [3, 2, 1, 0, -1, 2]
+    assert punteggi["Punti 2"].tolist() == [0, 1, 2, 3, -1, 1]
+    assert punteggi["Completa"].tolist() == [True, True, True, True, False, True]
+    assert punteggi["Giochi 1 Set 3"].tolist() == [-1, 7, 3, -1, -1, 10]
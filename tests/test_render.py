@@ -0,0 +1,47 @@
+import json
+
+import pandas as pd
+
+from library.render import ALTEZZA_CARD, ALTEZZA_MASSIMA, dati_card, html_partite, numero_pagine
+
+
+def partite():
+    return pd.DataFrame({
+        "Luogo": ["Montella", "Palazzetto"],
+        "Data": ["23 giugno 2025", "24 giugno 2025"],
+        "Superficie": ["Terra", "Sintetico"],
+        "Player 1": ["Anna", "Carlo"],
+        "Player 2": ["Bruno", "Dario"],
+        "Set 1": ["6-4", "6-7(5)"],
+        "Set 2": ["3-6", "7-5"],
+        "Set 3": ["10-8", ""],
+        "Vincitore": ["Anna", "Dario"],
+    })
+
+
+def test_campi_delle_card():
+    card = dati_card(partite())
+    assert card[0] == {"luogo": "Montella", "data": "23 giugno 2025", "superficie": "Terra", "p1": "Anna",
+                       "p2": "Bruno", "linea1": "6 3 10", "linea2": "4 6 8", "punti1": "2 pt", "punti2": "1 pt",
+                       "vince1": True, "vince2": False}
+    # Partita non finita (un set pari): niente punti, il vincitore dichiarato resta evidenziato
+    assert card[1]["linea1"] == "6 7 -" and card[1]["punti1"] == "- pt" and card[1]["punti2"] == "- pt"
+    assert card[1]["vince2"] and not card[1]["vince1"]
+    assert dati_card(partite().iloc[:0]) == []
+
+def test_documento_unico():
+    card = dati_card(partite())
+    card[0]["luogo"] = "</script><b>"
+    documento, altezza = html_partite(card)
+    assert documento.count('<template id="card">') == 1
+    assert "</script><b>" not in documento  # il JSON non chiude lo script
+    dati = documento.split("const partite = ", 1)[1].split(";\n", 1)[0]
+    assert json.loads(dati.replace("<\\/", "</")) == card
+    assert altezza == 2 * ALTEZZA_CARD
+    assert html_partite(card * 100)[1] == ALTEZZA_MASSIMA
+    assert html_partite([])[1] == ALTEZZA_CARD
+
+def test_pagine():
+    assert numero_pagine(0) == 1
+    assert numero_pagine(20, 20) == 1
+    assert numero_pagine(21, 20) == 2
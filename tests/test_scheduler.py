@@ -0,0 +1,63 @@
+import itertools
+
+import pandas as pd
+
+from operations.scheduler import round_robin_schedule, scrivi_calendario, turni_round_robin
+
+
+def calendario_originale(players, num_rounds=1):
+    # Il generatore della prima versione (metodo del cerchio su liste), come riferimento
+    players = list(players)
+    if len(players) % 2 != 0:
+        players.append("BYE")
+    n = len(players)
+    half = n // 2
+    schedule = []
+    for round_num in range(1, num_rounds + 1):
+        rotation = players[1:]
+        for turno in range(n - 1):
+            pairs = [(players[0], rotation[-1])] + [(rotation[i], rotation[-i - 2]) for i in range(half - 1)]
+            for idx, (p1, p2) in enumerate(pairs):
+                if p1 != "BYE" and p2 != "BYE":
+                    schedule.append({"MatchID": (round_num - 1) * (n - 1) * half + turno * half + idx + 1,
+                                     "Round": round_num, "Turno": turno + 1, "Player 1": p1, "Player 2": p2})
+            rotation = [rotation[-1]] + rotation[:-1]
+    return pd.DataFrame(schedule)
+
+
+def test_uguale_al_generatore_originale():
+    for n in (2, 5, 8, 11):
+        giocatori = [f"G{i}" for i in range(n)]
+        pd.testing.assert_frame_equal(round_robin_schedule(giocatori, 2), calendario_originale(giocatori, 2),
+                                      check_dtype=False)
+
+def test_ogni_coppia_una_volta_per_round():
+    giocatori = [f"G{i}" for i in range(9)]
+    calendario = round_robin_schedule(giocatori, 2)
+    for _, partite in calendario.groupby("Round"):
+        coppie = [frozenset(c) for c in zip(partite["Player 1"], partite["Player 2"])]
+        assert sorted(coppie, key=sorted) == sorted(map(frozenset, itertools.combinations(giocatori, 2)), key=sorted)
+    for _, partite in calendario.groupby(["Round", "Turno"]):
+        assert not set(partite["Player 1"]) & set(partite["Player 2"])
+        assert partite["Player 1"].is_unique and partite["Player 2"].is_unique
+    assert giocatori == [f"G{i}" for i in range(9)]  # la lista del chiamante non cambia
+
+def test_evita_e_capienza():
+    giocatori = [f"G{i}" for i in range(8)]
+    calendario = round_robin_schedule(giocatori, evita=[("G0", "G1")], capienza=3)
+    coppie = {frozenset(c) for c in zip(calendario["Player 1"], calendario["Player 2"])}
+    assert frozenset(("G0", "G1")) not in coppie and len(coppie) == 27
+    assert calendario.groupby(["Round", "Turno"]).size().max() <= 3
+    assert calendario["MatchID"].is_unique
+
+def test_bilancia_casa():
+    calendario = round_robin_schedule([f"G{i}" for i in range(10)], bilancia_casa=True)
+    casa = calendario["Player 1"].value_counts()
+    assert casa.max() - casa.min() <= 1
+
+def test_scrivi_calendario(tmp_path):
+    giocatori = [f"G{i}" for i in range(7)]
+    percorso = tmp_path / "calendario.csv"
+    assert scrivi_calendario(percorso, giocatori, 2) == 42
+    pd.testing.assert_frame_equal(pd.read_csv(percorso), round_robin_schedule(giocatori, 2), check_dtype=False)
+    assert sum(len(p1) for _, _, p1, _ in turni_round_robin(giocatori, 2)) == 42
@@ -0,0 +1,24 @@
+import numpy as np
+
+from library.serie import lttb
+
+
+def test_lttb_tiene_estremi_e_picchi():
+    x = np.arange(1000)
+    y = np.sin(x / 50.0)
+    y[437] = 10.0
+    scelti = lttb(x, y, 60)
+    assert len(scelti) == 60 and scelti[0] == 0 and scelti[-1] == 999
+    assert (np.diff(scelti) > 0).all()
+    assert 437 in scelti
+
+def test_lttb_serie_corta_intatta():
+    assert lttb([0, 1, 2], [5, 6, 7], 10).tolist() == [0, 1, 2]
+
+def test_lttb_matrice_uguale_alle_serie_singole():
+    rng = np.random.default_rng(0)
+    x = np.arange(300)
+    y = rng.normal(size=(4, 300)).cumsum(axis=1)
+    insieme = lttb(x, y, 40)
+    for riga, scelti in zip(y, insieme):
+        assert (lttb(x, riga, 40) == scelti).all()
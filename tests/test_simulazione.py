@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from library.caricamento import carica_turni
+from library.classifica import MotoreClassifica
+from library.simulazione import _podio, probabilita_esiti, simula_fase_finale
+from library.spareggi import MatriciScontri
+
+
+def classifica_e_future(lega):
+    df = carica_turni(lega)
+    motore = MotoreClassifica(lega)
+    motore.aggiorna()
+    ultimo = df.iloc[-1]
+    classifica = motore.classifica(f"round_{ultimo['Round']}", f"turno_{ultimo['Turno']}")
+    return df, classifica, df[df["Vincitore"].isna()]
+
+
+def test_probabilita_esiti():
+    p = probabilita_esiti(np.array([0.5, 0.9]))
+    assert p.sum(axis=1) == pytest.approx([1, 1])
+    assert p[0] == pytest.approx([0.25, 0.25, 0.25, 0.25])
+    assert p[1, :2].sum() == pytest.approx(0.9)
+
+@pytest.mark.parametrize("qualificati", [2, 4, 8])
+def test_podio_uguale_agli_spareggi(qualificati):
+    # Molte parità: punti e scontri diretti con pochi valori possibili
+    rng = np.random.default_rng(qualificati)
+    n, righe = 9, 2000
+    giocatori = [f"G{i}" for i in range(n)]
+    punti = rng.integers(0, 4, (righe, n)).astype(np.int32)
+    diretti = rng.integers(0, 3, (2, righe, n, n)).astype(np.int32)
+    diretti[:, :, np.arange(n), np.arange(n)] = 0
+    giochi = rng.integers(-1, 2, (n, n)).astype(np.int32)
+    saldo_set = rng.integers(-1, 2, (righe, n)).astype(np.int32)
+    saldo_giochi = rng.integers(-1, 2, n).astype(np.int32)
+
+    def scontri(r, c):
+        return (diretti[0][r][:, c][:, :, c], diretti[1][r][:, c][:, :, c], giochi[np.ix_(c, c)],
+                saldo_set[np.ix_(r, c)], np.broadcast_to(saldo_giochi[c], (len(r), len(c))))
+
+    podio = _podio(punti, qualificati, scontri, passo=97)
+    for r in range(righe):
+        m = MatriciScontri(giocatori, diretti[0][r], diretti[1][r], giochi, np.ones((n, n)))
+        indici = np.lexsort((m._rango_nome, -punti[r]))
+        atteso = []
+        for gruppo in np.split(indici, np.flatnonzero(np.diff(punti[r][indici])) + 1):
+            atteso.extend(m._risolvi(gruppo, saldo_set[r], saldo_giochi))
+        assert podio[r].tolist() == atteso[:qualificati], r
+
+@pytest.mark.parametrize("qualificati", [4, 8])
+def test_senza_partite_rimaste_la_classifica(lega, qualificati):
+    df, classifica, future = classifica_e_future(lega)
+    probabilita, incontri = simula_fase_finale(classifica, future.iloc[:0], [], 100, qualificati, seed=0,
+                                               matrici=MatriciScontri.da_partite(df))
+    primi = classifica["Giocatore"].head(qualificati).tolist()
+    assert set(probabilita.loc[probabilita["Qualificazione"] == 1.0, "Giocatore"]) == set(primi)
+    for i, g in enumerate(primi):
+        assert probabilita.set_index("Giocatore").loc[g, f"P{i + 1}°"] == 1.0
+    assert incontri["Probabilità"].tolist() == [1.0] * (qualificati // 2)
+    assert {frozenset(c) for c in zip(incontri["Giocatore 1"], incontri["Giocatore 2"])} == \
+        {frozenset((primi[s], primi[qualificati - 1 - s])) for s in range(qualificati // 2)}
+
+def test_probabilita_coerenti(lega):
+    df, classifica, future = classifica_e_future(lega)
+    assert len(future)
+    probabilita, incontri = simula_fase_finale(classifica, future, np.full(len(future), 0.5), 2000, 8, seed=1,
+                                               matrici=MatriciScontri.da_partite(df))
+    posizioni = probabilita[[f"P{i + 1}°" for i in range(8)]]
+    assert posizioni.sum(axis=0).to_numpy() == pytest.approx(np.ones(8))
+    assert probabilita["Qualificazione"].sum() == pytest.approx(8)
+    assert probabilita["Qualificazione"].is_monotonic_decreasing
+    assert incontri["Probabilità"].sum() == pytest.approx(4)
+    # Stesso seme, stesso risultato
+    pd.testing.assert_frame_equal(probabilita, simula_fase_finale(classifica, future, np.full(len(future), 0.5), 2000,
+                                                                  8, seed=1, matrici=MatriciScontri.da_partite(df))[0])
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from library.spareggi import MatriciScontri
+
+
+def partite(*righe):
+    # (vincitore, perdente, set dal punto di vista del vincitore...)
+    return pd.DataFrame([{"Player 1": v, "Player 2": p, **{f"Set {i + 1}": (s + [None] * 3)[i] for i in range(3)},
+                          "Vincitore": v} for v, p, *s in righe])
+
+def ordine(df):
+    return MatriciScontri.da_partite(df).tabella()["Giocatore"].tolist()
+
+
+def test_pari_punti_decide_lo_scontro_diretto():
+    # Bruno e Anna a 4 punti: Bruno ha vinto lo scontro diretto, viene prima nonostante il nome
+    df = partite(("Bruno", "Anna", "6-4", "3-6", "6-4"), ("Anna", "Carla", "6-0", "6-0"),
+                 ("Bruno", "Carla", "6-4", "4-6", "6-4"))
+    assert ordine(df) == ["Bruno", "Anna", "Carla"]
+
+def test_scontri_diretti_pari_decidono_i_saldi_generali():
+    # Giro a tre con scontri identici: contano i giochi fatti contro Dario
+    df = partite(("Anna", "Bruno", "6-4", "6-4"), ("Bruno", "Carla", "6-4", "6-4"), ("Carla", "Anna", "6-4", "6-4"),
+                 ("Anna", "Dario", "6-0", "6-0"), ("Bruno", "Dario", "6-4", "6-4"), ("Carla", "Dario", "6-3", "6-3"))
+    assert ordine(df) == ["Anna", "Carla", "Bruno", "Dario"]
+
+def test_parita_completa_decide_il_nome():
+    df = partite(("Carla", "Bruno", "6-4", "6-4"), ("Bruno", "Anna", "6-4", "6-4"), ("Anna", "Carla", "6-4", "6-4"))
+    assert ordine(df) == ["Anna", "Bruno", "Carla"]
+
+def test_partite_incomplete_e_future_ignorate():
+    df = partite(("Anna", "Bruno", "6-4", "6-4"), ("Bruno", "Carla", "6-4"))
+    df.loc[len(df)] = {"Player 1": "Carla", "Player 2": "Anna", "Set 1": None, "Set 2": None, "Set 3": None,
+                       "Vincitore": None}
+    tabella = MatriciScontri.da_partite(df).tabella()
+    assert tabella["Giocatore"].tolist() == ["Anna", "Bruno"]
+    assert tabella["Partite Giocate"].tolist() == [1, 1]
+
+def test_gruppo_diviso_si_rispareggia_tra_i_rimasti():
+    # Gruppo a pari punti in classifica: negli scontri tra loro A e B ne fanno 6, C 4 e D 2;
+    # tra A e B si ricontano solo i loro scontri, dove vince B
+    giocatori = ["A", "B", "C", "D"]
+    punti = np.array([[0, 1, 2, 3], [2, 0, 1, 3], [1, 2, 0, 1], [0, 0, 2, 0]], dtype=np.int32)
+    zeri = np.zeros((4, 4), dtype=np.int32)
+    m = MatriciScontri(giocatori, punti, zeri, zeri, np.ones((4, 4), dtype=np.int32))
+    assert [giocatori[i] for i in m._risolvi(np.arange(4), zeri.sum(axis=1), zeri.sum(axis=1))] == \
+        ["B", "A", "C", "D"]
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from library import cache
+from library.elo import COLONNE_ELO
+from library.partite import ArchivioPartite
+from library.statistiche import StatisticheGiocatori
+
+
+def archivio(*partite):
+    # (turno, p1, p2, set 1, set 2, set 3, vincitore, superficie), tutte nel round 1, un giorno per turno
+    df = pd.DataFrame(partite, columns=["Turno", "Player 1", "Player 2", "Set 1", "Set 2", "Set 3", "Vincitore",
+                                        "Superficie"])
+    df["Round"] = 1
+    df["Data"] = [f"{t:02d}/06/2025" for t in df["Turno"]]
+    df["Orario"] = "15:00"
+    df["Luogo"] = "Montella"
+    for c in COLONNE_ELO:
+        df[c] = np.nan
+    return ArchivioPartite.da_dataframe(df)
+
+
+def test_serie_forma_e_rapporti():
+    statistiche = StatisticheGiocatori(archivio(
+        (3, "Anna", "Bruno", "6-4", "7-6(5)", "", "Anna", "Terra"),
+        (1, "Anna", "Carla", "6-2", "6-3", "", "Anna", "Erba"),
+        (2, "Bruno", "Anna", "6-4", "6-4", "", "Bruno", "Terra"),
+        (4, "Carla", "Anna", "4-6", "6-4", "6-7(2)", "Anna", "Terra"),
+        (5, "Anna", "Carla", "", "", "", None, "Terra"),  # da giocare: non conta
+    ), forma=3)
+    anna = statistiche.giocatore("Anna")
+    assert (anna["Partite"], anna["Vinte"], anna["Perse"], anna["% Vittorie"]) == (4, 3, 1, 75.0)
+    assert anna["Forma"] == "SVV" and anna["Vittorie Ultime 3"] == 2  # turni 2, 3, 4
+    assert anna["Serie Attuale"] == "V2" and anna["Serie Vittorie Max"] == 2 and anna["Serie Sconfitte Max"] == 1
+    assert (anna["Set Vinti"], anna["Set Persi"]) == (6, 3)
+    assert (anna["Giochi Vinti"], anna["Giochi Persi"]) == (12 + 8 + 13 + 17, 5 + 12 + 10 + 16)
+    assert (anna["Tiebreak Vinti"], anna["Tiebreak Persi"]) == (2, 0)
+    assert statistiche.giocatore("Nessuno") is None
+
+    andamento = statistiche.andamento_giocatore("Anna")
+    assert andamento["Turno"].tolist() == [1, 2, 3, 4]
+    assert andamento["Avversario"].tolist() == ["Carla", "Bruno", "Bruno", "Carla"]
+    assert andamento["Forma"].tolist() == [100.0, 50.0, 66.7, 66.7]
+
+    terra = statistiche.split("Anna", "Superficie").set_index("Superficie")
+    assert terra.loc["Terra", "Partite"] == 3 and terra.loc["Terra", "Vinte"] == 2
+    assert terra.loc["Erba", "% Vittorie"] == 100.0
+    assert statistiche.migliori(superficie="Terra")["Giocatore"].tolist() == ["Anna", "Bruno", "Carla"]
+
+def test_come_un_ciclo_per_giocatore(lega):
+    df = cache.carica_partite(base_dir=lega)
+    statistiche = StatisticheGiocatori(ArchivioPartite.da_dataframe(df), forma=4)
+    giocate = df[df["Vincitore"].notna()].sort_values(["Round", "Data", "Turno"], kind="stable")
+    for giocatore, riga in statistiche.riepilogo.set_index("Giocatore").iterrows():
+        sue = giocate[(giocate["Player 1"] == giocatore) | (giocate["Player 2"] == giocatore)]
+        esiti = "".join("V" if v == giocatore else "S" for v in sue["Vincitore"])
+        assert riga["Partite"] == len(esiti) and riga["Vinte"] == esiti.count("V")
+        assert riga["Forma"] == esiti[-4:] and riga["Vittorie Ultime 4"] == esiti[-4:].count("V")
+        assert riga["Serie Vittorie Max"] == max(map(len, esiti.split("S")))
+        assert riga["Serie Sconfitte Max"] == max(map(len, esiti.split("V")))
+        coda = len(esiti) - len(esiti.rstrip(esiti[-1]))
+        assert riga["Serie Attuale"] == f"{esiti[-1]}{coda}"
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from library import strumenti
+from library.strumenti import misura, prometheus, sezione, statistiche
+
+
+@pytest.fixture
+def profilo(monkeypatch):
+    # Misure accese su un registro vuoto, lo stato del processo torna com'era alla fine
+    monkeypatch.setattr(strumenti, "_statistiche", {})
+    monkeypatch.setattr(strumenti, "ABILITATO", True)
+    monkeypatch.setattr(strumenti, "MEMORIA", False)
+
+
+@misura
+def quadrati(n):
+    return np.arange(n) ** 2
+
+@misura(nome="coppie")
+def coppie(n):
+    return [(i, i) for i in range(n)]
+
+
+def test_spenta_non_registra(monkeypatch):
+    monkeypatch.setattr(strumenti, "_statistiche", {})
+    monkeypatch.setattr(strumenti, "ABILITATO", False)
+    assert quadrati(3).tolist() == [0, 1, 4]
+    with sezione("blocco"):
+        pass
+    assert statistiche() == {}
+
+def test_chiamate_e_righe(profilo):
+    quadrati(10)
+    quadrati(5)
+    coppie(4)
+    with sezione("blocco", righe=7):
+        pass
+    misure = statistiche()
+    assert misure["quadrati"]["chiamate"] == 2 and misure["quadrati"]["righe"] == 15
+    assert misure["coppie"]["righe"] == 4
+    assert misure["blocco"] == {"chiamate": 1, "secondi": misure["blocco"]["secondi"], "righe": 7,
+                                "picco_memoria_byte": 0}
+    assert quadrati.__name__ == "quadrati"  # functools.wraps
+
+def test_memoria(profilo):
+    strumenti.abilita(memoria=True)
+    try:
+        quadrati(100_000)
+    finally:
+        strumenti.disabilita()
+    assert statistiche()["quadrati"]["picco_memoria_byte"] >= 100_000 * 8
+
+def test_prometheus(profilo):
+    coppie(3)
+    with sezione('nome "strano"'):
+        pass
+    testo = prometheus()
+    assert "# TYPE tennis_funzione_chiamate_totali counter" in testo
+    assert "# TYPE tennis_funzione_memoria_picco_byte gauge" in testo
+    assert 'tennis_funzione_chiamate_totali{funzione="coppie"} 1' in testo
+    assert 'tennis_funzione_righe_totali{funzione="coppie"} 3' in testo
+    assert 'funzione="nome \\"strano\\""' in testo
+    assert testo.endswith("\n")
@@ -0,0 +1,48 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+from library.tabellone import (BYE, carica_tabellone, genera_tabellone, incontri, ordine_teste_di_serie,
+                               salva_tabellone, turno_incontro)
+
+
+def girone(nome, n):
+    return pd.DataFrame({"Giocatore": [f"{nome}{i + 1}" for i in range(n)], "Punti": list(range(3 * n, 0, -3))})
+
+
+def test_ordine_teste_di_serie():
+    assert ordine_teste_di_serie(8).tolist() == [1, 8, 4, 5, 2, 7, 3, 6]
+    assert turno_incontro(0, 1) == 1 and turno_incontro(0, 7) == 3
+
+@pytest.mark.parametrize("n_gironi, per_girone", [(2, 2), (4, 2), (2, 4), (4, 4), (8, 2)])
+def test_stesso_girone_si_incontra_il_piu_tardi_possibile(n_gironi, per_girone):
+    gironi = {f"G{g}": girone(chr(65 + g), 5) for g in range(n_gironi)}
+    tabellone = genera_tabellone(gironi, per_girone=per_girone, seed=3)
+    n = len(tabellone)
+    assert n == n_gironi * per_girone
+    assert sorted(tabellone["Testa di Serie"].tolist()) == list(range(1, n + 1))
+    turni = n.bit_length() - 1
+    for _, compagni in tabellone.groupby("Girone"):
+        posti = (compagni["Posizione"] - 1).tolist()
+        # per_girone compagni si possono tenere separati fino agli ultimi log2(per_girone) turni
+        for a, b in itertools.combinations(posti, 2):
+            assert turno_incontro(a, b) > turni - per_girone.bit_length() + 1
+
+def test_bye_alle_teste_di_serie_piu_alte():
+    tabellone = genera_tabellone({"A": girone("A", 6)}, per_girone=6)
+    assert len(tabellone) == 8
+    primo_turno = incontri(tabellone)
+    assert (primo_turno["Turno"] == 1).sum() == 2
+    teste = tabellone.set_index("Giocatore")["Testa di Serie"]
+    avversari_bye = [tabellone["Giocatore"][i ^ 1] for i in tabellone.index[tabellone["Giocatore"] == BYE]]
+    assert sorted(teste[avversari_bye]) == [1, 2]
+
+def test_sorteggio_riproducibile_e_salvataggio(tmp_path):
+    gironi = {f"G{g}": girone(chr(65 + g), 4) for g in range(4)}
+    tabellone = genera_tabellone(gironi, per_girone=4, seed=7)
+    pd.testing.assert_frame_equal(tabellone, genera_tabellone(gironi, per_girone=4, seed=7))
+    percorso = tmp_path / "tabellone.parquet"
+    salva_tabellone(tabellone, percorso, {"seed": 7})
+    pd.testing.assert_frame_equal(carica_tabellone(percorso, {"seed": 7}), tabellone)
+    assert carica_tabellone(percorso, {"seed": 8}) is None
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from library import dati
+from library.validazione import ErroreDatiTurno, leggi_turno, main, segnalazioni
+
+INTESTAZIONE = "Turno,Data,Orario,Luogo,Player 1,Player 2,Set 1,Set 2,Set 3,Vincitore,Superficie\n"
+
+
+def scrivi(cartella, *righe, intestazione=INTESTAZIONE):
+    percorso = cartella / "turno_1.csv"
+    percorso.write_text(intestazione + "".join(r + "\n" for r in righe), encoding="utf-8")
+    return percorso
+
+
+def test_file_valido(tmp_path):
+    percorso = scrivi(tmp_path, "1,01/06/2025,15:00,Montella,Anna,Bruno,6-4,6-7(5),10-8,Anna,Erba",
+                      "1,01/06/2025,16:00,Montella,Carla,Dario,,,,,Erba")
+    df, errori = leggi_turno(percorso, turno=1)
+    assert errori == [] and segnalazioni(percorso) == []
+    assert len(df) == 2
+
+def test_errori_con_riga_e_colonna(tmp_path):
+    percorso = scrivi(tmp_path, "1,01/06/2025,15:00,Montella,Anna,Bruno,6-5,6-4,,Anna,Erba",
+                      "1,2025-06-01,15:00,Montella,Carla,Carla,6-4,6-4,6-1,Carla,Erba",
+                      "2,01/06/2025,15:00,Montella,Dario,Elena,6-4,6-4,,Elena,Erba")
+    _, errori = leggi_turno(percorso, turno=1)
+    trovati = {(e.riga, e.colonna, e.messaggio) for e in errori}
+    assert (2, "Set 1", "punteggio di set impossibile") in trovati
+    assert (3, "Data", "data non nel formato gg/mm/aaaa") in trovati
+    assert (3, "Player 2", "un giocatore non può affrontare sé stesso") in trovati
+    assert (3, "Set 3", "set giocato a partita già conclusa") in trovati
+    assert (4, "Turno", "diverso dal turno del file (1)") in trovati
+    assert (4, "Vincitore", "il vincitore non corrisponde ai set") in trovati
+    assert len(segnalazioni(percorso)) == len(errori)
+    with pytest.raises(ErroreDatiTurno):
+        leggi_turno(percorso, turno=1, rigoroso=True)
+
+def test_colonna_mancante_segnalata_ma_il_turno_si_carica(tmp_path):
+    cartella = tmp_path / "rounds" / "round_1"
+    cartella.mkdir(parents=True)
+    percorso = scrivi(cartella, "1,01/06/2025,15:00,Anna,Bruno,6-4,6-4,,Anna",
+                      intestazione="Turno,Data,Orario,Player 1,Player 2,Set 1,Set 2,Set 3,Vincitore\n")
+    df = dati.load_turno_csv("round_1", "turno_1", tmp_path / "rounds")
+    assert {"Luogo", "Superficie"} <= set(df.columns) and df["Luogo"].isna().all()
+    assert df.loc[0, "Elo iniziale 1"] == 1500
+    assert [e.colonna for e in segnalazioni(percorso)] == ["Luogo", "Superficie"]
+    assert pd.isna(df.loc[0, "Elo 1 Finale"])
+
+def test_riga_di_comando_sulla_cartella_dei_dati(tmp_path, monkeypatch, capsys):
+    cartella = tmp_path / "rounds" / "round_1"
+    cartella.mkdir(parents=True)
+    scrivi(cartella, "1,01/06/2025,15:00,Montella,Anna,Bruno,6-4-3,6-4,,Anna,Erba")
+    monkeypatch.setattr(dati, "BASE_DIR", tmp_path / "rounds")
+    assert main([]) == 1
+    uscita = capsys.readouterr().out
+    assert "round_1/turno_1.csv:2 Set 1 ['6-4-3']: punteggio non leggibile" in uscita
+    assert uscita.endswith("1 file controllati, 1 errori\n")
@@ -0,0 +1,63 @@
+import logging
+import os
+import time
+
+from library import cache
+from library.watcher import OsservatoreRisultati
+
+
+def tocca(percorso):
+    st = percorso.stat()
+    os.utime(percorso, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_notifica_i_turni_cambiati(lega):
+    osservatore = OsservatoreRisultati(lega)
+    notifiche = []
+    osservatore.aggiungi_ascoltatore(lambda versione, cambiati: notifiche.append((versione, cambiati)))
+    assert osservatore.controlla() == []  # primo giro: solo la fotografia
+    assert osservatore.controlla() == []
+    tocca(lega / "round_2" / "turno_1.csv")
+    tocca(lega / "round_1" / "turno_3.csv")
+    assert osservatore.controlla() == [("round_1", "turno_3"), ("round_2", "turno_1")]
+    assert notifiche == [(1, [("round_1", "turno_3"), ("round_2", "turno_1")])]
+    assert osservatore.versione == 1 and osservatore.controlla() == []
+    (lega / "round_2" / "turno_1.csv").unlink()
+    assert osservatore.controlla() == [("round_2", "turno_1")]
+    assert osservatore.versione == 2
+
+def test_ricostruisce_gli_indici(lega):
+    osservatore = OsservatoreRisultati(lega)
+    osservatore.controlla()
+    prima = cache.indice_giocatori("round_2", base_dir=lega)
+    tocca(lega / "round_2" / "turno_1.csv")
+    osservatore.controlla()
+    c = cache.cache_lega(lega)
+    mancati = c.mancati
+    assert cache.indice_giocatori("round_2", base_dir=lega) is not prima
+    assert c.mancati == mancati  # già ricostruito dall'osservatore
+
+def test_errori_registrati_e_esposti(lega, caplog):
+    osservatore = OsservatoreRisultati(lega, intervallo=0.01)
+    errori = [OSError("file a metà"), ValueError("set non valido"), ValueError("set non valido")]
+    visti = []
+
+    def controlla():
+        # Ogni giro vede l'errore lasciato dal giro precedente
+        visti.append(osservatore.ultimo_errore)
+        if errori:
+            raise errori.pop(0)
+
+    osservatore.controlla = controlla
+    with caplog.at_level(logging.ERROR, logger="library.watcher"):
+        osservatore.start()
+        attesa = time.monotonic() + 5
+        while len(visti) < 5 and time.monotonic() < attesa:
+            time.sleep(0.01)
+        osservatore.ferma()
+        osservatore.join()
+    # L'OSError si riprova in silenzio, l'errore sui dati si registra una volta e resta esposto
+    assert visti[:2] == [None, None] and isinstance(visti[2], ValueError)
+    assert isinstance(visti[3], ValueError)
+    assert visti[4] is None  # giro riuscito
+    assert len(caplog.records) == 1 and "set non valido" in caplog.records[0].exc_text